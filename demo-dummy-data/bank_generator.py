@@ -3,8 +3,8 @@ Komplai Demo Pipeline - Bank Transaction Generator
 Generates bank transactions with 95% reconciliation and 5% anomalies
 """
 
+import numpy as np
 import pandas as pd
-import random
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple
 import sys
@@ -12,11 +12,20 @@ sys.path.append('/home/user/demo-dummy-data')
 
 from utils import (
     generate_transaction_id,
-    set_seed,
-    generate_payment_reference,
-    week_contains_date,
-    get_25th_of_month
+    generate_payment_reference
 )
+from document_index import InvoiceDueDateIndex, BillMonthIndex
+from ledger import TransactionLedger
+from subledger import OpenItemsLedger
+from bank_state import BankTailState, DEFAULT_BANK_ACCOUNT
+from fx_rates import load_fx_rates
+from business_calendar import BusinessCalendar
+from rng import RNGFactory, randint, uniform
+from money import round_money
+
+
+# Receipts land within this many days either side of an invoice's due date
+PAYMENT_VARIANCE_DAYS = 3
 
 
 class BankTransactionGenerator:
@@ -24,125 +33,160 @@ class BankTransactionGenerator:
     
     def __init__(self, config: Dict):
         self.config = config
-        self.exchange_rate = config['pipeline']['base_exchange_rate']
+        self.fx_rates = load_fx_rates(config)
         self.anomaly_rate = config['pipeline']['anomaly_rate']
+        self.rng_factory = RNGFactory.from_config(config)
+
+        # Operating accounts by currency; the first INR account is primary and
+        # takes INR flows, anomalies and anything in a currency with no account
+        self.accounts = config.get('bank_accounts') or [
+            {'name': DEFAULT_BANK_ACCOUNT, 'currency': 'INR', 'opening_balance': 25000000.0}
+        ]
+        self.account_by_currency: Dict[str, Dict] = {}
+        for account in self.accounts:
+            self.account_by_currency.setdefault(account.get('currency', 'INR'), account)
+        primary = self.account_by_currency.get('INR', self.accounts[0])
+        self.bank_account = primary['name']
+        self.starting_balance = float(primary.get('opening_balance', 0.0))
+        self.opening_balances: Dict[str, float] = {}
+        self.closing_balances: Dict[str, float] = {}
+
+        # Monthly payment run (25th by default), rolled off weekends and bank holidays
+        calendar_config = config.get('calendar') or {}
+        self.calendar = BusinessCalendar.from_config(config)
+        self.payment_day = calendar_config.get('payment_day', 25)
+        self.payment_roll = calendar_config.get('payment_roll', 'preceding')
+
+        # Document indexes over the masters, synced incrementally per run
+        self.invoice_index = InvoiceDueDateIndex(payment_variance_days=PAYMENT_VARIANCE_DAYS)
+        self.bill_index = BillMonthIndex()
+
+        # Open-items subledgers: invoices awaiting receipt, bills awaiting payment
+        self.receivables = OpenItemsLedger('Invoice_ID', 'Total_Amount')
+        self.payables = OpenItemsLedger('Bill_ID', 'Net_Payable')
     
     def generate_weekly_bank_statement(self,
                                       run_date: datetime,
                                       invoices_df: pd.DataFrame,
                                       bills_df: pd.DataFrame,
-                                      bank_df: pd.DataFrame) -> Tuple[List[Dict], float]:
+                                      bank_df: pd.DataFrame,
+                                      tail_state: BankTailState = None,
+                                      new_invoices: List[Dict] = None,
+                                      new_bills: List[Dict] = None) -> Tuple[List[Dict], float]:
         """
         Generate bank transactions for the week ending on run_date
 
+        Args:
+            invoices_df: Invoices master as saved
+            bills_df: Bills master as saved
+            tail_state: Persisted last balance/sequence; bootstrapped from
+                        bank_df when not provided
+            new_invoices: This run's invoices, not saved yet (looked up but
+                          never indexed, so a failed save cannot leave them behind)
+            new_bills: This run's bills, not saved yet
+
         Returns:
-            (transactions, ending_balance)
+            (transactions, ending_balance) - ending_balance is the primary INR
+            account's; all closing balances are left in self.closing_balances
         """
-        # Set seed for deterministic randomness
-        set_seed(run_date)
+        # Own random stream for this week's bank activity (independent of invoices/bills)
+        rng = self.rng_factory.stream(run_date, 'bank')
 
         # Define week boundaries for PREVIOUS week
         # If run_date is Monday Jan 13, previous week is Mon Jan 6 - Sun Jan 12
         week_start = run_date - timedelta(days=7)  # Previous Monday
         week_end = run_date - timedelta(days=1)    # Previous Sunday
         
-        # Get last bank balance
-        if len(bank_df) > 0:
-            last_balance = bank_df.iloc[-1]['Running_Balance']
-            last_txn_id = bank_df.iloc[-1]['Transaction_ID']
-            start_seq = int(last_txn_id.replace('TXN', '')) + 1
-        else:
-            last_balance = 25000000.0  # Starting balance
-            start_seq = 1
+        # Get last balance per account and next transaction sequence
+        if tail_state is None:
+            tail_state = BankTailState.from_transactions(None, bank_df)
+        self.opening_balances = {
+            account['name']: tail_state.balance(account['name'], float(account.get('opening_balance', 0.0)))
+            for account in self.accounts
+        }
+        start_seq = tail_state.next_sequence()
         
-        running_balance = last_balance
-        transactions = []
+        # Bring the open items up to date: new documents open, history settles
+        self.receivables.sync_documents(invoices_df)
+        self.payables.sync_documents(bills_df)
+        self.receivables.sync_settlements(bank_df)
+        self.payables.sync_settlements(bank_df)
+        
+        ledger = TransactionLedger()
         
         # Step 1: Generate receipts (from invoices due in this week)
         receipts = self._generate_receipts(
-            invoices_df, week_start, week_end, running_balance, start_seq
+            invoices_df, week_start, week_end, start_seq, rng, new_invoices
         )
-        transactions.extend(receipts)
-        
-        # Update running balance and sequence
-        if receipts:
-            running_balance = receipts[-1]['Running_Balance']
-            start_seq = int(receipts[-1]['Transaction_ID'].replace('TXN', '')) + 1
+        ledger.extend(receipts)
+        start_seq += len(receipts)
         
         # Step 2: Generate payments (bills paid on 25th if within week)
         payments = self._generate_payments(
-            bills_df, week_start, week_end, run_date, running_balance, start_seq
+            bills_df, week_start, week_end, start_seq, rng, new_bills
         )
-        transactions.extend(payments)
-        
-        # Update running balance and sequence
-        if payments:
-            running_balance = payments[-1]['Running_Balance']
-            start_seq = int(payments[-1]['Transaction_ID'].replace('TXN', '')) + 1
+        ledger.extend(payments)
+        start_seq += len(payments)
         
         # Step 3: Inject anomalies (5% of expected transactions)
         total_expected_txns = len(receipts) + len(payments)
         anomaly_count = max(1, int(total_expected_txns * self.anomaly_rate / 2))  # 2.5% for orphaned
         
         anomalies = self._generate_anomalies(
-            anomaly_count, week_start, week_end, running_balance, start_seq
+            anomaly_count, week_start, week_end, start_seq, rng
         )
+        ledger.extend(anomalies)
         
-        # Insert anomalies at random positions
-        for anomaly in anomalies:
-            transactions.append(anomaly)
-            running_balance = anomaly['Running_Balance']
-        
-        # Sort all transactions by date
-        transactions.sort(key=lambda x: (x['Transaction_Date'], x['Transaction_ID']))
-        
-        # Recalculate running balances in chronological order
-        current_balance = last_balance
-        for txn in transactions:
-            if txn['Transaction_Type'] in ['Receipt', 'Opening']:
-                current_balance += txn['Credit']
-            else:  # Payment
-                current_balance -= txn['Debit']
-            
-            txn['Running_Balance'] = round(current_balance, 2)
+        # Sort by date once and compute each account's running balances
+        transactions, self.closing_balances = ledger.build(self.opening_balances)
+        ending_balance = self.closing_balances[self.bank_account]
         
-        return transactions, current_balance
+        # Documents settle in settle_documents() once the transactions are saved
+        return transactions, ending_balance
+    
+    def settle_documents(self, transactions: List[Dict]):
+        """Close the invoices and bills settled by saved transactions so they are not received/paid again"""
+        self.receivables.apply_bank_transactions(transactions)
+        self.payables.apply_bank_transactions(transactions)
     
     def _generate_receipts(self, 
                           invoices_df: pd.DataFrame,
                           week_start: datetime,
                           week_end: datetime,
-                          starting_balance: float,
-                          start_seq: int) -> List[Dict]:
-        """Generate receipt transactions from invoices"""
+                          start_seq: int,
+                          rng: np.random.Generator,
+                          new_invoices: List[Dict] = None) -> List[Dict]:
+        """Generate receipt transactions from invoices (balances are set by the ledger)"""
         receipts = []
         
         # Get invoices due in this week (invoice_date + payment_terms ± variance)
-        due_invoices = self._get_invoices_due_in_week(invoices_df, week_start, week_end)
+        due_invoices = self._get_invoices_due_in_week(invoices_df, week_start, week_end, new_invoices)
         
-        current_balance = starting_balance
         seq = start_seq
         
         for invoice in due_invoices:
             # 97.5% probability of receipt (2.5% will be missing for anomalies)
-            if random.random() < 0.975:
+            if rng.random() < 0.975:
                 # Calculate receipt date with variance
                 due_date = pd.to_datetime(invoice['Due_Date'])
-                variance_days = random.randint(-3, 3)  # ±3 days
+                variance_days = randint(rng, -3, 3)  # ±3 days
                 receipt_date = due_date + timedelta(days=variance_days)
                 
                 # Ensure receipt is within the week
                 if not (week_start <= receipt_date <= week_end):
-                    receipt_date = week_start + timedelta(days=random.randint(0, 6))
+                    receipt_date = week_start + timedelta(days=randint(rng, 0, 6))
                 
                 # Calculate receipt amount
                 invoice_amount = invoice['Total_Amount']
                 currency = invoice['Currency']
+                account, account_currency = self._account_for(currency)
                 
                 # Handle withholding tax for USD customers
                 if currency == 'USD':
-                    # 30% withholding tax applied
-                    receipt_amount = invoice_amount * 0.70 * self.exchange_rate
+                    # 30% withholding tax applied; converted unless it lands in the EEFC account
+                    receipt_amount = invoice_amount * 0.70
+                    if account_currency != currency:
+                        receipt_amount *= self.fx_rates.rate_on(receipt_date)
                 else:
                     receipt_amount = invoice_amount
                 
@@ -154,16 +198,15 @@ class BankTransactionGenerator:
                     'Reference_Number': invoice['Invoice_ID'],
                     'Entity_Name': invoice['Customer_Name'],
                     'Transaction_Type': 'Receipt',
-                    'Currency': 'INR',  # Bank account is INR
+                    'Currency': account_currency,
                     'Debit': 0.0,
-                    'Credit': round(receipt_amount, 2),
-                    'Running_Balance': round(current_balance + receipt_amount, 2),
-                    'Bank_Account': 'HDFC Bank Current Account',
+                    'Credit': round_money(receipt_amount),
+                    'Running_Balance': None,
+                    'Bank_Account': account,
                     'Reconciliation_Status': 'Matched',
                     'Notes': f'Payment received for invoice {invoice["Invoice_ID"]}'
                 }
                 
-                current_balance = txn['Running_Balance']
                 receipts.append(txn)
                 seq += 1
         
@@ -173,34 +216,43 @@ class BankTransactionGenerator:
                           bills_df: pd.DataFrame,
                           week_start: datetime,
                           week_end: datetime,
-                          run_date: datetime,
-                          starting_balance: float,
-                          start_seq: int) -> List[Dict]:
-        """Generate payment transactions for bills (paid on 25th)"""
+                          start_seq: int,
+                          rng: np.random.Generator,
+                          new_bills: List[Dict] = None) -> List[Dict]:
+        """Generate payment transactions for bills (paid on the monthly payment run)"""
         payments = []
         
-        # Check if 25th falls within this week
-        if not week_contains_date(week_start, week_end, 25):
-            return payments
+        # Payment run dates (25th rolled to a business day) falling within this week
+        payment_runs = self.calendar.payment_runs_between(
+            week_start, week_end, day=self.payment_day, convention=self.payment_roll
+        )
         
-        # Get bills due for payment this month
-        payment_date = get_25th_of_month(run_date)
+        seq = start_seq
         
-        # Get bills from previous month(s) that should be paid
-        bills_for_payment = self._get_bills_for_payment(bills_df, run_date)
+        for payment_date, run_year, run_month in payment_runs:
+            # Get bills from the previous month that should be paid on this run
+            bills_for_payment = self._get_bills_for_payment(bills_df, run_year, run_month, new_bills)
+            payments.extend(self._pay_bills(bills_for_payment, payment_date, seq, rng))
+            seq = start_seq + len(payments)
         
-        current_balance = starting_balance
+        return payments
+    
+    def _pay_bills(self, bills_for_payment: List[Dict], payment_date: datetime, start_seq: int,
+                   rng: np.random.Generator) -> List[Dict]:
+        """Generate one payment run's transactions"""
+        payments = []
         seq = start_seq
         
         for bill in bills_for_payment:
             # 97.5% probability of payment (2.5% will be skipped for anomalies)
-            if random.random() < 0.975:
+            if rng.random() < 0.975:
                 # Payment amount is Net_Payable (after TDS deduction)
                 payment_amount = bill['Net_Payable']
                 
-                # Convert to INR if USD
-                if bill['Currency'] == 'USD':
-                    payment_amount = payment_amount * self.exchange_rate
+                # Pay from the account in the bill's currency, converting if there is none
+                account, account_currency = self._account_for(bill['Currency'])
+                if bill['Currency'] == 'USD' and account_currency != 'USD':
+                    payment_amount = payment_amount * self.fx_rates.rate_on(payment_date)
                 
                 # Create payment transaction
                 txn = {
@@ -210,16 +262,15 @@ class BankTransactionGenerator:
                     'Reference_Number': bill['Bill_ID'],
                     'Entity_Name': bill['Vendor_Name'],
                     'Transaction_Type': 'Payment',
-                    'Currency': 'INR',
-                    'Debit': round(payment_amount, 2),
+                    'Currency': account_currency,
+                    'Debit': round_money(payment_amount),
                     'Credit': 0.0,
-                    'Running_Balance': round(current_balance - payment_amount, 2),
-                    'Bank_Account': 'HDFC Bank Current Account',
+                    'Running_Balance': None,
+                    'Bank_Account': account,
                     'Reconciliation_Status': 'Matched',
                     'Notes': f'Payment made for bill {bill["Bill_ID"]}'
                 }
                 
-                current_balance = txn['Running_Balance']
                 payments.append(txn)
                 seq += 1
         
@@ -229,74 +280,78 @@ class BankTransactionGenerator:
                            count: int,
                            week_start: datetime,
                            week_end: datetime,
-                           starting_balance: float,
-                           start_seq: int) -> List[Dict]:
+                           start_seq: int,
+                           rng: np.random.Generator) -> List[Dict]:
         """
         Generate anomaly transactions (orphaned payments)
         These are bank transactions with no matching invoice/bill
         """
         anomalies = []
         
-        current_balance = starting_balance
         seq = start_seq
         
         for i in range(count):
             # Random date within week
-            days_offset = random.randint(0, 6)
+            days_offset = randint(rng, 0, 6)
             txn_date = week_start + timedelta(days=days_offset)
             
             # Generate orphaned payment (no matching bill)
-            amount = random.uniform(5000, 50000)
+            amount = uniform(rng, 5000, 50000)
             
             txn = {
                 'Transaction_ID': generate_transaction_id(seq + i),
                 'Transaction_Date': txn_date,
-                'Description': f"NEFT/{generate_payment_reference()}",
+                'Description': f"NEFT/{generate_payment_reference(rng)}",
                 'Reference_Number': None,
                 'Entity_Name': 'Unknown Vendor',
                 'Transaction_Type': 'Payment',
                 'Currency': 'INR',
-                'Debit': round(amount, 2),
+                'Debit': round_money(amount),
                 'Credit': 0.0,
-                'Running_Balance': round(current_balance - amount, 2),
-                'Bank_Account': 'HDFC Bank Current Account',
+                'Running_Balance': None,
+                'Bank_Account': self.bank_account,
                 'Reconciliation_Status': 'Unmatched',  # KEY: This is unmatched
                 'Notes': 'Orphaned transaction - no matching bill found'
             }
             
-            current_balance = txn['Running_Balance']
             anomalies.append(txn)
         
         return anomalies
     
+    def _account_for(self, currency: str) -> Tuple[str, str]:
+        """Get (account name, account currency) that a flow in this currency settles through"""
+        account = self.account_by_currency.get(currency)
+        if account is None:
+            return self.bank_account, 'INR'
+        return account['name'], account.get('currency', 'INR')
+    
     def _get_invoices_due_in_week(self,
                                   invoices_df: pd.DataFrame,
                                   week_start: datetime,
-                                  week_end: datetime) -> List[Dict]:
-        """Get invoices whose payment is due in this week"""
-        due_invoices = []
+                                  week_end: datetime,
+                                  new_invoices: List[Dict] = None) -> List[Dict]:
+        """Get open invoices whose payment is due in this week"""
+        # Only rows appended since the last sync are parsed; the lookup itself
+        # is a binary search over sorted due dates (±3 day variance window)
+        self.invoice_index.sync(invoices_df)
+        candidates = self.invoice_index.due_in_window(week_start, week_end)
         
-        for _, invoice in invoices_df.iterrows():
-            due_date = pd.to_datetime(invoice['Due_Date'])
-            
-            # Check if due date falls within week (with ±3 day variance)
-            earliest_payment = due_date - timedelta(days=3)
-            latest_payment = due_date + timedelta(days=3)
-            
-            # If there's any overlap with the week, include it
-            if (earliest_payment <= week_end and latest_payment >= week_start):
-                due_invoices.append(invoice.to_dict())
+        # Invoices already received in an earlier week are no longer open
+        due = self.receivables.filter_open(candidates)
         
-        return due_invoices
+        # Unsaved invoices get a throwaway index of their own (all still open)
+        if new_invoices:
+            unsaved = InvoiceDueDateIndex(payment_variance_days=PAYMENT_VARIANCE_DAYS)
+            unsaved.sync(pd.DataFrame(new_invoices))
+            due += unsaved.due_in_window(week_start, week_end)
+        return due
     
     def _get_bills_for_payment(self,
                                bills_df: pd.DataFrame,
-                               run_date: datetime) -> List[Dict]:
-        """Get bills that should be paid on the 25th of this month"""
-        # Get bills from previous month(s) that are due
-        current_month = run_date.month
-        current_year = run_date.year
-        
+                               current_year: int,
+                               current_month: int,
+                               new_bills: List[Dict] = None) -> List[Dict]:
+        """Get bills that should be paid on this month's payment run"""
         # Pay bills from previous month
         if current_month == 1:
             target_month = 12
@@ -305,16 +360,18 @@ class BankTransactionGenerator:
             target_month = current_month - 1
             target_year = current_year
         
-        bills_to_pay = []
-        
-        for _, bill in bills_df.iterrows():
-            bill_date = pd.to_datetime(bill['Bill_Date'])
-            
-            # Pay bills from the previous month
-            if bill_date.month == target_month and bill_date.year == target_year:
-                bills_to_pay.append(bill.to_dict())
+        # Pay open bills from the previous month, fetched from its partition
+        self.bill_index.sync(bills_df)
+        due = self.payables.filter_open(
+            self.bill_index.bills_for_month(target_year, target_month)
+        )
         
-        return bills_to_pay
+        # Unsaved bills get a throwaway index of their own (all still open)
+        if new_bills:
+            unsaved = BillMonthIndex()
+            unsaved.sync(pd.DataFrame(new_bills))
+            due += unsaved.bills_for_month(target_year, target_month)
+        return due
 
 
 if __name__ == "__main__":
@@ -0,0 +1,165 @@
+"""
+Komplai Demo Pipeline - Bank Tail State
+Persisted last balance / sequence / date per bank account
+"""
+
+import json
+import os
+import tempfile
+import pandas as pd
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+# Account used by the single-account generator and for legacy rows without one
+DEFAULT_BANK_ACCOUNT = 'HDFC Bank Current Account'
+
+
+class BankTailState:
+    """
+    Small persisted record of where Bank_Transactions ends
+
+    The weekly bank step only needs the closing balance and the last
+    transaction sequence, so they are kept in a JSON file next to the outputs
+    and rewritten atomically after every append instead of being read back
+    from the full Bank_Transactions sheet.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.last_sequence = 0
+        self.accounts: Dict[str, Dict] = {}
+
+    @classmethod
+    def load(cls, path: str) -> Optional['BankTailState']:
+        """
+        Load tail state from disk
+
+        Returns:
+            BankTailState, or None if no state has been saved yet
+        """
+        if not os.path.exists(path):
+            return None
+
+        with open(path, 'r') as f:
+            data = json.load(f)
+
+        state = cls(path)
+        state.last_sequence = int(data.get('last_sequence', 0))
+        state.accounts = data.get('accounts', {})
+        return state
+
+    @classmethod
+    def from_transactions(cls, path: str, bank_df: pd.DataFrame) -> 'BankTailState':
+        """Bootstrap tail state from Bank_Transactions history (one full read)"""
+        state = cls(path)
+        if bank_df is None or len(bank_df) == 0:
+            return state
+
+        sequences = pd.to_numeric(
+            bank_df['Transaction_ID'].astype(str).str.replace('TXN', '', regex=False), errors='coerce'
+        )
+        if sequences.notna().any():
+            state.last_sequence = int(sequences.max())
+
+        # Sheet rows are in statement order, so each account's last row is its tail
+        if 'Bank_Account' in bank_df.columns:
+            tails = bank_df.drop_duplicates('Bank_Account', keep='last')
+        else:
+            tails = bank_df.tail(1)
+        state.record(tails.to_dict('records'))
+        return state
+
+    def matches(self, bank_df: pd.DataFrame) -> bool:
+        """
+        Check the state still describes the end of Bank_Transactions
+
+        The sheet can be edited or restored behind the state file's back, so
+        the last row's Transaction_ID and Running_Balance are compared with the
+        tail recorded for its account.
+
+        Returns:
+            True if the state agrees with the sheet's last row
+        """
+        if bank_df is None or len(bank_df) == 0:
+            return not self.accounts
+
+        last = bank_df.iloc[-1]
+        account = last.get('Bank_Account')
+        if not account or pd.isna(account):
+            account = DEFAULT_BANK_ACCOUNT
+        tail = self.accounts.get(account)
+        if not tail or tail.get('last_transaction_id') != str(last.get('Transaction_ID')):
+            return False
+
+        balance = pd.to_numeric(last.get('Running_Balance'), errors='coerce')
+        if pd.isna(balance) or 'last_balance' not in tail:
+            return False
+        return round(float(balance), 2) == round(tail['last_balance'], 2)
+
+    def balance(self, account: str, default: float) -> float:
+        """Get the last running balance of an account"""
+        return self.accounts.get(account, {}).get('last_balance', default)
+
+    def next_sequence(self) -> int:
+        """Get the next transaction sequence number (IDs are global across accounts)"""
+        return self.last_sequence + 1
+
+    def record(self, transactions: List[Dict]):
+        """
+        Advance the tail past appended transactions
+
+        Transactions must be in statement order, as generated; the last row per
+        account carries its closing balance. A row without a Running_Balance
+        keeps the account's previous balance.
+        """
+        for txn in transactions:
+            txn_id = str(txn.get('Transaction_ID') or '')
+            if not txn_id.startswith('TXN'):
+                continue
+
+            try:
+                sequence = int(txn_id.replace('TXN', ''))
+            except ValueError:
+                continue
+
+            # Transactions are sorted by date, so IDs are not monotonic within a week
+            self.last_sequence = max(self.last_sequence, sequence)
+
+            account = txn.get('Bank_Account')
+            if not account or pd.isna(account):
+                account = DEFAULT_BANK_ACCOUNT
+            txn_date = txn.get('Transaction_Date')
+            tail = dict(self.accounts.get(account, {}))
+            tail.update({
+                'last_transaction_id': txn_id,
+                'last_sequence': max(sequence, tail.get('last_sequence', 0)),
+                'last_date': txn_date.strftime('%Y-%m-%d') if hasattr(txn_date, 'strftime') else str(txn_date)
+            })
+            balance = pd.to_numeric(txn.get('Running_Balance'), errors='coerce')
+            if not pd.isna(balance):
+                tail['last_balance'] = float(balance)
+            self.accounts[account] = tail
+
+    def save(self):
+        """Write state atomically (temp file in the same directory, then rename)"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        data = {
+            'last_sequence': self.last_sequence,
+            'accounts': self.accounts,
+            'updated_at': datetime.now().isoformat(timespec='seconds')
+        }
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.bank_state_', suffix='.json')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
@@ -3,27 +3,25 @@ Komplai Demo Pipeline - Bill Generator
 Generates vendor bills with TDS/withholding tax and prepaid expense handling
 """
 
+import numpy as np
 import pandas as pd
-import random
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
+from typing import Dict, List
 import sys
 sys.path.append('/home/user/demo-dummy-data')
 
 from utils import (
     generate_bill_id,
-    set_seed,
     format_date_for_service_period,
-    calculate_igst,
-    calculate_sales_tax,
-    calculate_tds,
-    get_tds_section_for_expense,
-    apply_variance,
     is_prepaid_expense,
     extract_service_period,
-    calculate_monthly_amount,
-    format_indian_date
+    calculate_monthly_amount
 )
+from money import round_money, to_minor_array, from_minor_array
+from tax_rules import load_tax_rules
+from fx_rates import load_fx_rates
+from business_calendar import BusinessCalendar
+from rng import RNGFactory, randint, uniform, choice, choices
 
 
 class BillGenerator:
@@ -33,7 +31,10 @@ class BillGenerator:
         self.entities = entities_df
         self.recurring_schedule = recurring_schedule_df
         self.config = config
-        self.exchange_rate = config['pipeline']['base_exchange_rate']
+        self.fx_rates = load_fx_rates(config)
+        self.calendar = BusinessCalendar.from_config(config)
+        self.rng_factory = RNGFactory.from_config(config)
+        self.tax_rules = load_tax_rules(config)
         
         # Get vendors only
         self.vendors = entities_df[entities_df['Entity_Type'] == 'Vendor'].copy()
@@ -88,8 +89,8 @@ class BillGenerator:
             last_bills: Existing bills dataframe
             count: Number of bills to generate (default 4)
         """
-        # Set seed for deterministic randomness
-        set_seed(run_date)
+        # Own random stream for this week's bills (independent of invoices/bank)
+        rng = self.rng_factory.stream(run_date, 'bills')
 
         # Get next bill sequence number
         start_seq = 1
@@ -109,11 +110,11 @@ class BillGenerator:
         bills = []
 
         # Step 1: Check if any recurring bills are due this week
-        recurring_bills = self._check_recurring_due(run_date)
+        recurring_bills = self._check_recurring_due(run_date, rng)
 
         # Step 2: Generate one-time bills to fill remaining slots
         remaining_count = count - len(recurring_bills)
-        one_time_bills = self._generate_one_time_bills(run_date, remaining_count)
+        one_time_bills = self._generate_one_time_bills(run_date, remaining_count, rng)
 
         # Combine and assign sequence numbers
         all_bills = recurring_bills + one_time_bills
@@ -121,7 +122,7 @@ class BillGenerator:
         for i, bill_data in enumerate(all_bills):
             # Generate bill for PREVIOUS week (run_date - 7 to run_date - 1)
             # Random day in the previous week
-            days_back = random.randint(1, 7)
+            days_back = randint(rng, 1, 7)
             bill_date = run_date - timedelta(days=days_back)
 
             bill = self._create_bill(
@@ -130,13 +131,58 @@ class BillGenerator:
                 sequence=start_seq + i,
                 expense_account=bill_data['expense_account'],
                 amount=bill_data['amount'],
-                is_recurring=bill_data.get('is_recurring', False)
+                is_recurring=bill_data.get('is_recurring', False),
+                rng=rng
             )
             bills.append(bill)
 
+        # Tax, TDS and totals for the whole batch from the compiled rule tables
+        self._apply_taxes(bills)
+
+        # Due dates on a weekend or bank holiday move to the next business day
+        due_dates = self.calendar.roll([bill['Due_Date'] for bill in bills], 'following')
+        for bill, due_date in zip(bills, due_dates.to_pydatetime()):
+            bill['Due_Date'] = due_date
+
         return bills
     
-    def _check_recurring_due(self, run_date: datetime) -> List[Dict]:
+    def _apply_taxes(self, bills: List[Dict]):
+        """
+        Fill tax, TDS, totals and prepaid amounts for a batch in place
+
+        Tax and TDS are evaluated over the whole batch's columns by the rule
+        engine (TDS only for INR vendors) and totals are summed in paise.
+        """
+        if not bills:
+            return
+
+        batch = pd.DataFrame({
+            'Currency': [bill['Currency'] for bill in bills],
+            'Subtotal': [bill['Subtotal'] for bill in bills],
+            'Tax_Rate': [bill['Tax_Rate'] for bill in bills],
+            'Expense_Account': [bill['Line_Item_1_Account'] for bill in bills]
+        })
+        taxes = self.tax_rules.evaluate_indirect(batch['Currency'], batch['Subtotal'], batch['Tax_Rate'])
+        tds = self.tax_rules.evaluate_tds(batch['Expense_Account'], batch['Subtotal'], batch['Currency'])
+
+        total_minor = to_minor_array(batch['Subtotal']) + to_minor_array(taxes['Tax_Amount'])
+        totals = from_minor_array(total_minor)
+        net_payables = from_minor_array(total_minor - to_minor_array(tds['TDS_Amount']))
+
+        for i, bill in enumerate(bills):
+            bill['Tax_Type'] = taxes['Tax_Type'].iat[i]
+            bill['Tax_Amount'] = float(taxes['Tax_Amount'].iat[i])
+            bill['Total_Amount'] = float(totals[i])
+            bill['TDS_Applicable'] = bool(tds['TDS_Applicable'].iat[i])
+            bill['TDS_Section'] = tds['TDS_Section'].iat[i]
+            bill['TDS_Amount'] = float(tds['TDS_Amount'].iat[i])
+            bill['Net_Payable'] = float(net_payables[i])
+            if bill['Is_Prepaid']:
+                service_period = (bill['Prepaid_Start_Date'], bill['Prepaid_End_Date'])
+                bill['Monthly_Amortization_Amount'] = calculate_monthly_amount(bill['Total_Amount'], service_period)
+                bill['Remaining_Prepaid_Balance'] = bill['Total_Amount']
+    
+    def _check_recurring_due(self, run_date: datetime, rng: np.random.Generator) -> List[Dict]:
         """Check which recurring vendors are due this week"""
         recurring_due = []
         
@@ -156,7 +202,7 @@ class BillGenerator:
                 amount, due_day = self.recurring_categories[category]
                 
                 # Find or create vendor for this category
-                vendor = self._get_vendor_for_expense(category)
+                vendor = self._get_vendor_for_expense(category, rng)
                 
                 recurring_due.append({
                     'vendor': vendor,
@@ -167,7 +213,8 @@ class BillGenerator:
         
         return recurring_due
     
-    def _generate_one_time_bills(self, run_date: datetime, count: int) -> List[Dict]:
+    def _generate_one_time_bills(self, run_date: datetime, count: int,
+                                 rng: np.random.Generator) -> List[Dict]:
         """Generate one-time bills based on expense category weights"""
         one_time_bills = []
         
@@ -175,14 +222,14 @@ class BillGenerator:
         categories = list(self.expense_categories.keys())
         weights = list(self.expense_categories.values())
         
-        selected_categories = random.choices(categories, weights=weights, k=count)
+        selected_categories = choices(rng, categories, weights=weights, k=count)
         
         for category in selected_categories:
             # Select vendor for this expense category
-            vendor = self._get_vendor_for_expense(category)
+            vendor = self._get_vendor_for_expense(category, rng)
             
             # Generate amount based on category
-            amount = self._generate_amount_for_category(category)
+            amount = self._generate_amount_for_category(category, rng)
             
             one_time_bills.append({
                 'vendor': vendor,
@@ -193,13 +240,13 @@ class BillGenerator:
         
         return one_time_bills
     
-    def _get_vendor_for_expense(self, expense_account: str) -> pd.Series:
+    def _get_vendor_for_expense(self, expense_account: str, rng: np.random.Generator) -> pd.Series:
         """Get or select vendor appropriate for expense category"""
         # Try to find vendor that matches this expense type
         # For now, randomly select from vendors
-        return self.vendors.sample(n=1).iloc[0]
+        return self.vendors.sample(n=1, random_state=rng).iloc[0]
     
-    def _generate_amount_for_category(self, category: str) -> float:
+    def _generate_amount_for_category(self, category: str, rng: np.random.Generator) -> float:
         """Generate realistic amount based on expense category"""
         # Base amounts for different categories
         category_ranges = {
@@ -213,17 +260,18 @@ class BillGenerator:
         }
         
         range_min, range_max = category_ranges.get(category, (5000, 50000))
-        amount = random.uniform(range_min, range_max)
+        amount = uniform(rng, range_min, range_max)
         
-        return round(amount, 2)
+        return round_money(amount)
     
     def _create_bill(self, vendor: pd.Series, 
                     bill_date: datetime,
                     sequence: int,
                     expense_account: str,
                     amount: float,
+                    rng: np.random.Generator,
                     is_recurring: bool = False) -> Dict:
-        """Create a single bill with all calculations"""
+        """Create a single bill (tax, TDS and totals are filled in by _apply_taxes)"""
         
         bill_id = generate_bill_id(bill_date, sequence)
         
@@ -239,33 +287,10 @@ class BillGenerator:
         quantity = 1
         rate = amount
         
-        # Apply tax based on currency
-        if vendor['Currency'] == 'INR':
-            tax_type = 'IGST'
-            tax_rate = 0.18
-            tax_amount = calculate_igst(subtotal, tax_rate)
-        else:  # USD
-            tax_type = 'Sales Tax'
-            tax_rate = random.choice([0.04, 0.06, 0.08])
-            tax_amount = calculate_sales_tax(subtotal, tax_rate)
-        
-        # Calculate total before TDS
-        total_before_tds = subtotal + tax_amount
-        
-        # Apply TDS if applicable (only for INR vendors)
-        tds_section, tds_rate = get_tds_section_for_expense(expense_account)
-        tds_applicable = (tds_section is not None and vendor['Currency'] == 'INR')
-        
-        if tds_applicable:
-            tds_amount = calculate_tds(subtotal, tds_rate)
-        else:
-            tds_amount = 0.0
-            tds_section = None
-            tds_rate = 0.0
-        
-        # Calculate net payable
-        total_amount = total_before_tds
-        net_payable = total_amount - tds_amount
+        # Tax rate by currency (USD picks a state sales tax rate); tax, TDS
+        # and totals are computed for the whole batch in _apply_taxes
+        tax_type, tax_rates = self.tax_rules.indirect_tax(vendor['Currency'])
+        tax_rate = tax_rates[0] if len(tax_rates) == 1 else choice(rng, tax_rates)
         
         # Determine due date (30 days default)
         payment_terms = vendor.get('Payment_Terms', 'Net 30')
@@ -279,14 +304,15 @@ class BillGenerator:
         # Prepaid expense data
         prepaid_data = {}
         if item_is_prepaid and service_period:
+            # Amortization amounts follow from the total (set in _apply_taxes)
             prepaid_data = {
                 'Is_Prepaid': True,
                 'Prepaid_Start_Date': service_period[0],
                 'Prepaid_End_Date': service_period[1],
                 'Amortization_Period_Months': self._calculate_months_between(service_period[0], service_period[1]),
-                'Monthly_Amortization_Amount': calculate_monthly_amount(total_amount, service_period),
+                'Monthly_Amortization_Amount': 0.0,
                 'Amortized_To_Date': 0.0,
-                'Remaining_Prepaid_Balance': total_amount
+                'Remaining_Prepaid_Balance': 0.0
             }
         else:
             prepaid_data = {
@@ -308,7 +334,7 @@ class BillGenerator:
             'Vendor_Address': self._format_address(vendor),
             'Vendor_Tax_ID': vendor['Tax_ID'],
             'Currency': vendor['Currency'],
-            'Exchange_Rate': self.exchange_rate if vendor['Currency'] == 'USD' else 1.0,
+            'Exchange_Rate': self.fx_rates.rate_on(bill_date) if vendor['Currency'] == 'USD' else 1.0,
             'Due_Date': due_date,
             'Line_Item_Count': 1,  # Keeping it simple with 1 line item
             'Line_Item_1_Description': description,
@@ -324,12 +350,12 @@ class BillGenerator:
             'Subtotal': subtotal,
             'Tax_Type': tax_type,
             'Tax_Rate': tax_rate,
-            'Tax_Amount': tax_amount,
-            'Total_Amount': total_amount,
-            'TDS_Applicable': tds_applicable,
-            'TDS_Section': tds_section,
-            'TDS_Amount': tds_amount,
-            'Net_Payable': net_payable,
+            'Tax_Amount': 0.0,
+            'Total_Amount': subtotal,
+            'TDS_Applicable': False,
+            'TDS_Section': None,
+            'TDS_Amount': 0.0,
+            'Net_Payable': subtotal,
             'Notes': 'Payment terms: Net 30',
             'Status': 'Received'
         }
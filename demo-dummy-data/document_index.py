@@ -0,0 +1,296 @@
+"""
+Komplai Demo Pipeline - Document Indexes
+Sorted lookups over the invoice and bill masters and Bank_Transactions
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from bank_state import DEFAULT_BANK_ACCOUNT
+
+
+def _to_datetime64(values) -> np.ndarray:
+    """Parse a column of dates (Timestamps or sheet strings) to datetime64[ns], NaT on failure"""
+    parsed = pd.to_datetime(pd.Series(values, dtype=object), errors='coerce', format='mixed')
+    return parsed.to_numpy(dtype='datetime64[ns]')
+
+
+def _boundary_id(df: pd.DataFrame, row_count: int, id_column: str) -> Optional[str]:
+    """ID of row row_count - 1 in df (None if there is no such row or column)"""
+    if row_count == 0 or len(df) < row_count or id_column not in df.columns:
+        return None
+    return str(df[id_column].iat[row_count - 1])
+
+
+class InvoiceDueDateIndex:
+    """
+    Sorted due-date index over Invoices_Master
+
+    Invoices are only ever appended to the master, so the index tracks how many
+    rows it has seen and `sync` only parses the new tail. Sync it from the
+    master as saved: the ID of the last indexed row is checked on every sync
+    and the index is rebuilt if the rows it has seen were replaced. Queries binary-search
+    the sorted due dates, so finding the invoices payable in a week costs
+    O(log n + k) instead of a scan over the whole history.
+    """
+
+    def __init__(self, payment_variance_days: int = 3):
+        self.variance = np.timedelta64(payment_variance_days, 'D')
+        self._due_dates = np.array([], dtype='datetime64[ns]')
+        self._positions = np.array([], dtype=np.int64)
+        self._frame = pd.DataFrame()
+        self._row_count = 0
+        self._last_id: Optional[str] = None
+
+    def __len__(self) -> int:
+        return self._row_count
+
+    def sync(self, invoices_df: pd.DataFrame):
+        """
+        Index any rows of invoices_df beyond those already indexed
+
+        Args:
+            invoices_df: Full invoices master (existing rows plus appended ones)
+        """
+        if _boundary_id(invoices_df, self._row_count, 'Invoice_ID') != self._last_id:
+            # Master was replaced rather than appended to - start over
+            self._due_dates = np.array([], dtype='datetime64[ns]')
+            self._positions = np.array([], dtype=np.int64)
+            self._row_count = 0
+
+        self._frame = invoices_df
+        self._last_id = _boundary_id(invoices_df, len(invoices_df), 'Invoice_ID')
+        if len(invoices_df) == self._row_count or 'Due_Date' not in invoices_df.columns:
+            self._row_count = len(invoices_df)
+            return
+
+        new_due = _to_datetime64(invoices_df['Due_Date'].iloc[self._row_count:])
+        new_positions = np.arange(self._row_count, len(invoices_df), dtype=np.int64)
+
+        # Rows without a parseable due date can never be matched to a receipt
+        valid = ~np.isnat(new_due)
+        new_due = new_due[valid]
+        new_positions = new_positions[valid]
+
+        order = np.argsort(new_due, kind='stable')
+        new_due = new_due[order]
+        new_positions = new_positions[order]
+
+        insert_at = np.searchsorted(self._due_dates, new_due, side='right')
+        self._due_dates = np.insert(self._due_dates, insert_at, new_due)
+        self._positions = np.insert(self._positions, insert_at, new_positions)
+        self._row_count = len(invoices_df)
+
+    def append(self, new_invoices: List[Dict]):
+        """Append freshly generated invoices to the indexed master"""
+        if not new_invoices:
+            return
+        self.sync(pd.concat([self._frame, pd.DataFrame(new_invoices)], ignore_index=True))
+
+    def due_in_window(self, week_start: datetime, week_end: datetime) -> List[Dict]:
+        """
+        Get invoices whose ±variance payment window overlaps [week_start, week_end]
+
+        Returns:
+            Invoice rows as dicts, in master order
+        """
+        # due - variance <= week_end and due + variance >= week_start
+        lower = pd.Timestamp(week_start).to_datetime64() - self.variance
+        upper = pd.Timestamp(week_end).to_datetime64() + self.variance
+
+        lo = np.searchsorted(self._due_dates, lower, side='left')
+        hi = np.searchsorted(self._due_dates, upper, side='right')
+        if lo >= hi:
+            return []
+
+        positions = np.sort(self._positions[lo:hi])
+        return self._frame.iloc[positions].to_dict('records')
+
+
+class BillMonthIndex:
+    """
+    (year, month) partitioned index over Bills_Master
+
+    The 25th-of-month payment run pays every bill dated in the previous month,
+    so bills are bucketed by the month of Bill_Date as they are appended and the
+    payment batch is fetched straight from its partition. Like the invoice
+    index it is synced from the saved master and rebuilt if the rows it has
+    seen were replaced.
+    """
+
+    def __init__(self):
+        self._partitions: Dict[Tuple[int, int], List[int]] = {}
+        self._frame = pd.DataFrame()
+        self._row_count = 0
+        self._last_id: Optional[str] = None
+
+    def __len__(self) -> int:
+        return self._row_count
+
+    def sync(self, bills_df: pd.DataFrame):
+        """
+        Partition any rows of bills_df beyond those already indexed
+
+        Args:
+            bills_df: Full bills master (existing rows plus appended ones)
+        """
+        if _boundary_id(bills_df, self._row_count, 'Bill_ID') != self._last_id:
+            # Master was replaced rather than appended to - start over
+            self._partitions = {}
+            self._row_count = 0
+
+        self._frame = bills_df
+        self._last_id = _boundary_id(bills_df, len(bills_df), 'Bill_ID')
+        if len(bills_df) == self._row_count or 'Bill_Date' not in bills_df.columns:
+            self._row_count = len(bills_df)
+            return
+
+        bill_dates = pd.DatetimeIndex(_to_datetime64(bills_df['Bill_Date'].iloc[self._row_count:]))
+        positions = np.arange(self._row_count, len(bills_df), dtype=np.int64)
+
+        valid = ~bill_dates.isna()
+        years = bill_dates.year[valid].tolist()
+        months = bill_dates.month[valid].tolist()
+        for year, month, position in zip(years, months, positions[valid].tolist()):
+            self._partitions.setdefault((year, month), []).append(position)
+
+        self._row_count = len(bills_df)
+
+    def append(self, new_bills: List[Dict]):
+        """Append freshly generated bills to the indexed master"""
+        if not new_bills:
+            return
+        self.sync(pd.concat([self._frame, pd.DataFrame(new_bills)], ignore_index=True))
+
+    def bills_for_month(self, year: int, month: int) -> List[Dict]:
+        """
+        Get bills dated in the given month
+
+        Returns:
+            Bill rows as dicts, in master order
+        """
+        positions = self._partitions.get((year, month))
+        if not positions:
+            return []
+        return self._frame.iloc[positions].to_dict('records')
+
+
+class BankStatementIndex:
+    """
+    Date-sorted index over Bank_Transactions for statement periods
+
+    Like the document indexes, `sync` only parses rows appended since the last
+    call and `append` adds the current run's transactions, so a statement is
+    two binary searches plus work proportional to the rows it contains.
+    """
+
+    def __init__(self):
+        self._dates = np.array([], dtype='datetime64[ns]')
+        self._positions = np.array([], dtype=np.int64)
+        self._frame = pd.DataFrame()
+        self._row_count = 0
+
+    def __len__(self) -> int:
+        return self._row_count
+
+    def sync(self, bank_df: pd.DataFrame):
+        """
+        Index any rows of bank_df beyond those already indexed
+
+        Args:
+            bank_df: Full Bank_Transactions history (never modified)
+        """
+        if len(bank_df) < self._row_count:
+            # Sheet was replaced rather than appended to - start over
+            self._dates = np.array([], dtype='datetime64[ns]')
+            self._positions = np.array([], dtype=np.int64)
+            self._row_count = 0
+
+        self._frame = bank_df
+        if len(bank_df) == self._row_count or 'Transaction_Date' not in bank_df.columns:
+            self._row_count = len(bank_df)
+            return
+
+        new_dates = _to_datetime64(bank_df['Transaction_Date'].iloc[self._row_count:])
+        new_positions = np.arange(self._row_count, len(bank_df), dtype=np.int64)
+
+        valid = ~np.isnat(new_dates)
+        new_dates = new_dates[valid]
+        new_positions = new_positions[valid]
+
+        # Stable sort keeps sheet order (statement order) within a day
+        order = np.argsort(new_dates, kind='stable')
+        new_dates = new_dates[order]
+        new_positions = new_positions[order]
+
+        insert_at = np.searchsorted(self._dates, new_dates, side='right')
+        self._dates = np.insert(self._dates, insert_at, new_dates)
+        self._positions = np.insert(self._positions, insert_at, new_positions)
+        self._row_count = len(bank_df)
+
+    def append(self, new_transactions: List[Dict]):
+        """Append freshly generated transactions to the indexed history"""
+        if not new_transactions:
+            return
+        self.sync(pd.concat([self._frame, pd.DataFrame(new_transactions)], ignore_index=True))
+
+    def between(self, start_date: datetime, end_date: datetime,
+                account: Optional[str] = None) -> pd.DataFrame:
+        """
+        Get transactions dated in [start_date, end_date], in statement order
+
+        Args:
+            account: Only this Bank_Account (rows without one belong to the
+                     default account); None for all accounts
+        """
+        lo = np.searchsorted(self._dates, pd.Timestamp(start_date).to_datetime64(), side='left')
+        hi = np.searchsorted(self._dates, pd.Timestamp(end_date).to_datetime64(), side='right')
+        rows = self._frame.iloc[self._positions[lo:hi]]
+
+        if account is not None and len(rows) > 0 and 'Bank_Account' in rows.columns:
+            accounts = rows['Bank_Account'].fillna(DEFAULT_BANK_ACCOUNT)
+            rows = rows[(accounts == account).to_numpy()]
+        return rows
+
+    def statement(self, start_date: datetime, end_date: datetime,
+                  account: Optional[str] = None) -> Dict:
+        """
+        Build statement rows and balances for a period, column-wise
+
+        Returns:
+            Dict with 'transactions' (template rows), 'opening_balance' and
+            'closing_balance'; no transactions means an empty list and None balances
+        """
+        rows = self.between(start_date, end_date, account)
+        if len(rows) == 0:
+            return {'transactions': [], 'opening_balance': None, 'closing_balance': None}
+
+        def numeric(column: str) -> np.ndarray:
+            if column not in rows.columns:
+                return np.zeros(len(rows))
+            return pd.to_numeric(rows[column], errors='coerce').fillna(0.0).to_numpy(dtype=np.float64)
+
+        description_column = 'Description' if 'Description' in rows.columns else 'Narration'
+        balance_column = 'Running_Balance' if 'Running_Balance' in rows.columns else 'Balance'
+
+        dates = pd.DatetimeIndex(_to_datetime64(rows['Transaction_Date'])).strftime('%Y-%m-%d')
+        descriptions = rows.get(description_column, pd.Series('', index=rows.index)).fillna('').astype(str)
+        debits = numeric('Debit')
+        credits = numeric('Credit')
+        balances = numeric(balance_column)
+
+        transactions = [
+            {'date': date, 'description': description, 'debit': debit, 'credit': credit, 'balance': balance}
+            for date, description, debit, credit, balance in zip(
+                dates.tolist(), descriptions.tolist(), debits.tolist(), credits.tolist(), balances.tolist()
+            )
+        ]
+
+        return {
+            'transactions': transactions,
+            # Balance before the first row of the period
+            'opening_balance': float(balances[0] - credits[0] + debits[0]),
+            'closing_balance': float(balances[-1])
+        }
@@ -1,6 +1,6 @@
 """
 Gmail SMTP Email Sender for Komplai Demo Pipeline
-Sends invoices and bills as PDF attachments
+Sends invoices, bills and weekly document packs as PDF attachments
 """
 
 import smtplib
@@ -8,7 +8,7 @@ import os
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.application import MIMEApplication
-from typing import Optional
+from typing import Optional, Union
 
 
 class GmailEmailSender:
@@ -40,9 +40,10 @@ class GmailEmailSender:
         customer_name: str,
         amount: float,
         currency: str,
-        pdf_path: str
+        pdf_path: Optional[str] = None,
+        pdf_bytes: Optional[Union[bytes, memoryview]] = None
     ) -> bool:
-        """Send invoice email with PDF attachment"""
+        """Send invoice email with PDF attachment (from pdf_bytes, else read from pdf_path)"""
 
         subject = f"Invoice {invoice_id} from Acme Technologies"
 
@@ -79,7 +80,9 @@ Acme Technologies Private Limited
             subject=subject,
             body_text=body_text,
             body_html=body_html,
-            attachment_path=pdf_path
+            attachment_path=pdf_path,
+            attachment_bytes=pdf_bytes,
+            attachment_filename=f"{invoice_id}.pdf"
         )
 
     def send_bill_email(
@@ -89,9 +92,10 @@ Acme Technologies Private Limited
         vendor_name: str,
         amount: float,
         currency: str,
-        pdf_path: str
+        pdf_path: Optional[str] = None,
+        pdf_bytes: Optional[Union[bytes, memoryview]] = None
     ) -> bool:
-        """Send bill notification email with PDF attachment"""
+        """Send bill notification email with PDF attachment (from pdf_bytes, else read from pdf_path)"""
 
         subject = f"Bill {bill_id} - {vendor_name}"
 
@@ -125,7 +129,9 @@ Acme Technologies Private Limited
             subject=subject,
             body_text=body_text,
             body_html=body_html,
-            attachment_path=pdf_path
+            attachment_path=pdf_path,
+            attachment_bytes=pdf_bytes,
+            attachment_filename=f"{bill_id}.pdf"
         )
 
     def _send_email_with_attachment(
@@ -134,11 +140,16 @@ Acme Technologies Private Limited
         subject: str,
         body_text: str,
         body_html: str,
-        attachment_path: Optional[str] = None
+        attachment_path: Optional[str] = None,
+        attachment_bytes: Optional[Union[bytes, memoryview]] = None,
+        attachment_filename: Optional[str] = None
     ) -> bool:
         """
         Send email with optional PDF attachment using Gmail SMTP
 
+        The attachment is taken from attachment_bytes when given (no disk
+        read), otherwise read from attachment_path.
+
         Returns True on success, False on failure
         """
         # Create multipart message
@@ -158,15 +169,19 @@ Acme Technologies Private Limited
         msg.attach(msg_body)
 
         # Attach PDF if provided
-        if attachment_path and os.path.exists(attachment_path):
+        if attachment_bytes is None and attachment_path and os.path.exists(attachment_path):
             with open(attachment_path, 'rb') as f:
-                attachment = MIMEApplication(f.read(), _subtype='pdf')
-                attachment.add_header(
-                    'Content-Disposition',
-                    'attachment',
-                    filename=os.path.basename(attachment_path)
-                )
-                msg.attach(attachment)
+                attachment_bytes = f.read()
+        if attachment_bytes is not None:
+            if attachment_filename is None:
+                attachment_filename = os.path.basename(attachment_path) if attachment_path else 'document.pdf'
+            attachment = MIMEApplication(bytes(attachment_bytes), _subtype='pdf')
+            attachment.add_header(
+                'Content-Disposition',
+                'attachment',
+                filename=attachment_filename
+            )
+            msg.attach(attachment)
 
         # Send via Gmail SMTP
         try:
@@ -184,9 +199,11 @@ Acme Technologies Private Limited
         self,
         recipient: str,
         statement_period: str,
-        pdf_path: str
+        pdf_path: Optional[str] = None,
+        pdf_bytes: Optional[Union[bytes, memoryview]] = None,
+        filename: Optional[str] = None
     ) -> bool:
-        """Send bank statement email with PDF attachment"""
+        """Send bank statement email with PDF attachment (from pdf_bytes, else read from pdf_path)"""
 
         subject = f"Bank Statement - {statement_period}"
 
@@ -216,7 +233,64 @@ Acme Technologies Private Limited
             subject=subject,
             body_text=body_text,
             body_html=body_html,
-            attachment_path=pdf_path
+            attachment_path=pdf_path,
+            attachment_bytes=pdf_bytes,
+            attachment_filename=filename
+        )
+
+    def send_document_pack_email(
+        self,
+        recipient: str,
+        period: str,
+        invoice_count: int,
+        bill_count: int,
+        includes_statement: bool = False,
+        pdf_path: Optional[str] = None,
+        pdf_bytes: Optional[Union[bytes, memoryview]] = None,
+        filename: Optional[str] = None
+    ) -> bool:
+        """Send the weekly document pack as one PDF attachment (from pdf_bytes, else read from pdf_path)"""
+
+        subject = f"Weekly Documents - {period}"
+        statement_line = "\n- Bank statement for the last 2 weeks" if includes_statement else ""
+        statement_item = "<li>Bank statement for the last 2 weeks</li>" if includes_statement else ""
+
+        body_text = f"""
+Weekly Documents
+
+Please find attached this week's documents ({period}) in a single PDF:
+- {invoice_count} invoice(s)
+- {bill_count} bill(s){statement_line}
+
+The first page lists every document with its page number.
+
+Acme Technologies Private Limited
+        """.strip()
+
+        body_html = f"""
+<html>
+<body>
+<h3>Weekly Documents</h3>
+<p>Please find attached this week's documents (<strong>{period}</strong>) in a single PDF:</p>
+<ul>
+<li>{invoice_count} invoice(s)</li>
+<li>{bill_count} bill(s)</li>
+{statement_item}
+</ul>
+<p>The first page lists every document with its page number.</p>
+<p><strong>Acme Technologies Private Limited</strong></p>
+</body>
+</html>
+        """.strip()
+
+        return self._send_email_with_attachment(
+            recipient=recipient,
+            subject=subject,
+            body_text=body_text,
+            body_html=body_html,
+            attachment_path=pdf_path,
+            attachment_bytes=pdf_bytes,
+            attachment_filename=filename
         )
 
     def send_pipeline_summary(
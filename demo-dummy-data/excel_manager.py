@@ -4,24 +4,61 @@ Handles reading from and appending to Excel files
 """
 
 import pandas as pd
-from typing import List, Dict
+from typing import List, Dict, Iterable, Optional, Tuple
 import os
 from datetime import datetime
-from openpyxl import load_workbook
-from openpyxl.utils.dataframe import dataframe_to_rows
+from openpyxl import Workbook, load_workbook
+
+
+# Sheets the weekly run reads (parsed together in one pass)
+PIPELINE_SHEETS = ('Entities', 'Invoices_Master', 'Bills_Master', 'Bank_Transactions', 'Recurring_Schedule')
+
+# Parse hints: identifiers stay text instead of being type-inferred cell by cell
+SHEET_DTYPES = {
+    'Entities': {'Entity_ID': str, 'Tax_ID': str, 'ZIP': str},
+    'Invoices_Master': {'Invoice_ID': str, 'Customer_ID': str},
+    'Bills_Master': {'Bill_ID': str, 'Vendor_ID': str},
+    'Bank_Transactions': {'Transaction_ID': str, 'Reference_Number': str},
+    'Recurring_Schedule': {'Vendor_ID': str}
+}
+
+
+def _cell_value(value):
+    """A row field as a value openpyxl writes (datetimes unwrapped, NaN/NaT as empty cells)"""
+    if value is pd.NaT:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def _record_columns(records: List[Dict]) -> List[str]:
+    """Field names across records, in first-seen order"""
+    return list(dict.fromkeys(key for record in records for key in record))
 
 
 class ExcelManager:
     """Manage Excel file operations for the demo pipeline"""
 
-    def __init__(self, excel_path: str):
+    def __init__(self, excel_path: str, compact_rows: int = 0):
         """
         Initialize Excel Manager
 
         Args:
             excel_path: Path to the Excel master file
+            compact_rows: Stage appended rows in a small pending workbook next to
+                the master and fold them in once this many are waiting
+                (0 = append straight into the master)
         """
         self.excel_path = excel_path
+        self.compact_rows = compact_rows
+        self.pending_path = f"{os.path.splitext(excel_path)[0]}_pending.xlsx"
+
+        # Parsed sheets, valid while the master and pending files are unchanged
+        self._sheet_cache: Dict[str, pd.DataFrame] = {}
+        self._cache_stamp: Optional[Tuple] = None
 
         # Verify file exists
         if not os.path.exists(excel_path):
@@ -31,19 +68,76 @@ class ExcelManager:
         """
         Read a sheet from the Excel file
 
+        Served from the parsed-sheet cache while the file is unchanged.
+
         Args:
             sheet_name: Name of the sheet to read
 
         Returns:
-            DataFrame with the sheet data
+            DataFrame with the sheet data (shared with the cache; copy before modifying)
+        """
+        return self.load_sheets([sheet_name])[sheet_name]
+
+    def load_sheets(self, sheet_names: Iterable[str] = PIPELINE_SHEETS,
+                    usecols: Dict[str, object] = None,
+                    dtype: Dict[str, Dict] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Read several sheets, opening and parsing the workbook once
+
+        Rows staged in the pending workbook are included. Sheets already parsed
+        since the files last changed are not read again; any change to them (by
+        this manager or anyone else) drops the cache.
+
+        Args:
+            sheet_names: Sheets to read
+            usecols: Per-sheet columns to parse (pandas usecols; default: all)
+            dtype: Per-sheet column dtypes (default: SHEET_DTYPES)
+
+        Returns:
+            Dict of sheet name to DataFrame (shared with the cache; copy before modifying)
         """
+        sheet_names = list(sheet_names)
+        stamp = (self._file_stamp(self.excel_path), self._file_stamp(self.pending_path))
+        if stamp != self._cache_stamp:
+            self._sheet_cache = {}
+            self._cache_stamp = stamp
+
+        missing = [name for name in sheet_names if name not in self._sheet_cache]
+        if missing:
+            usecols = usecols or {}
+            dtype = SHEET_DTYPES if dtype is None else dtype
+            try:
+                with pd.ExcelFile(self.excel_path) as workbook:
+                    parsed = {name: workbook.parse(name, usecols=usecols.get(name), dtype=dtype.get(name))
+                              for name in missing}
+
+                staged = {}
+                if stamp[1] is not None:
+                    with pd.ExcelFile(self.pending_path) as pending:
+                        staged = {name: pending.parse(name, usecols=usecols.get(name), dtype=dtype.get(name))
+                                  for name in missing if name in pending.sheet_names}
+
+                for name, df in parsed.items():
+                    note = ''
+                    if name in staged:
+                        df = pd.concat([df, staged[name]], ignore_index=True)
+                        note = f" ({len(staged[name])} pending)"
+                    self._sheet_cache[name] = df
+                    print(f"✓ Read {len(df)} rows from {name}{note}")
+            except Exception as e:
+                print(f"✗ Error reading sheets {', '.join(missing)}: {e}")
+                raise
+
+        return {name: self._sheet_cache[name] for name in sheet_names}
+
+    @staticmethod
+    def _file_stamp(path: str) -> Optional[Tuple[int, int]]:
+        """(mtime in ns, size) of a file, None if absent; changes whenever the file is rewritten"""
         try:
-            df = pd.read_excel(self.excel_path, sheet_name=sheet_name)
-            print(f"✓ Read {len(df)} rows from {sheet_name}")
-            return df
-        except Exception as e:
-            print(f"✗ Error reading sheet {sheet_name}: {e}")
-            raise
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
 
     def append_to_sheet(self, sheet_name: str, data: List[Dict]) -> bool:
         """
@@ -56,47 +150,163 @@ class ExcelManager:
         Returns:
             True if successful, False otherwise
         """
-        if not data:
-            print(f"⚠ No data to append to {sheet_name}")
-            return True
-
-        try:
-            # Convert list of dicts to DataFrame
-            new_df = pd.DataFrame(data)
-
-            # Load existing workbook
-            book = load_workbook(self.excel_path)
+        return self.append_rows({sheet_name: data})
 
-            if sheet_name not in book.sheetnames:
-                raise ValueError(f"Sheet {sheet_name} not found in workbook")
+    def append_rows(self, batches: Dict[str, List[Dict]]) -> bool:
+        """
+        Append rows to several sheets in one write
 
-            # Get the sheet
-            sheet = book[sheet_name]
+        With compact_rows set, rows are streamed into the pending workbook
+        (rewritten in full, but it only ever holds the staged rows) and folded
+        into the master once enough are waiting. Otherwise the master is loaded
+        and saved once for all sheets. Either file is replaced in one step, so
+        on failure none of the rows are written.
 
-            # Find the next empty row
-            next_row = sheet.max_row + 1
+        Staged rows count as saved: if folding them into the master fails
+        they stay pending (and in reads) until a later compact() succeeds.
 
-            # Append rows (without header)
-            for r_idx, row in enumerate(dataframe_to_rows(new_df, index=False, header=False), next_row):
-                for c_idx, value in enumerate(row, 1):
-                    # Handle datetime objects
-                    if isinstance(value, pd.Timestamp):
-                        value = value.to_pydatetime()
-                    sheet.cell(row=r_idx, column=c_idx, value=value)
+        Args:
+            batches: Sheet name to list of row dictionaries
 
-            # Save the workbook
-            book.save(self.excel_path)
-            book.close()
+        Returns:
+            True if the rows were written (to the master or the pending
+            workbook), False if none were
+        """
+        for name, rows in batches.items():
+            if not rows:
+                print(f"⚠ No data to append to {name}")
+        batches = {name: rows for name, rows in batches.items() if rows}
+        if not batches:
+            return True
 
-            print(f"✓ Appended {len(data)} rows to {sheet_name}")
+        try:
+            if self.compact_rows:
+                self._check_sheets(batches)
+                pending = self._stage(batches)
+                for name, rows in batches.items():
+                    print(f"✓ Staged {len(rows)} rows for {name}")
+                if pending >= self.compact_rows:
+                    try:
+                        self.compact()
+                    except Exception as e:
+                        print(f"⚠ Could not compact pending rows into the master (kept in "
+                              f"{os.path.basename(self.pending_path)}): {e}")
+            else:
+                self._write_master(batches)
+                for name, rows in batches.items():
+                    print(f"✓ Appended {len(rows)} rows to {name}")
             return True
 
         except Exception as e:
-            print(f"✗ Error appending to sheet {sheet_name}: {e}")
+            print(f"✗ Error appending to {', '.join(batches)}: {e}")
             import traceback
             traceback.print_exc()
             return False
 
+    def compact(self) -> int:
+        """
+        Fold the pending workbook's rows into the master (one load/save)
+
+        Returns:
+            Number of rows moved into the master
+        """
+        if not os.path.exists(self.pending_path):
+            return 0
+
+        batches = {name: [dict(zip(header, row)) for row in rows]
+                   for name, (header, rows) in self._read_pending().items() if rows}
+        if batches:
+            self._write_master(batches)
+        os.remove(self.pending_path)
+
+        moved = sum(len(rows) for rows in batches.values())
+        print(f"✓ Compacted {moved} pending rows into {os.path.basename(self.excel_path)}")
+        return moved
+
+    def _check_sheets(self, batches: Dict[str, List[Dict]]):
+        """Raise ValueError for sheets the master does not have (cached sheets count as known)"""
+        unknown = [name for name in batches if name not in self._sheet_cache]
+        if unknown:
+            sheet_names = self.get_all_sheets()
+            unknown = [name for name in unknown if name not in sheet_names]
+        if unknown:
+            raise ValueError(f"Sheet {', '.join(unknown)} not found in workbook")
+
+    def _read_pending(self) -> Dict[str, Tuple[List, List[tuple]]]:
+        """Staged (header, rows) per sheet, values as stored"""
+        book = load_workbook(self.pending_path, read_only=True)
+        try:
+            staged = {}
+            for sheet in book.worksheets:
+                rows = sheet.iter_rows(values_only=True)
+                header = list(next(rows, ()))
+                staged[sheet.title] = (header, list(rows))
+            return staged
+        finally:
+            book.close()
+
+    def _stage(self, batches: Dict[str, List[Dict]]) -> int:
+        """
+        Add rows to the pending workbook
+
+        Returns:
+            Total rows now pending across all sheets
+        """
+        staged = self._read_pending() if os.path.exists(self.pending_path) else {}
+
+        book = Workbook(write_only=True)
+        pending = 0
+        for name in list(staged) + [name for name in batches if name not in staged]:
+            header, rows = staged.get(name, ([], []))
+            new_rows = batches.get(name, [])
+            columns = header + [column for column in _record_columns(new_rows) if column not in header]
+
+            sheet = book.create_sheet(name)
+            sheet.append(columns)
+            for row in rows:
+                sheet.append(row)
+            for record in new_rows:
+                sheet.append([_cell_value(record.get(column)) for column in columns])
+            pending += len(rows) + len(new_rows)
+
+        self._save(book, self.pending_path)
+        return pending
+
+    def _write_master(self, batches: Dict[str, List[Dict]]):
+        """Append rows to the master's sheets, matched to its header row, in one load/save"""
+        book = load_workbook(self.excel_path)
+        try:
+            missing = [name for name in batches if name not in book.sheetnames]
+            if missing:
+                raise ValueError(f"Sheet {', '.join(missing)} not found in workbook")
+
+            for name, rows in batches.items():
+                sheet = book[name]
+                header = [cell.value for cell in sheet[1]]
+                for column in _record_columns(rows):
+                    if column not in header:
+                        header.append(column)
+                        sheet.cell(row=1, column=len(header), value=column)
+
+                for record in rows:
+                    sheet.append([_cell_value(record.get(column)) if column is not None else None
+                                  for column in header])
+
+            self._save(book, self.excel_path)
+        finally:
+            book.close()
+
+    @staticmethod
+    def _save(book: Workbook, path: str):
+        """Save via a temporary file so a failed write leaves the old file intact"""
+        temp_path = f"{path}.tmp"
+        try:
+            book.save(temp_path)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
     def get_last_row(self, sheet_name: str) -> pd.Series:
         """
         Get the last row from a sheet
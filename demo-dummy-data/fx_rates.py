@@ -0,0 +1,119 @@
+"""
+Komplai Demo Pipeline - FX Rate Series
+Daily USD/INR rates in an array-backed cache with O(1) date lookup
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, Tuple
+
+
+class FXRateSeries:
+    """
+    Daily exchange rates stored as one contiguous array
+
+    Index 0 is start_date and every following slot is the next calendar day,
+    so a lookup is a date subtraction and an array read. Dates outside the
+    series take the nearest end (carry forward / back).
+    """
+
+    def __init__(self, start_date, rates: np.ndarray, pair: str = 'USD/INR'):
+        self.start = np.datetime64(pd.Timestamp(start_date).date(), 'D')
+        self.rates = np.asarray(rates, dtype=np.float64)
+        self.pair = pair
+
+        if len(self.rates) == 0:
+            raise ValueError("FX rate series needs at least one rate")
+
+    def __len__(self) -> int:
+        return len(self.rates)
+
+    @property
+    def end(self) -> np.datetime64:
+        return self.start + np.timedelta64(len(self.rates) - 1, 'D')
+
+    def rate_on(self, date) -> float:
+        """Get the rate for a single date"""
+        offset = (np.datetime64(pd.Timestamp(date).date(), 'D') - self.start).astype(np.int64)
+        return float(self.rates[min(max(int(offset), 0), len(self.rates) - 1)])
+
+    def rates_on(self, dates) -> np.ndarray:
+        """Get rates for a whole column of dates at once"""
+        days = pd.to_datetime(pd.Series(dates), errors='coerce').to_numpy().astype('datetime64[D]')
+        offsets = (days - self.start).astype(np.int64)
+        return self.rates[np.clip(offsets, 0, len(self.rates) - 1)]
+
+    @classmethod
+    def flat(cls, rate: float, start_date, end_date) -> 'FXRateSeries':
+        """Constant rate over the range"""
+        days = (pd.Timestamp(end_date) - pd.Timestamp(start_date)).days + 1
+        return cls(start_date, np.full(max(days, 1), rate))
+
+    @classmethod
+    def synthetic(cls, base_rate: float, start_date, end_date,
+                  daily_volatility: float, seed: int) -> 'FXRateSeries':
+        """Deterministic random walk in log space starting at base_rate"""
+        days = max((pd.Timestamp(end_date) - pd.Timestamp(start_date)).days + 1, 1)
+        rng = np.random.default_rng(seed)
+        log_returns = rng.normal(0.0, daily_volatility, days)
+        log_returns[0] = 0.0
+        return cls(start_date, np.round(base_rate * np.exp(np.cumsum(log_returns)), 4))
+
+    @classmethod
+    def from_csv(cls, path: str, date_column: str = 'Date', rate_column: str = 'Rate') -> 'FXRateSeries':
+        """
+        Load published rates (one row per business day) onto a daily grid
+
+        Weekends and holidays carry the previous published rate forward.
+        """
+        df = pd.read_csv(path, usecols=[date_column, rate_column], parse_dates=[date_column])
+        daily = df.set_index(date_column)[rate_column].sort_index()
+        daily = daily[~daily.index.duplicated(keep='last')].asfreq('D').ffill()
+        return cls(daily.index[0], daily.to_numpy())
+
+
+# Series are built once per process and shared by every generator
+_SERIES_CACHE: Dict[Tuple, FXRateSeries] = {}
+
+
+def load_fx_rates(config: Dict) -> FXRateSeries:
+    """
+    Get the USD/INR series described by config (cached per process)
+
+    Uses fx.rates_path if set, otherwise a seeded random walk around
+    pipeline.base_exchange_rate. With no fx section the rate is flat at the
+    base rate, matching the old single-rate behaviour.
+    """
+    base_rate = config.get('pipeline', {}).get('base_exchange_rate', 85.0)
+    fx = config.get('fx') or {}
+
+    key = (
+        base_rate,
+        fx.get('rates_path'),
+        str(fx.get('start_date', '2024-01-01')),
+        str(fx.get('end_date', '2030-12-31')),
+        fx.get('daily_volatility', 0.0),
+        fx.get('seed', 0)
+    )
+    if key not in _SERIES_CACHE:
+        rates_path, start_date, end_date, volatility, seed = key[1:]
+        if rates_path:
+            series = FXRateSeries.from_csv(rates_path)
+        elif volatility:
+            series = FXRateSeries.synthetic(base_rate, start_date, end_date, volatility, seed)
+        else:
+            series = FXRateSeries.flat(base_rate, start_date, end_date)
+        _SERIES_CACHE[key] = series
+
+    return _SERIES_CACHE[key]
+
+
+if __name__ == "__main__":
+    series = load_fx_rates({
+        'pipeline': {'base_exchange_rate': 85.0},
+        'fx': {'daily_volatility': 0.002, 'seed': 7}
+    })
+    print(f"{series.pair}: {len(series)} days from {series.start} to {series.end}")
+    for day in [datetime(2026, 1, 5), datetime(2026, 6, 1), datetime(2035, 1, 1)]:
+        print(f"  {day.date()}: {series.rate_on(day):.4f}")
@@ -3,8 +3,8 @@ Komplai Demo Pipeline - Invoice Generator
 Generates customer invoices with deferred revenue handling
 """
 
+import numpy as np
 import pandas as pd
-import random
 from datetime import datetime, timedelta
 from typing import Dict, List
 import sys
@@ -12,18 +12,15 @@ sys.path.append('/home/user/demo-dummy-data')
 
 from utils import (
     generate_invoice_id,
-    set_seed,
     format_date_for_service_period,
-    calculate_igst,
-    calculate_sales_tax,
-    calculate_withholding_tax,
-    generate_hsn_sac_code,
     apply_variance,
-    extract_service_period,
-    is_deferred_revenue,
-    calculate_monthly_amount,
-    format_indian_date
+    calculate_monthly_amount
 )
+from money import to_minor, from_minor, round_money, to_minor_array, from_minor_array
+from tax_rules import load_tax_rules
+from fx_rates import load_fx_rates
+from business_calendar import BusinessCalendar
+from rng import RNGFactory, randint, uniform, choice, choices
 
 
 class InvoiceGenerator:
@@ -32,7 +29,10 @@ class InvoiceGenerator:
     def __init__(self, entities_df: pd.DataFrame, config: Dict):
         self.entities = entities_df
         self.config = config
-        self.exchange_rate = config['pipeline']['base_exchange_rate']
+        self.fx_rates = load_fx_rates(config)
+        self.calendar = BusinessCalendar.from_config(config)
+        self.rng_factory = RNGFactory.from_config(config)
+        self.tax_rules = load_tax_rules(config)
         
         # Get customers only
         self.customers = entities_df[entities_df['Entity_Type'] == 'Customer'].copy()
@@ -75,8 +75,8 @@ class InvoiceGenerator:
             last_invoices: Existing invoices dataframe
             count: Number of invoices to generate (default 2)
         """
-        # Set seed for deterministic randomness
-        set_seed(run_date)
+        # Own random stream for this week's invoices (independent of bills/bank)
+        rng = self.rng_factory.stream(run_date, 'invoices')
 
         # Get next invoice sequence number
         start_seq = 1
@@ -96,24 +96,61 @@ class InvoiceGenerator:
         invoices = []
 
         # Select customers weighted by transaction value
-        selected_customers = self._select_customers(count)
+        selected_customers = self._select_customers(count, rng)
 
         for i, customer in enumerate(selected_customers):
             # Generate invoice for PREVIOUS week (run_date - 7 to run_date - 1)
             # Random day in the previous week
-            days_back = random.randint(1, 7)
+            days_back = randint(rng, 1, 7)
             invoice_date = run_date - timedelta(days=days_back)
 
             invoice = self._create_invoice(
                 customer=customer,
                 invoice_date=invoice_date,
-                sequence=start_seq + i
+                sequence=start_seq + i,
+                rng=rng
             )
             invoices.append(invoice)
 
+        # Tax and totals for the whole batch from the compiled rule tables
+        self._apply_taxes(invoices)
+
+        # Due dates on a weekend or bank holiday move to the next business day
+        due_dates = self.calendar.roll([invoice['Due_Date'] for invoice in invoices], 'following')
+        for invoice, due_date in zip(invoices, due_dates.to_pydatetime()):
+            invoice['Due_Date'] = due_date
+
         return invoices
     
-    def _select_customers(self, count: int) -> List[pd.Series]:
+    def _apply_taxes(self, invoices: List[Dict]):
+        """
+        Fill Tax_Amount, Total_Amount and deferral amounts for a batch in place
+
+        Tax is evaluated over the whole batch's columns by the rule engine and
+        totals are summed in paise.
+        """
+        if not invoices:
+            return
+
+        batch = pd.DataFrame({
+            'Currency': [invoice['Currency'] for invoice in invoices],
+            'Subtotal': [invoice['Subtotal'] for invoice in invoices],
+            'Tax_Rate': [invoice['Tax_Rate'] for invoice in invoices]
+        })
+        taxes = self.tax_rules.evaluate_indirect(batch['Currency'], batch['Subtotal'], batch['Tax_Rate'])
+        totals = from_minor_array(to_minor_array(batch['Subtotal']) + to_minor_array(taxes['Tax_Amount']))
+
+        for invoice, tax_type, tax_amount, total_amount in zip(
+                invoices, taxes['Tax_Type'], taxes['Tax_Amount'].tolist(), totals.tolist()):
+            invoice['Tax_Type'] = tax_type
+            invoice['Tax_Amount'] = tax_amount
+            invoice['Total_Amount'] = total_amount
+            if invoice['Is_Deferred']:
+                service_period = (invoice['Deferral_Start_Date'], invoice['Deferral_End_Date'])
+                invoice['Monthly_Recognition_Amount'] = calculate_monthly_amount(total_amount, service_period)
+                invoice['Remaining_Deferred_Balance'] = total_amount
+    
+    def _select_customers(self, count: int, rng: np.random.Generator) -> List[pd.Series]:
         """Select customers based on weighted probability (without replacement)"""
         # Weight by average transaction value, but cap to prevent dominance
         raw_weights = self.customers['Average_Transaction_Value'].fillna(50000).tolist()
@@ -128,57 +165,34 @@ class InvoiceGenerator:
         normalized_weights = [w / total_weight for w in capped_weights]
 
         # Select customers WITHOUT replacement (each customer only once per batch)
-        customer_indices = list(range(len(self.customers)))
-        selected_indices = []
-        remaining_indices = customer_indices.copy()
-        remaining_weights = normalized_weights.copy()
-
-        for _ in range(min(count, len(self.customers))):
-            # Select one customer
-            chosen = random.choices(remaining_indices, weights=remaining_weights, k=1)[0]
-            selected_indices.append(chosen)
-
-            # Remove from pool
-            idx = remaining_indices.index(chosen)
-            remaining_indices.pop(idx)
-            remaining_weights.pop(idx)
-
-            # Re-normalize remaining weights
-            if remaining_weights:
-                total = sum(remaining_weights)
-                remaining_weights = [w / total for w in remaining_weights]
+        selected_indices = rng.choice(
+            len(self.customers), size=min(count, len(self.customers)), replace=False, p=normalized_weights
+        ).tolist()
 
         return [self.customers.iloc[idx] for idx in selected_indices]
     
     def _create_invoice(self, customer: pd.Series, 
                        invoice_date: datetime, 
-                       sequence: int) -> Dict:
-        """Create a single invoice with all line items and calculations"""
+                       sequence: int,
+                       rng: np.random.Generator) -> Dict:
+        """Create a single invoice with all line items (tax and totals are filled in by _apply_taxes)"""
         
         invoice_id = generate_invoice_id(invoice_date, sequence)
         
         # Determine line item count (weighted towards 1-2 items)
-        line_item_count = random.choices([1, 2, 3], weights=[0.6, 0.3, 0.1])[0]
+        line_item_count = choices(rng, [1, 2, 3], weights=[0.6, 0.3, 0.1])[0]
         
         # Generate line items
-        line_items = self._generate_line_items(customer, invoice_date, line_item_count)
+        line_items = self._generate_line_items(customer, invoice_date, line_item_count, rng)
         
-        # Calculate subtotal
-        subtotal = sum([item['amount'] for item in line_items])
+        # Calculate subtotal (summed in paise so it matches the line items exactly)
+        subtotal_minor = sum(to_minor(item['amount']) for item in line_items)
+        subtotal = from_minor(subtotal_minor)
         
-        # Apply tax based on currency
-        if customer['Currency'] == 'INR':
-            tax_type = 'IGST'
-            tax_rate = 0.18
-            tax_amount = calculate_igst(subtotal, tax_rate)
-        else:  # USD
-            tax_type = 'Sales Tax'
-            # State-specific rates (simplified)
-            tax_rate = random.choice([0.04, 0.06, 0.08])
-            tax_amount = calculate_sales_tax(subtotal, tax_rate)
-        
-        # Calculate total
-        total_amount = subtotal + tax_amount
+        # Tax rate by currency (USD picks a state sales tax rate); the tax
+        # itself and the total are computed for the whole batch in _apply_taxes
+        tax_type, tax_rates = self.tax_rules.indirect_tax(customer['Currency'])
+        tax_rate = tax_rates[0] if len(tax_rates) == 1 else choice(rng, tax_rates)
         
         # Determine payment terms
         payment_terms = customer.get('Payment_Terms', 'Net 30')
@@ -198,14 +212,15 @@ class InvoiceGenerator:
             deferred_item = [item for item in line_items if item.get('is_deferred')][0]
             service_period = deferred_item['service_period']
             
+            # Recognition amounts follow from the total (set in _apply_taxes)
             deferral_data = {
                 'Is_Deferred': True,
                 'Deferral_Start_Date': service_period[0],
                 'Deferral_End_Date': service_period[1],
                 'Deferral_Period_Months': self._calculate_months_between(service_period[0], service_period[1]),
-                'Monthly_Recognition_Amount': calculate_monthly_amount(total_amount, service_period),
+                'Monthly_Recognition_Amount': 0.0,
                 'Recognized_To_Date': 0.0,
-                'Remaining_Deferred_Balance': total_amount
+                'Remaining_Deferred_Balance': 0.0
             }
         else:
             deferral_data = {
@@ -227,14 +242,14 @@ class InvoiceGenerator:
             'Customer_Address': self._format_address(customer),
             'Customer_Tax_ID': customer['Tax_ID'],
             'Currency': customer['Currency'],
-            'Exchange_Rate': self.exchange_rate if customer['Currency'] == 'USD' else 1.0,
+            'Exchange_Rate': self.fx_rates.rate_on(invoice_date) if customer['Currency'] == 'USD' else 1.0,
             'Due_Date': due_date,
             'Line_Item_Count': line_item_count,
             'Subtotal': subtotal,
             'Tax_Type': tax_type,
             'Tax_Rate': tax_rate,
-            'Tax_Amount': tax_amount,
-            'Total_Amount': total_amount,
+            'Tax_Amount': 0.0,
+            'Total_Amount': subtotal,
             'Notes': self._generate_notes(customer, is_deferred),
             'PDF_Generated': False,
             'PDF_Path': None,
@@ -265,7 +280,8 @@ class InvoiceGenerator:
     
     def _generate_line_items(self, customer: pd.Series, 
                             invoice_date: datetime,
-                            count: int) -> List[Dict]:
+                            count: int,
+                            rng: np.random.Generator) -> List[Dict]:
         """Generate line items for invoice"""
         line_items = []
         industry = customer.get('Industry', 'Technology')
@@ -277,17 +293,17 @@ class InvoiceGenerator:
         base_amount = customer.get('Average_Transaction_Value', 100000)
         
         # 70% chance of deferred revenue for first line item
-        include_deferred = random.random() < 0.7
+        include_deferred = rng.random() < 0.7
         
         for i in range(count):
             # Select service template
-            template = random.choice(templates)
+            template = choice(rng, templates)
             
             # Personalize template
             if '{phase}' in template:
-                template = template.format(phase=random.randint(1, 3))
+                template = template.format(phase=randint(rng, 1, 3))
             elif '{plan}' in template:
-                template = template.format(plan=random.choice(['Growth Plan', 'Enterprise Plan', 'Professional Plan']))
+                template = template.format(plan=choice(rng, ['Growth Plan', 'Enterprise Plan', 'Professional Plan']))
             
             # Determine if this line item is deferred
             item_is_deferred = include_deferred and i == 0
@@ -295,7 +311,7 @@ class InvoiceGenerator:
             # Generate service period for deferred items
             if item_is_deferred:
                 # Multi-month service period
-                months = random.choice([3, 6, 12])
+                months = choice(rng, [3, 6, 12])
                 start_date = invoice_date
                 end_date = start_date + timedelta(days=30 * months)
                 
@@ -305,9 +321,9 @@ class InvoiceGenerator:
                 service_period = (start_date, end_date)
             else:
                 # Short-term or one-time service
-                if random.random() < 0.3:  # 30% have service period
+                if rng.random() < 0.3:  # 30% have service period
                     start_date = invoice_date
-                    end_date = invoice_date + timedelta(days=random.choice([15, 30]))
+                    end_date = invoice_date + timedelta(days=choice(rng, [15, 30]))
                     service_period_str = f" (Service Period: {format_date_for_service_period(start_date, end_date)})"
                     description = template + service_period_str
                     service_period = (start_date, end_date)
@@ -321,17 +337,17 @@ class InvoiceGenerator:
             else:
                 # Distribute amount across line items
                 if i == 0:
-                    amount = base_amount * random.uniform(0.6, 0.8)
+                    amount = base_amount * uniform(rng, 0.6, 0.8)
                 else:
-                    amount = base_amount * random.uniform(0.1, 0.3)
+                    amount = base_amount * uniform(rng, 0.1, 0.3)
             
             # Apply slight variance
-            amount = apply_variance(amount, 0.05)
+            amount = apply_variance(amount, 0.05, rng)
             
             # Determine quantity and rate
             if 'Hours' in template or 'Support' in template:
-                quantity = random.randint(5, 20)
-                rate = round(amount / quantity, 2)
+                quantity = randint(rng, 5, 20)
+                rate = round_money(amount / quantity)
             else:
                 quantity = 1
                 rate = amount
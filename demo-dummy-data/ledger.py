@@ -0,0 +1,119 @@
+"""
+Komplai Demo Pipeline - Ledger Utilities
+Columnar bank transaction builder with vectorized running balances
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Tuple, Union
+
+from money import to_minor, to_minor_array, from_minor_array
+
+
+BANK_TRANSACTION_COLUMNS = [
+    'Transaction_ID',
+    'Transaction_Date',
+    'Description',
+    'Reference_Number',
+    'Entity_Name',
+    'Transaction_Type',
+    'Currency',
+    'Debit',
+    'Credit',
+    'Running_Balance',
+    'Bank_Account',
+    'Reconciliation_Status',
+    'Notes'
+]
+
+
+def compute_running_balance(credits, debits, opening_balance: float) -> np.ndarray:
+    """
+    Compute running balances with a single cumulative sum over signed amounts
+
+    The sum runs over int64 paise, so balances are exact however many
+    transactions accumulate (a float cumsum drifts by fractions of a paisa).
+
+    Returns:
+        Balance after each transaction, to the paisa
+    """
+    signed = to_minor_array(credits) - to_minor_array(debits)
+    if len(signed):
+        signed[0] += to_minor(opening_balance)
+    return from_minor_array(np.cumsum(signed))
+
+
+class TransactionLedger:
+    """
+    Collect bank transactions column-wise, then sort once and balance once
+
+    Generators add rows without tracking balances; `build` orders them by
+    (Transaction_Date, Transaction_ID) and fills Running_Balance in one pass.
+    """
+
+    def __init__(self, columns: List[str] = None):
+        self.columns = columns or BANK_TRANSACTION_COLUMNS
+        self._data: Dict[str, List] = {col: [] for col in self.columns}
+
+    def __len__(self) -> int:
+        return len(self._data['Transaction_ID'])
+
+    def add(self, txn: Dict):
+        """Add a single transaction (missing columns are stored as None)"""
+        for col in self.columns:
+            self._data[col].append(txn.get(col))
+
+    def extend(self, txns: List[Dict]):
+        """Add several transactions"""
+        for txn in txns:
+            self.add(txn)
+
+    def build(self, opening_balance: Union[float, Dict[str, float]]
+              ) -> Tuple[List[Dict], Union[float, Dict[str, float]]]:
+        """
+        Sort transactions chronologically and compute running balances
+
+        Args:
+            opening_balance: Balance before the first transaction, or a dict of
+                             opening balances per Bank_Account (each account is
+                             then balanced separately, in its own currency)
+
+        Returns:
+            (transactions, closing_balance) - closing balances are a dict per
+            account when opening balances were given per account
+        """
+        per_account = isinstance(opening_balance, dict)
+
+        if len(self) == 0:
+            return [], (dict(opening_balance) if per_account else opening_balance)
+
+        dates = pd.to_datetime(pd.Series(self._data['Transaction_Date'], dtype=object)).to_numpy()
+        ids = np.asarray(self._data['Transaction_ID'], dtype=str)
+        order = np.lexsort((ids, dates))
+
+        credits = np.asarray(self._data['Credit'], dtype=np.float64)[order]
+        debits = np.asarray(self._data['Debit'], dtype=np.float64)[order]
+
+        columns = {col: [values[i] for i in order] for col, values in self._data.items()}
+
+        if per_account:
+            # One cumulative sum per account over that account's rows, still in
+            # statement order; there are only ever a handful of accounts
+            accounts = np.asarray(columns['Bank_Account'], dtype=object)
+            balances = np.empty(len(order), dtype=np.float64)
+            closing = dict(opening_balance)
+            for account in pd.unique(accounts):
+                mask = accounts == account
+                account_balances = compute_running_balance(
+                    credits[mask], debits[mask], closing.get(account, 0.0)
+                )
+                balances[mask] = account_balances
+                closing[account] = float(account_balances[-1])
+        else:
+            balances = compute_running_balance(credits, debits, opening_balance)
+            closing = float(balances[-1])
+
+        columns['Running_Balance'] = balances.tolist()
+
+        transactions = [dict(zip(columns, row)) for row in zip(*columns.values())]
+        return transactions, closing
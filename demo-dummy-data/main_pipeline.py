@@ -6,16 +6,19 @@ Coordinates all components to generate weekly demo data
 import yaml
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict
+from typing import Dict, List, Optional
 import sys
 import os
 
 # Import all modules
-from excel_manager import ExcelManager
+from excel_manager import ExcelManager, PIPELINE_SHEETS
 from sheets_manager import SheetsManager
 from invoice_generator import InvoiceGenerator
 from bill_generator import BillGenerator
 from bank_generator import BankTransactionGenerator
+from bank_state import BankTailState
+from document_index import BankStatementIndex
+from validation_engine import ValidationEngine
 from pdf_generator import PDFGenerator
 from email_sender import GmailEmailSender
 
@@ -50,7 +53,8 @@ class DemoPipeline:
             if not os.path.exists(excel_path):
                 excel_path = "Komplai_Demo_Master (Claude).xlsx"
 
-            self.excel = ExcelManager(excel_path)
+            self.excel = ExcelManager(excel_path,
+                                      compact_rows=self.config['data_sources'].get('excel_compact_rows', 0))
             print(f"✓ Excel Manager: {excel_path}")
         else:
             self.excel = None
@@ -73,12 +77,38 @@ class DemoPipeline:
             if self.cloud_mode:
                 raise Exception("Cloud mode requires Google Sheets to be enabled")
 
+        # Bank generator and statement index are kept across runs so their indexes stay warm
+        self.bank_gen = BankTransactionGenerator(self.config)
+        self.statement_index = BankStatementIndex()
+
+        # Tail state (last balance/sequence) saves reading back bank history
+        self.bank_state_path = self.config['data_sources'].get('bank_state_path', './output/bank_tail_state.json')
+        self.bank_state = BankTailState.load(self.bank_state_path)
+        if self.bank_state:
+            print(f"✓ Bank tail state: {self.bank_state_path} (last TXN{self.bank_state.last_sequence:08d})")
+
         # PDF Generator (optional - may fail on Mac without GTK libraries)
         try:
             output_dir = self.config.get('output', {}).get('base_dir', './output')
-            self.pdf_gen = PDFGenerator(output_dir=f"{output_dir}/pdfs")
+            templates = self.config.get('templates', {})
+            pdf_config = self.config.get('pdf', {})
+            self.pdf_gen = PDFGenerator(
+                template_dir=templates.get('template_dir'),
+                output_dir=f"{output_dir}/pdfs",
+                bytecode_cache_dir=templates.get('bytecode_cache_dir'),
+                template_names={kind: templates[f'{kind}_template']
+                                for kind in ('invoice', 'bill', 'statement', 'statement_pages', 'pack')
+                                if f'{kind}_template' in templates},
+                cache_dir=pdf_config.get('cache_dir'),
+                cache_max_bytes=int(pdf_config.get('cache_max_mb', 512) * 1024 * 1024),
+                statement_pages_per_batch=pdf_config.get('statement_pages_per_batch', 20),
+                engine=pdf_config.get('engine', 'auto')
+            )
+            self.pdf_workers = pdf_config.get('workers')
+            self.persist_pdfs = pdf_config.get('persist', True)
+            self.pdf_output = pdf_config.get('output', 'documents')
             self.pdf_enabled = True
-            print(f"✓ PDF Generator: {output_dir}/pdfs")
+            print(f"✓ PDF Generator: {output_dir}/pdfs ({self.pdf_gen.engine} engine)")
         except Exception as e:
             print(f"⚠ PDF Generator disabled: {e}")
             print(f"  (Pipeline will still generate data and save to Excel)")
@@ -133,18 +163,24 @@ class DemoPipeline:
                 bank = self.sheets.read_sheet('Bank_Transactions')
                 recurring = self.sheets.read_sheet('Recurring_Schedule')
             else:
-                # Read from Excel in local mode
-                entities = self.excel.read_sheet('Entities')
-                invoices = self.excel.read_sheet('Invoices_Master')
-                bills = self.excel.read_sheet('Bills_Master')
-                bank = self.excel.read_sheet('Bank_Transactions')
-                recurring = self.excel.read_sheet('Recurring_Schedule')
+                # Read from Excel in local mode (one pass over the workbook)
+                sheets = self.excel.load_sheets(PIPELINE_SHEETS)
+                entities = sheets['Entities']
+                invoices = sheets['Invoices_Master']
+                bills = sheets['Bills_Master']
+                bank = sheets['Bank_Transactions']
+                recurring = sheets['Recurring_Schedule']
+
+            # Batch validation of each generated sheet (policy from pipeline.validation)
+            validator = ValidationEngine(self.config, entities)
 
             # Step 2: Generate invoices
             print(f"\n[Step 2/7] Generating invoices...")
             inv_gen = InvoiceGenerator(entities, self.config)
             invoices_per_week = self.config['pipeline']['invoices_per_week']
             new_invoices = inv_gen.generate_weekly_invoices(run_date, invoices, count=invoices_per_week)
+            new_invoices = validator.apply('Invoices_Master', new_invoices,
+                                           existing_ids=self._existing_ids(invoices, 'Invoice_ID'))
             results['invoices_generated'] = len(new_invoices)
             print(f"✓ Generated {len(new_invoices)} invoices")
 
@@ -153,30 +189,57 @@ class DemoPipeline:
             bill_gen = BillGenerator(entities, recurring, self.config)
             bills_per_week = self.config['pipeline']['bills_per_week']
             new_bills = bill_gen.generate_weekly_bills(run_date, bills, count=bills_per_week)
+            new_bills = validator.apply('Bills_Master', new_bills,
+                                        existing_ids=self._existing_ids(bills, 'Bill_ID'))
             results['bills_generated'] = len(new_bills)
             print(f"✓ Generated {len(new_bills)} bills")
 
             # Step 4: Generate bank transactions
             print(f"\n[Step 4/7] Generating bank transactions...")
-            bank_gen = BankTransactionGenerator(self.config)
-            all_invoices = pd.concat([invoices, pd.DataFrame(new_invoices)], ignore_index=True)
-            all_bills = pd.concat([bills, pd.DataFrame(new_bills)], ignore_index=True)
-
+            bank_gen = self.bank_gen
+            if self.bank_state is None:
+                # First run without saved state: bootstrap once from history
+                self.bank_state = BankTailState.from_transactions(self.bank_state_path, bank)
+            elif not self.bank_state.matches(bank):
+                print("  ⚠ Bank tail state does not match Bank_Transactions, rebuilding from history")
+                self.bank_state = BankTailState.from_transactions(self.bank_state_path, bank)
+            self.statement_index.sync(bank)
+
+            # The generator indexes only the saved masters; this week's documents
+            # are passed separately so a failed save cannot leave them indexed
             new_transactions, ending_balance = bank_gen.generate_weekly_bank_statement(
-                run_date, all_invoices, all_bills, bank
+                run_date, invoices, bills, bank, tail_state=self.bank_state,
+                new_invoices=new_invoices, new_bills=new_bills
             )
+            validator.apply('Bank_Transactions', new_transactions,
+                            existing_ids=self._existing_ids(bank, 'Transaction_ID'),
+                            opening_balances=bank_gen.opening_balances)
             results['transactions_generated'] = len(new_transactions)
             print(f"✓ Generated {len(new_transactions)} transactions")
             print(f"  Ending Balance: ₹{ending_balance:,.2f}")
+            for account, balance in bank_gen.closing_balances.items():
+                if account != bank_gen.bank_account:
+                    print(f"  {account}: {balance:,.2f}")
 
             # Step 5: Save data
             print(f"\n[Step 5/7] Saving data...")
 
+            bank_saved = False
+
             if not self.cloud_mode and self.excel:
-                # Save to Excel in local mode
-                self.excel.append_to_sheet('Invoices_Master', new_invoices)
-                self.excel.append_to_sheet('Bills_Master', new_bills)
-                self.excel.append_to_sheet('Bank_Transactions', new_transactions)
+                # Save to Excel in local mode (one write for all three sheets)
+                bank_saved = self.excel.append_rows({
+                    'Invoices_Master': new_invoices,
+                    'Bills_Master': new_bills,
+                    'Bank_Transactions': new_transactions
+                })
+                if not bank_saved:
+                    # Nothing was written; retry per sheet so a failing invoice
+                    # or bill sheet does not hold back the bank rows
+                    print("  ⚠ Combined Excel write failed; saving each sheet separately")
+                    self.excel.append_to_sheet('Invoices_Master', new_invoices)
+                    self.excel.append_to_sheet('Bills_Master', new_bills)
+                    bank_saved = self.excel.append_to_sheet('Bank_Transactions', new_transactions)
                 print(f"✓ Saved to Excel")
 
             if self.sheets_enabled:
@@ -184,57 +247,103 @@ class DemoPipeline:
                     print(f"  Syncing to Google Sheets...")
                     self.sheets.append_to_sheet('Invoices_Master', new_invoices)
                     self.sheets.append_to_sheet('Bills_Master', new_bills)
-                    self.sheets.append_to_sheet('Bank_Transactions', new_transactions)
+                    synced = self.sheets.append_to_sheet('Bank_Transactions', new_transactions)
+                    # Sheets is the system of record in cloud mode
+                    if self.cloud_mode:
+                        bank_saved = synced
                     print(f"  ✓ Synced to Google Sheets")
                 except Exception as e:
                     print(f"  ⚠ Google Sheets sync failed: {e}")
                     results['errors'].append(f"Sheets sync: {e}")
 
+            # Advance the tail state and settle documents only once the transactions are persisted
+            if bank_saved:
+                bank_gen.settle_documents(new_transactions)
+                self.bank_state.record(new_transactions)
+                self.bank_state.save()
+                self.statement_index.append(new_transactions)
+            else:
+                self.bank_state = None
+
             # Step 6: Generate PDFs (if enabled)
             generated_invoice_pdfs = []
             generated_bill_pdfs = []
+            pack = None
 
-            if self.pdf_enabled:
-                print(f"\n[Step 6/7] Generating PDFs...")
-                pdf_count = 0
-                output_dir = self.config.get('output', {}).get('base_dir', './output')
+            # Biweekly bank statement (every 2nd week based on ISO week number)
+            week_num = run_date.isocalendar()[1]
+            is_biweekly = (week_num % 2 == 0)
 
-                for invoice in new_invoices:
-                    try:
-                        pdf_data = self._prepare_invoice_pdf_data(invoice)
-                        filename = f"{invoice['Invoice_ID']}.pdf"
-                        self.pdf_gen.generate_invoice_pdf(pdf_data, filename)
-                        pdf_path = os.path.join(output_dir, 'pdfs', filename)
-                        generated_invoice_pdfs.append((invoice, pdf_path))
-                        pdf_count += 1
-                    except Exception as e:
-                        print(f"  ⚠ Failed PDF for {invoice['Invoice_ID']}: {e}")
-                        results['errors'].append(f"Invoice PDF {invoice['Invoice_ID']}: {e}")
+            if self.pdf_enabled and self.pdf_output == 'pack':
+                print("\n[Step 6/7] Generating weekly PDF pack...")
+                try:
+                    pack = self._generate_weekly_pack(run_date, new_invoices, new_bills, include_statement=is_biweekly)
+                except Exception as e:
+                    print(f"  ⚠ Failed weekly pack: {e}")
+                    results['errors'].append(f"Weekly pack: {e}")
+                results['pdfs_generated'] = 1 if pack else 0
+            elif self.pdf_enabled:
+                print(f"\n[Step 6/7] Generating PDFs...")
+                documents = [('invoice', invoice['Invoice_ID'], invoice) for invoice in new_invoices] + \
+                            [('bill', bill['Bill_ID'], bill) for bill in new_bills]
+                jobs = [{
+                    'kind': kind,
+                    'data': self._prepare_invoice_pdf_data(document) if kind == 'invoice'
+                            else self._prepare_bill_pdf_data(document)
+                } for kind, document_id, document in documents]
+
+                # Rendered to bytes across worker processes (results in job order);
+                # the bytes go straight to the email, the disk copy is written in the background
+                rendered = self.pdf_gen.render_many(jobs, workers=self.pdf_workers, return_bytes=True)
 
-                for bill in new_bills:
-                    try:
-                        pdf_data = self._prepare_bill_pdf_data(bill)
-                        filename = f"{bill['Bill_ID']}.pdf"
-                        self.pdf_gen.generate_bill_pdf(pdf_data, filename)
-                        pdf_path = os.path.join(output_dir, 'pdfs', filename)
-                        generated_bill_pdfs.append((bill, pdf_path))
-                        pdf_count += 1
-                    except Exception as e:
-                        print(f"  ⚠ Failed PDF for {bill['Bill_ID']}: {e}")
-                        results['errors'].append(f"Bill PDF {bill['Bill_ID']}: {e}")
+                pdf_count = 0
+                for (kind, document_id, document), result in zip(documents, rendered):
+                    if result['error']:
+                        print(f"  ⚠ Failed PDF for {document_id}: {result['error']}")
+                        results['errors'].append(f"{kind.title()} PDF {document_id}: {result['error']}")
+                        continue
+                    pdf_path = None
+                    if self.persist_pdfs:
+                        pdf_path = self.pdf_gen.sink.write(f"{document_id}.pdf", result['pdf_bytes'])
+                    generated = generated_invoice_pdfs if kind == 'invoice' else generated_bill_pdfs
+                    generated.append((document, pdf_path, result['pdf_bytes']))
+                    pdf_count += 1
 
                 results['pdfs_generated'] = pdf_count
-                print(f"✓ Generated {pdf_count} PDFs")
+                cached = sum(1 for result in rendered if result['cached'])
+                print(f"✓ Generated {pdf_count} PDFs ({cached} reused from cache)")
             else:
                 print(f"\n[Step 6/7] Skipping PDF generation (not available)")
                 results['pdfs_generated'] = 0
 
             # Step 7: Send emails with PDFs (if enabled)
-            if self.email_enabled and (generated_invoice_pdfs or generated_bill_pdfs):
+            if self.email_enabled and pack:
+                print("\n[Step 7/7] Sending weekly pack...")
+                success = False
+                try:
+                    success = self.email_sender.send_document_pack_email(
+                        recipient=self.recipient_email,
+                        period=pack['period'],
+                        invoice_count=len(new_invoices),
+                        bill_count=len(new_bills),
+                        includes_statement=pack['includes_statement'],
+                        pdf_path=pack['path'],
+                        pdf_bytes=pack['pdf_bytes'],
+                        filename=pack['filename']
+                    )
+                except Exception as e:
+                    print(f"  ⚠ Failed weekly pack email: {e}")
+                    results['errors'].append(f"Weekly pack email: {e}")
+
+                results['emails_sent'] = 1 if success else 0
+                if success:
+                    results['bank_statement_sent'] = pack['includes_statement']
+                    print(f"✓ Sent weekly pack to {self.recipient_email}")
+            elif self.email_enabled and (generated_invoice_pdfs or generated_bill_pdfs):
                 print(f"\n[Step 7/7] Sending emails...")
                 email_count = 0
 
-                for invoice, pdf_path in generated_invoice_pdfs:
+                for invoice, pdf_path, pdf_bytes in generated_invoice_pdfs:
                     try:
                         success = self.email_sender.send_invoice_email(
                             recipient=self.recipient_email,
@@ -242,7 +351,8 @@ class DemoPipeline:
                             customer_name=invoice['Customer_Name'],
                             amount=invoice['Total_Amount'],
                             currency=invoice['Currency'],
-                            pdf_path=pdf_path
+                            pdf_path=pdf_path,
+                            pdf_bytes=pdf_bytes
                         )
                         if success:
                             email_count += 1
@@ -250,7 +360,7 @@ class DemoPipeline:
                         print(f"  ⚠ Failed email for {invoice['Invoice_ID']}: {e}")
                         results['errors'].append(f"Invoice email {invoice['Invoice_ID']}: {e}")
 
-                for bill, pdf_path in generated_bill_pdfs:
+                for bill, pdf_path, pdf_bytes in generated_bill_pdfs:
                     try:
                         success = self.email_sender.send_bill_email(
                             recipient=self.recipient_email,
@@ -258,7 +368,8 @@ class DemoPipeline:
                             vendor_name=bill['Vendor_Name'],
                             amount=bill['Total_Amount'],
                             currency=bill['Currency'],
-                            pdf_path=pdf_path
+                            pdf_path=pdf_path,
+                            pdf_bytes=pdf_bytes
                         )
                         if success:
                             email_count += 1
@@ -272,15 +383,13 @@ class DemoPipeline:
                 print(f"\n[Step 7/7] Skipping email sending (not available or no PDFs)")
                 results['emails_sent'] = 0
 
-            # Biweekly bank statement (every 2nd week based on ISO week number)
-            week_num = run_date.isocalendar()[1]
-            is_biweekly = (week_num % 2 == 0)
-
-            if is_biweekly and self.pdf_enabled and self.email_enabled:
+            # Biweekly bank statement (in pack mode it went out inside the weekly pack)
+            send_statement = is_biweekly and self.pdf_output != 'pack'
+            if send_statement and self.pdf_enabled and self.email_enabled:
                 print(f"\n[Biweekly] Generating bank statement (Week {week_num})...")
                 try:
-                    statement_pdf_path = self._generate_bank_statement_pdf(run_date, bank)
-                    if statement_pdf_path:
+                    statement = self._generate_bank_statement_pdf(run_date)
+                    if statement:
                         # Calculate statement period (last 2 weeks)
                         end_date = run_date
                         start_date = run_date - timedelta(days=14)
@@ -289,7 +398,9 @@ class DemoPipeline:
                         success = self.email_sender.send_bank_statement_email(
                             recipient=self.recipient_email,
                             statement_period=statement_period,
-                            pdf_path=statement_pdf_path
+                            pdf_path=statement['path'],
+                            pdf_bytes=statement['pdf_bytes'],
+                            filename=statement['filename']
                         )
                         if success:
                             results['bank_statement_sent'] = True
@@ -297,7 +408,7 @@ class DemoPipeline:
                 except Exception as e:
                     print(f"⚠ Failed to generate/send bank statement: {e}")
                     results['errors'].append(f"Bank statement: {e}")
-            elif is_biweekly:
+            elif send_statement:
                 print(f"\n[Biweekly] Week {week_num} - Skipping bank statement (PDF/email not available)")
 
         except Exception as e:
@@ -306,6 +417,15 @@ class DemoPipeline:
             traceback.print_exc()
             results['errors'].append(f"Pipeline error: {e}")
 
+        finally:
+            # Background PDF writes must land before the run is reported
+            if self.pdf_enabled:
+                for error in self.pdf_gen.sink.flush():
+                    print(f"  ⚠ Failed to save PDF {error}")
+                    results['errors'].append(f"PDF write {error}")
+                # Worker processes are not kept between weekly runs
+                self.pdf_gen.close()
+
         self._print_summary(results)
 
         # Send notification email if configured
@@ -318,6 +438,12 @@ class DemoPipeline:
 
         return results
 
+    def _existing_ids(self, df: pd.DataFrame, id_column: str) -> pd.Series:
+        """IDs already in a master, for duplicate checks"""
+        if id_column not in df.columns:
+            return pd.Series(dtype=str)
+        return df[id_column].dropna().astype(str)
+
     def _prepare_invoice_pdf_data(self, invoice: Dict) -> Dict:
         """Prepare invoice data for PDF"""
         line_items = []
@@ -380,59 +506,61 @@ class DemoPipeline:
             'notes': bill.get('Notes', '')
         }
 
-    def _generate_bank_statement_pdf(self, run_date: datetime, bank_df: pd.DataFrame) -> str:
-        """Generate bank statement PDF for the last 2 weeks"""
-        # Filter transactions for the last 2 weeks
+    def _generate_weekly_pack(self, run_date: datetime, invoices: List[Dict], bills: List[Dict],
+                              include_statement: bool) -> Optional[Dict]:
+        """
+        Render this week's invoices, bills and (biweekly) bank statement as one PDF pack
+
+        Returns:
+            Render result (filename, path if persisted, pdf_bytes, period,
+            includes_statement), or None if there was nothing to pack
+        """
+        statement = self._bank_statement_data(run_date) if include_statement else None
+        if not invoices and not bills and statement is None:
+            print("  No documents this week")
+            return None
+
+        week_start = run_date - timedelta(days=run_date.weekday())
+        period = f"Week of {week_start.strftime('%d %b %Y')}"
+        filename = f"Weekly_Pack_{run_date.strftime('%Y%m%d')}.pdf"
+
+        pack = self.pdf_gen.render_pack(
+            invoices=[self._prepare_invoice_pdf_data(invoice) for invoice in invoices],
+            bills=[self._prepare_bill_pdf_data(bill) for bill in bills],
+            statement=statement,
+            period=period,
+            return_bytes=True
+        )
+        pack.update(filename=filename, period=period, includes_statement=statement is not None)
+        if self.persist_pdfs:
+            pack['path'] = self.pdf_gen.sink.write(filename, pack['pdf_bytes'])
+        print(f"✓ Generated weekly pack: {filename} ({pack['documents']} documents"
+              f"{', reused from cache' if pack['cached'] else ''})")
+
+        return pack
+
+    def _bank_statement_data(self, run_date: datetime) -> Optional[Dict]:
+        """
+        Statement template data for the last 2 weeks (primary account)
+
+        Returns:
+            Statement data, or None if there were no transactions
+        """
         end_date = run_date
         start_date = run_date - timedelta(days=14)
 
-        # Convert Transaction_Date to datetime if needed
-        if len(bank_df) > 0:
-            if not pd.api.types.is_datetime64_any_dtype(bank_df['Transaction_Date']):
-                bank_df['Transaction_Date'] = pd.to_datetime(bank_df['Transaction_Date'])
-
-            # Filter transactions in the date range
-            mask = (bank_df['Transaction_Date'] >= start_date) & (bank_df['Transaction_Date'] <= end_date)
-            period_transactions = bank_df[mask].copy()
-        else:
-            period_transactions = bank_df
+        # Binary-search slice of the indexed history, including this run's transactions
+        period = self.statement_index.statement(start_date, end_date, account=self.bank_gen.bank_account)
+        transactions = period['transactions']
 
-        if len(period_transactions) == 0:
+        if len(transactions) == 0:
             print("  No transactions in the last 2 weeks")
             return None
 
-        # Sort by date
-        period_transactions = period_transactions.sort_values('Transaction_Date')
+        opening_balance = period['opening_balance']
+        closing_balance = period['closing_balance']
 
-        # Prepare transaction list for template
-        transactions = []
-        for _, txn in period_transactions.iterrows():
-            txn_date = txn['Transaction_Date']
-            if hasattr(txn_date, 'strftime'):
-                date_str = txn_date.strftime('%Y-%m-%d')
-            else:
-                date_str = str(txn_date)
-
-            transactions.append({
-                'date': date_str,
-                'description': txn.get('Description', txn.get('Narration', '')),
-                'debit': float(txn.get('Debit', 0) or 0),
-                'credit': float(txn.get('Credit', 0) or 0),
-                'balance': float(txn.get('Balance', 0) or 0)
-            })
-
-        # Get opening and closing balance
-        opening_balance = float(period_transactions.iloc[0].get('Balance', 0) or 0)
-        closing_balance = float(period_transactions.iloc[-1].get('Balance', 0) or 0)
-
-        # Adjust opening balance (subtract first transaction)
-        first_txn = period_transactions.iloc[0]
-        first_debit = float(first_txn.get('Debit', 0) or 0)
-        first_credit = float(first_txn.get('Credit', 0) or 0)
-        opening_balance = opening_balance + first_debit - first_credit
-
-        # Prepare statement data
-        statement_data = {
+        return {
             'bank_name': 'HDFC Bank',
             'account_name': 'Acme Technologies Private Limited',
             'account_number': 'XXXX XXXX 5678',
@@ -444,11 +572,28 @@ class DemoPipeline:
             'closing_balance': closing_balance
         }
 
-        # Generate PDF
-        filename = f"Bank_Statement_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}.pdf"
-        output_path = self.pdf_gen.generate_statement_pdf(statement_data, filename)
+    def _generate_bank_statement_pdf(self, run_date: datetime) -> Optional[Dict]:
+        """
+        Generate bank statement PDF for the last 2 weeks (primary account)
+
+        Returns:
+            Render result (filename, path if persisted, pdf_bytes), or None
+            if there were no transactions
+        """
+        statement_data = self._bank_statement_data(run_date)
+        if statement_data is None:
+            return None
 
-        return output_path
+        # Generate PDF
+        start_date = run_date - timedelta(days=14)
+        filename = f"Bank_Statement_{start_date.strftime('%Y%m%d')}_{run_date.strftime('%Y%m%d')}.pdf"
+        statement = self.pdf_gen.statements.render(statement_data, return_bytes=True)
+        statement['filename'] = filename
+        if self.persist_pdfs:
+            statement['path'] = self.pdf_gen.sink.write(filename, statement['pdf_bytes'])
+        print(f"✓ Generated statement PDF: {filename} ({statement['pages']} pages)")
+
+        return statement
 
     def _print_summary(self, results: Dict):
         """Print pipeline execution summary"""
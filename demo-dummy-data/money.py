@@ -0,0 +1,119 @@
+"""
+Komplai Demo Pipeline - Money
+Fixed-point amounts in integer minor units (paise / cents) with per-tax rounding rules
+"""
+
+import numpy as np
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Union
+
+
+# Minor units per major unit (paise per rupee, cents per dollar)
+MINOR_UNITS = 100
+
+# Rates are applied as integers in millionths (0.18 -> 180000), which covers
+# every statutory rate to four decimal places of a percent
+RATE_SCALE = 1_000_000
+
+# Rounding quantum per tax type, in minor units. GST and US sales tax are
+# charged to the paisa/cent on the invoice; TDS is deducted in whole rupees
+# (Section 288B rounds tax deducted to the nearest rupee).
+ROUNDING_QUANTUM = {
+    'IGST': 1,
+    'CGST': 1,
+    'SGST': 1,
+    'Sales Tax': 1,
+    'TDS': 100,
+    'Withholding': 1
+}
+
+
+def _round_half_up_div(numerator, denominator: int):
+    """Integer division rounding halves away from zero (scalar or int64 array)"""
+    sign = np.sign(numerator)
+    return sign * ((np.abs(numerator) + denominator // 2) // denominator)
+
+
+def to_minor(amount: Union[float, str, Decimal]) -> int:
+    """
+    Convert an amount in rupees/dollars to integer paise/cents
+
+    Goes through the decimal string of the value so 2.675 is 268 paise,
+    not the 267 that float arithmetic would give.
+    """
+    if amount is None:
+        return 0
+    minor = (Decimal(str(amount)) * MINOR_UNITS).quantize(Decimal('1'), rounding=ROUND_HALF_UP)
+    return int(minor)
+
+
+def from_minor(minor: int) -> float:
+    """Convert integer paise/cents back to a float rupee/dollar amount"""
+    return int(minor) / MINOR_UNITS
+
+
+def round_money(amount: float) -> float:
+    """Round an amount to the paisa, halves up (replaces round(x, 2))"""
+    return from_minor(to_minor(amount))
+
+
+def rate_to_units(rate: float) -> int:
+    """Rate as an integer number of millionths (0.18 -> 180000)"""
+    units = (Decimal(str(rate)) * RATE_SCALE).quantize(Decimal('1'), rounding=ROUND_HALF_UP)
+    return int(units)
+
+
+def apply_rate(amount_minor: int, rate: float, tax_type: str = None) -> int:
+    """
+    Exact tax on an amount in minor units
+
+    Args:
+        amount_minor: Taxable amount in paise/cents
+        rate: Tax rate as a fraction (0.18 for 18%)
+        tax_type: Key of ROUNDING_QUANTUM; unknown types round to the paisa
+
+    Returns:
+        Tax in paise/cents, rounded half up to the tax type's quantum
+    """
+    quantum = ROUNDING_QUANTUM.get(tax_type, 1)
+    product = int(amount_minor) * rate_to_units(rate)
+    return int(_round_half_up_div(product, RATE_SCALE * quantum)) * quantum
+
+
+# ============================================================================
+# COLUMN HELPERS
+# ============================================================================
+
+def to_minor_array(amounts) -> np.ndarray:
+    """
+    Convert a column of amounts to int64 minor units (NaN/None become 0)
+
+    Scaled values are nudged by a relative epsilon before rounding so
+    decimal amounts stored as floats (x.xx5) round half up as they would
+    through to_minor.
+    """
+    values = np.asarray(amounts, dtype=np.float64)
+    values = np.where(np.isnan(values), 0.0, values) * MINOR_UNITS
+    nudged = np.abs(values) * (1 + 1e-12) + 0.5
+    return (np.sign(values) * np.floor(nudged)).astype(np.int64)
+
+
+def from_minor_array(minor: np.ndarray) -> np.ndarray:
+    """Convert int64 minor units back to float rupees/dollars"""
+    return np.asarray(minor, dtype=np.int64) / MINOR_UNITS
+
+
+def apply_rate_array(amounts_minor: np.ndarray, rates, tax_types=None) -> np.ndarray:
+    """
+    Vectorized apply_rate: tax per row in minor units
+
+    Args:
+        tax_types: One tax type for every row, or a column of them
+    """
+    if tax_types is None or isinstance(tax_types, str):
+        quantum = ROUNDING_QUANTUM.get(tax_types, 1)
+    else:
+        quantum = np.array([ROUNDING_QUANTUM.get(t, 1) for t in tax_types], dtype=np.int64)
+    rate_units = np.rint(np.asarray(rates, dtype=np.float64) * RATE_SCALE).astype(np.int64)
+    product = np.asarray(amounts_minor, dtype=np.int64) * rate_units
+    return _round_half_up_div(product, RATE_SCALE * quantum).astype(np.int64) * quantum
@@ -0,0 +1,541 @@
+"""
+Komplai Demo Pipeline - Native PDF Renderer
+Invoices, bills and statements drawn directly as PDF, without an HTML layout engine
+"""
+
+import hashlib
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from statement_renderer import paginate_statement, page_count
+
+
+# A4 portrait, in points
+PAGE_WIDTH = 595.28
+PAGE_HEIGHT = 841.89
+MARGIN = 40
+CONTENT_WIDTH = PAGE_WIDTH - 2 * MARGIN
+
+# Advance widths of ASCII 32-126 in the core fonts (1/1000 em, from the Adobe AFM files)
+_HELVETICA_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584
+]
+_HELVETICA_BOLD_WIDTHS = [
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584
+]
+
+# (resource name, base font, widths) for regular and bold text
+FONTS = {
+    False: ('F1', 'Helvetica', _HELVETICA_WIDTHS),
+    True: ('F2', 'Helvetica-Bold', _HELVETICA_BOLD_WIDTHS)
+}
+
+# The core fonts have no rupee sign
+TEXT_REPLACEMENTS = {'₹': 'Rs.'}
+
+BLACK = (0.0, 0.0, 0.0)
+GRAY_BORDER = (0.867, 0.867, 0.867)
+GRAY_FILL = (0.949, 0.949, 0.949)
+GRAY_TEXT = (0.4, 0.4, 0.4)
+RED = (0.851, 0.325, 0.31)
+GREEN = (0.361, 0.722, 0.361)
+
+# The company block printed on every invoice (seller) and bill (buyer)
+COMPANY_LINES = ('Acme Technologies Private Limited',
+                 '123 Tech Park, Whitefield, Bangalore, KA 560066',
+                 'GSTIN: 29AABCA1234F1ZV')
+
+with open(__file__, 'rb') as _source:
+    # Part of the PDF cache key, so editing a layout invalidates cached PDFs
+    RENDERER_VERSION = 'native-' + hashlib.sha256(_source.read()).hexdigest()
+
+
+def _clean(text) -> str:
+    """Text with characters the core fonts lack replaced"""
+    text = '' if text is None else str(text)
+    for char, replacement in TEXT_REPLACEMENTS.items():
+        text = text.replace(char, replacement)
+    return text
+
+
+def text_width(text: str, size: float, bold: bool = False) -> float:
+    """Width of a string in points"""
+    widths = FONTS[bold][2]
+    units = 0
+    for char in _clean(text):
+        code = ord(char)
+        units += widths[code - 32] if 32 <= code <= 126 else 556
+    return units * size / 1000.0
+
+
+def fit_text(text: str, width: float, size: float, bold: bool = False) -> str:
+    """Text truncated with '...' to fit within width"""
+    text = _clean(text)
+    if text_width(text, size, bold) <= width:
+        return text
+    while text and text_width(text + '...', size, bold) > width:
+        text = text[:-1]
+    return text + '...'
+
+
+def _pdf_string(text: str) -> bytes:
+    """PDF literal string in WinAnsiEncoding"""
+    encoded = _clean(text).encode('cp1252', errors='replace')
+    return b'(' + encoded.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)') + b')'
+
+
+def _num(value: float) -> bytes:
+    """Compact PDF number"""
+    return (b'%.2f' % value).rstrip(b'0').rstrip(b'.')
+
+
+def _money(value) -> str:
+    """Amount with two decimals (matches the templates' "%0.2f")"""
+    return f"{float(value or 0.0):0.2f}"
+
+
+class PageCanvas:
+    """
+    Drawing operations for one page
+
+    Coordinates are in points from the top-left corner (y grows downwards),
+    converted to PDF's bottom-left origin as operators are written.
+    """
+
+    def __init__(self):
+        self.ops: List[bytes] = []
+        self.links: List[Tuple[float, float, float, float, int]] = []
+
+    def text(self, x: float, y: float, text, size: float = 10, bold: bool = False,
+             align: str = 'left', color: Tuple[float, float, float] = None):
+        """Draw text with its baseline at y (align: left, right or center of x)"""
+        text = _clean(text)
+        if align == 'right':
+            x -= text_width(text, size, bold)
+        elif align == 'center':
+            x -= text_width(text, size, bold) / 2
+        red, green, blue = map(_num, color or BLACK)
+        self.ops.append(b'BT %s %s %s rg /%s %s Tf %s %s Td %s Tj ET' % (
+            red, green, blue, FONTS[bold][0].encode(), _num(size), _num(x), _num(PAGE_HEIGHT - y),
+            _pdf_string(text)
+        ))
+
+    def rect(self, x: float, y: float, width: float, height: float,
+             fill: Tuple[float, float, float] = None, stroke: Tuple[float, float, float] = None):
+        """Draw a rectangle with its top-left corner at (x, y)"""
+        ops = b'q '
+        if fill:
+            ops += b'%s %s %s rg ' % tuple(map(_num, fill))
+        if stroke:
+            ops += b'%s %s %s RG 0.75 w ' % tuple(map(_num, stroke))
+        paint = b'B' if fill and stroke else (b'f' if fill else b'S')
+        self.ops.append(ops + b'%s %s %s %s re %s Q' % (
+            _num(x), _num(PAGE_HEIGHT - y - height), _num(width), _num(height), paint
+        ))
+
+    def link(self, x: float, y: float, width: float, height: float, page: int):
+        """Make a rectangle (top-left at x, y) a link to a page index of the document"""
+        self.links.append((x, PAGE_HEIGHT - y - height, x + width, PAGE_HEIGHT - y, page))
+
+    def content(self) -> bytes:
+        """Compressed content stream"""
+        return zlib.compress(b'\n'.join(self.ops))
+
+
+class PDFDocument:
+    """Minimal PDF writer: pages of text and rectangles in the two core fonts, with bookmarks"""
+
+    def __init__(self):
+        # (compressed content, links) per page
+        self.pages: List[Tuple[bytes, List[Tuple]]] = []
+        # (title, page index, parent bookmark index or None)
+        self.bookmarks: List[Tuple[str, int, Optional[int]]] = []
+
+    def add_page(self, canvas: PageCanvas):
+        """Append a finished page"""
+        self.pages.append((canvas.content(), canvas.links))
+
+    def add_bookmark(self, title: str, page: int, parent: Optional[int] = None) -> int:
+        """
+        Add an outline entry pointing at a page index
+
+        Returns:
+            Index of the bookmark (pass as parent to nest entries under it)
+        """
+        self.bookmarks.append((title, page, parent))
+        return len(self.bookmarks) - 1
+
+    def extend(self, other: 'PDFDocument'):
+        """Append another document's pages and bookmarks"""
+        offset = len(self.pages)
+        base = len(self.bookmarks)
+        self.pages.extend(other.pages)
+        self.bookmarks.extend((title, page + offset, None if parent is None else parent + base)
+                              for title, page, parent in other.bookmarks)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the document"""
+        # 1: catalog, 2: page tree, 3-4: fonts, then a page and a content object
+        # per page, then the outline root and one object per bookmark
+        page_ref = lambda index: 5 + 2 * index
+        outline_root = 5 + 2 * len(self.pages)
+        outline_ref = lambda index: outline_root + 1 + index
+
+        catalog = b'<< /Type /Catalog /Pages 2 0 R'
+        if self.bookmarks:
+            catalog += b' /Outlines %d 0 R /PageMode /UseOutlines' % outline_root
+        objects = [
+            catalog + b' >>',
+            b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+                b' '.join(b'%d 0 R' % page_ref(i) for i in range(len(self.pages))), len(self.pages)
+            )
+        ]
+        for bold in (False, True):
+            objects.append(b'<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>'
+                           % FONTS[bold][1].encode())
+        for i, (stream, links) in enumerate(self.pages):
+            annots = b''
+            if links:
+                annots = b' /Annots [%s]' % b' '.join(
+                    b'<< /Type /Annot /Subtype /Link /Border [0 0 0] /Rect [%s %s %s %s] /Dest [%d 0 R /Fit] >>'
+                    % (_num(x1), _num(y1), _num(x2), _num(y2), page_ref(page))
+                    for x1, y1, x2, y2, page in links
+                )
+            objects.append(
+                b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %s %s] '
+                b'/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R%s >>'
+                % (_num(PAGE_WIDTH), _num(PAGE_HEIGHT), page_ref(i) + 1, annots)
+            )
+            objects.append(b'<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream' % (len(stream), stream))
+        if self.bookmarks:
+            objects.extend(self._outline_objects(outline_root, outline_ref, page_ref))
+
+        out = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+
+        xref = len(out)
+        out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+        out += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+        out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+        return bytes(out)
+
+    def _outline_objects(self, root: int, outline_ref, page_ref) -> List[bytes]:
+        """Outline root and bookmark objects (every level open)"""
+        children: Dict[Optional[int], List[int]] = {}
+        for index, (_, _, parent) in enumerate(self.bookmarks):
+            children.setdefault(parent, []).append(index)
+
+        def links(siblings: List[int], position: int) -> bytes:
+            entry = b''
+            if position > 0:
+                entry += b' /Prev %d 0 R' % outline_ref(siblings[position - 1])
+            if position < len(siblings) - 1:
+                entry += b' /Next %d 0 R' % outline_ref(siblings[position + 1])
+            return entry
+
+        def first_last(kids: List[int]) -> bytes:
+            if not kids:
+                return b''
+            return b' /First %d 0 R /Last %d 0 R /Count %d' % (outline_ref(kids[0]), outline_ref(kids[-1]), len(kids))
+
+        objects = [b'<< /Type /Outlines%s >>' % first_last(children.get(None, []))]
+        for index, (title, page, parent) in enumerate(self.bookmarks):
+            siblings = children[parent]
+            objects.append(b'<< /Title %s /Parent %d 0 R /Dest [%d 0 R /Fit]%s%s >>' % (
+                _pdf_string(title), root if parent is None else outline_ref(parent), page_ref(page),
+                links(siblings, siblings.index(index)), first_last(children.get(index, []))
+            ))
+        return objects
+
+
+class _Flow:
+    """Top-to-bottom layout cursor that starts a new page when the current one is full"""
+
+    def __init__(self, document: PDFDocument):
+        self.document = document
+        self.canvas = PageCanvas()
+        self.y = MARGIN
+
+    def ensure(self, height: float):
+        """Start a new page unless height fits above the bottom margin"""
+        if self.y + height > PAGE_HEIGHT - MARGIN:
+            self.finish()
+            self.canvas = PageCanvas()
+            self.y = MARGIN
+
+    def finish(self):
+        """Add the current page to the document"""
+        self.document.add_page(self.canvas)
+
+
+def _table_row(canvas: PageCanvas, y: float, widths: List[float], cells: List[str], size: float,
+               height: float, bold: bool = False, fill=None, aligns: List[str] = None,
+               colors: List = None):
+    """Draw one bordered table row with its top at y"""
+    x = MARGIN
+    for i, (width, cell) in enumerate(zip(widths, cells)):
+        canvas.rect(x, y, width, height, fill=fill, stroke=GRAY_BORDER)
+        align = aligns[i] if aligns else 'left'
+        text = fit_text(cell, width - 10, size, bold)
+        text_x = x + width - 5 if align == 'right' else x + 5
+        canvas.text(text_x, y + height / 2 + size * 0.35, text, size, bold, align,
+                    colors[i] if colors else None)
+        x += width
+
+
+class NativePDFRenderer:
+    """
+    Draw invoice, bill and statement PDFs directly from template data
+
+    Mirrors the HTML templates' layouts (including the weekly pack's index
+    and bookmarks) with fixed geometry and the PDF
+    core fonts (Helvetica), so there is no HTML parsing, CSS cascade or font
+    discovery and nothing outside the standard library: a document is a few
+    hundred drawing operators written straight into a PDF. Takes the same
+    data dicts as the templates.
+    """
+
+    version = RENDERER_VERSION
+
+    def render(self, kind: str, data: Dict, target: str = None) -> Optional[bytes]:
+        """
+        Render a document kind to PDF
+
+        Args:
+            kind: 'invoice', 'bill', 'statement', 'statement_pages' or 'pack'
+            data: Template data
+            target: File to write (None = return bytes)
+
+        Returns:
+            PDF bytes if target is None, otherwise None (written to target)
+        """
+        document = PDFDocument()
+        if kind == 'pack':
+            self._draw_pack(document, data)
+        else:
+            self._draw(document, kind, data)
+
+        pdf_bytes = document.to_bytes()
+        if target is None:
+            return pdf_bytes
+        with open(target, 'wb') as f:
+            f.write(pdf_bytes)
+        return None
+
+    def _draw(self, document: PDFDocument, kind: str, data: Dict):
+        """Append one document's pages"""
+        if kind in ('invoice', 'bill'):
+            self._draw_document(document, kind, data)
+        elif kind == 'statement':
+            transactions = data.get('transactions', [])
+            pages = paginate_statement(transactions, data.get('opening_balance') or 0.0)
+            self._draw_statement(document, data, pages, page_count(len(transactions)))
+        elif kind == 'statement_pages':
+            self._draw_statement(document, data, data['pages'], data.get('total_pages'))
+        else:
+            raise ValueError(f"Unknown document kind: {kind}")
+
+    def _draw_pack(self, document: PDFDocument, data: Dict):
+        """Document pack: index with page numbers and links, then every document, bookmarked"""
+        body = PDFDocument()
+        starts = []
+        for group in data['groups']:
+            for section in group['sections']:
+                starts.append(len(body.pages))
+                self._draw(body, section['kind'], section['data'])
+
+        # Page numbers do not change the index layout, so count its pages first
+        index_pages = len(self._draw_index(PDFDocument(), data, starts, 0).pages)
+        self._draw_index(document, data, starts, index_pages)
+
+        document.add_bookmark('Contents', 0)
+        position = 0
+        for group in data['groups']:
+            if not group['sections']:
+                continue
+            parent = document.add_bookmark(group['title'], index_pages + starts[position])
+            for section in group['sections']:
+                document.add_bookmark(section['label'], index_pages + starts[position], parent)
+                position += 1
+        document.pages.extend(body.pages)
+
+    def _draw_index(self, document: PDFDocument, data: Dict, starts: List[int], offset: int) -> PDFDocument:
+        """Index page(s): one linked row per document with its page number"""
+        flow = _Flow(document)
+        flow.canvas.text(PAGE_WIDTH / 2, flow.y + 20, data.get('title'), 20, bold=True, align='center')
+        flow.canvas.text(PAGE_WIDTH / 2, flow.y + 38, data.get('period'), 10, align='center', color=GRAY_TEXT)
+        flow.y += 56
+
+        widths = [CONTENT_WIDTH * 0.72, CONTENT_WIDTH * 0.2, CONTENT_WIDTH * 0.08]
+        row_height = 20
+        position = 0
+        for group in data['groups']:
+            flow.ensure(30 + row_height)
+            flow.y += 20
+            flow.canvas.text(MARGIN, flow.y, f"{_clean(group['title'])} ({len(group['sections'])})", 12, bold=True)
+            flow.y += 8
+            for section in group['sections']:
+                flow.ensure(row_height)
+                page = offset + starts[position]
+                _table_row(flow.canvas, flow.y, widths, [section['label'], section['amount'], str(page + 1)],
+                           9, row_height, aligns=['left', 'right', 'right'])
+                flow.canvas.link(MARGIN, flow.y, CONTENT_WIDTH, row_height, page)
+                flow.y += row_height
+                position += 1
+        flow.finish()
+        return document
+
+    def _draw_document(self, document: PDFDocument, kind: str, data: Dict):
+        """Invoice or bill: header, parties, line items, totals and notes"""
+        flow = _Flow(document)
+        canvas = flow.canvas
+        center = PAGE_WIDTH / 2
+        currency = data.get('currency', '')
+
+        if kind == 'invoice':
+            title, number, date = 'INVOICE', f"Invoice #{data.get('invoice_id', '')}", data.get('invoice_date', '')
+            parties = [('From:', COMPANY_LINES),
+                       ('Bill To:', (data.get('customer_name'), data.get('customer_address'),
+                                     f"Tax ID: {_clean(data.get('customer_tax_id'))}"))]
+        else:
+            title, number, date = 'BILL', f"Bill #{data.get('bill_id', '')}", data.get('bill_date', '')
+            parties = [('From:', (data.get('vendor_name'), data.get('vendor_address'),
+                                  f"Tax ID: {_clean(data.get('vendor_tax_id'))}")),
+                       ('Bill To:', COMPANY_LINES)]
+
+        canvas.text(center, flow.y + 20, title, 20, bold=True, align='center')
+        canvas.text(center, flow.y + 40, number, 10, bold=True, align='center')
+        canvas.text(center, flow.y + 55, f"Date: {_clean(date)}", 10, align='center')
+        flow.y += 80
+
+        for heading, lines in parties:
+            canvas.text(MARGIN, flow.y + 12, heading, 11, bold=True)
+            for i, line in enumerate(lines):
+                canvas.text(MARGIN, flow.y + 28 + 14 * i, line, 10, bold=(i == 0))
+            flow.y += 28 + 14 * len(lines) + 8
+
+        widths = [CONTENT_WIDTH * 0.6, CONTENT_WIDTH * 0.1, CONTENT_WIDTH * 0.15, CONTENT_WIDTH * 0.15]
+        aligns = ['left', 'left', 'right', 'right']
+        row_height = 24
+        flow.y += 8
+        _table_row(flow.canvas, flow.y, widths, ['Description', 'Quantity', 'Rate', 'Amount'],
+                   10, row_height, bold=True, fill=GRAY_FILL)
+        flow.y += row_height
+        for item in data.get('line_items', []):
+            flow.ensure(row_height)
+            _table_row(flow.canvas, flow.y, widths, [
+                item.get('description', ''), str(item.get('quantity', '')),
+                f"{currency} {_money(item.get('rate'))}", f"{currency} {_money(item.get('amount'))}"
+            ], 10, row_height, aligns=aligns)
+            flow.y += row_height
+
+        tax_rate = float(data.get('tax_rate') or 0.0)
+        totals = [
+            ('Subtotal:', f"{currency} {_money(data.get('subtotal'))}", False),
+            (f"{_clean(data.get('tax_type'))} ({tax_rate * 100:0.0f}%):",
+             f"{currency} {_money(data.get('tax_amount'))}", False)
+        ]
+        if kind == 'bill':
+            if data.get('tds_applicable'):
+                totals += [
+                    ('Total:', f"{currency} {_money(data.get('total_amount'))}", False),
+                    (f"TDS Deduction ({_clean(data.get('tds_section'))}):",
+                     f"- {currency} {_money(data.get('tds_amount'))}", False),
+                    ('NET PAYABLE:', f"{currency} {_money(data.get('net_payable'))}", True)
+                ]
+            else:
+                totals.append(('TOTAL PAYABLE:', f"{currency} {_money(data.get('total_amount'))}", True))
+        else:
+            totals.append(('TOTAL:', f"{currency} {_money(data.get('total_amount'))}", True))
+
+        label_width = sum(widths[:3])
+        flow.y += 16
+        for label, amount, grand in totals:
+            flow.ensure(row_height)
+            _table_row(flow.canvas, flow.y, [label_width, widths[3]], [label, amount], 10, row_height,
+                       bold=grand, fill=GRAY_FILL if grand else None, aligns=['right', 'right'])
+            flow.y += row_height
+
+        flow.ensure(50)
+        flow.y += 28
+        flow.canvas.text(MARGIN, flow.y, f"Due Date: {_clean(data.get('due_date'))}", 8, color=GRAY_TEXT)
+        if data.get('notes'):
+            flow.canvas.text(MARGIN, flow.y + 14, fit_text(f"Notes: {_clean(data['notes'])}", CONTENT_WIDTH, 8),
+                             8, color=GRAY_TEXT)
+        flow.finish()
+
+    def _draw_statement(self, document: PDFDocument, data: Dict, pages: Iterable[Dict],
+                        total_pages: Optional[int]):
+        """Statement pages: account details, transactions with brought/carried-forward rows, summary"""
+        widths = [CONTENT_WIDTH * 0.12, CONTENT_WIDTH * 0.43, CONTENT_WIDTH * 0.15,
+                  CONTENT_WIDTH * 0.15, CONTENT_WIDTH * 0.15]
+        aligns = ['left', 'left', 'right', 'right', 'right']
+        colors = [None, None, RED, GREEN, None]
+        row_height = 20
+        size = 8.5
+
+        for page in pages:
+            canvas = PageCanvas()
+            y = MARGIN
+            if page['is_first']:
+                canvas.text(PAGE_WIDTH / 2, y + 20, 'BANK STATEMENT', 20, bold=True, align='center')
+                canvas.text(PAGE_WIDTH / 2, y + 38, data.get('bank_name'), 10, align='center')
+                canvas.text(PAGE_WIDTH / 2, y + 52, f"Statement Period: {_clean(data.get('start_date'))} "
+                                                    f"to {_clean(data.get('end_date'))}", 10, align='center')
+                y += 76
+                for label, field in (('Account Holder:', 'account_name'), ('Account Number:', 'account_number'),
+                                     ('IFSC Code:', 'ifsc_code')):
+                    canvas.text(MARGIN, y, label, 10, bold=True)
+                    canvas.text(MARGIN + text_width(label + ' ', 10, True), y, data.get(field), 10)
+                    y += 14
+                y += 10
+            else:
+                canvas.text(MARGIN, y + 8, f"{_clean(data.get('bank_name'))} - {_clean(data.get('account_number'))} - "
+                                           f"Statement Period: {_clean(data.get('start_date'))} to "
+                                           f"{_clean(data.get('end_date'))}", 8, color=GRAY_TEXT)
+                y += 20
+
+            _table_row(canvas, y, widths, ['Date', 'Description', 'Debit', 'Credit', 'Balance'],
+                       size, row_height, bold=True, fill=GRAY_FILL)
+            y += row_height
+            if not page['is_first']:
+                _table_row(canvas, y, widths, ['', 'Balance brought forward', '', '',
+                                               f"Rs. {_money(page['brought_forward'])}"],
+                           size, row_height, fill=(0.98, 0.98, 0.98), aligns=aligns)
+                y += row_height
+            for txn in page['transactions']:
+                debit, credit = txn.get('debit') or 0.0, txn.get('credit') or 0.0
+                _table_row(canvas, y, widths, [
+                    txn.get('date'), txn.get('description'),
+                    f"Rs. {_money(debit)}" if debit > 0 else '',
+                    f"Rs. {_money(credit)}" if credit > 0 else '',
+                    f"Rs. {_money(txn.get('balance'))}"
+                ], size, row_height, aligns=aligns, colors=colors)
+                y += row_height
+            if not page['is_last']:
+                _table_row(canvas, y, widths, ['', 'Balance carried forward', '', '',
+                                               f"Rs. {_money(page['carried_forward'])}"],
+                           size, row_height, fill=(0.98, 0.98, 0.98), aligns=aligns)
+                y += row_height
+            else:
+                canvas.text(MARGIN, y + 30, 'Opening Balance:', 10, bold=True)
+                canvas.text(MARGIN + 100, y + 30, f"Rs. {_money(data.get('opening_balance'))}", 10)
+                canvas.text(MARGIN, y + 46, 'Closing Balance:', 10, bold=True)
+                canvas.text(MARGIN + 100, y + 46, f"Rs. {_money(data.get('closing_balance'))}", 10)
+
+            label = f"Page {page['number']}" + (f" of {total_pages}" if total_pages else '')
+            canvas.text(PAGE_WIDTH - MARGIN, PAGE_HEIGHT - MARGIN / 2, label, 8, align='right', color=GRAY_TEXT)
+            document.add_page(canvas)
@@ -0,0 +1,387 @@
+"""
+Komplai Demo Pipeline - PDF Benchmark
+Rendering throughput, latency and memory per engine and mode, reported as JSON
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+import pdf_generator
+from pdf_generator import PDFGenerator, WEASYPRINT_AVAILABLE, HTML
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# (size, documents) per kind; size is line items for invoices and bills,
+# transactions for statements
+SCENARIOS = {
+    'invoice': ((1, 40), (10, 40), (50, 20)),
+    'bill': ((1, 40), (10, 40), (50, 20)),
+    'statement': ((50, 20), (1000, 5), (10000, 2))
+}
+
+MODES = ('serial', 'pool', 'cached')
+
+DEFAULT_OUTPUT = './output/benchmark/pdf_benchmark.json'
+
+
+def sample_invoice_data(line_items: int = 3, number: int = 1) -> Dict:
+    """Template data for a typical invoice"""
+    items = [
+        {'description': f'Software Development Services - Phase {i + 1}', 'quantity': 1,
+         'rate': 100000.00, 'amount': 100000.00}
+        for i in range(line_items)
+    ]
+    subtotal = sum(item['amount'] for item in items)
+    return {
+        'invoice_id': f'INV-202601-{number:04d}',
+        'invoice_date': '06 Jan 2026',
+        'due_date': '05 Feb 2026',
+        'customer_name': 'Test Customer Ltd',
+        'customer_address': '123 Test Street, Mumbai, MH 400001',
+        'customer_tax_id': 'GSTIN123456789',
+        'currency': 'INR',
+        'line_items': items,
+        'subtotal': subtotal,
+        'tax_type': 'IGST',
+        'tax_rate': 0.18,
+        'tax_amount': subtotal * 0.18,
+        'total_amount': subtotal * 1.18,
+        'notes': 'Payment due within 30 days'
+    }
+
+
+def sample_bill_data(line_items: int = 3, number: int = 1) -> Dict:
+    """Template data for a typical bill with TDS deducted"""
+    items = [
+        {'description': f'Cloud Hosting - Region {i + 1}', 'quantity': 1, 'rate': 50000.00, 'amount': 50000.00}
+        for i in range(line_items)
+    ]
+    subtotal = sum(item['amount'] for item in items)
+    total = subtotal * 1.18
+    tds = subtotal * 0.02
+    return {
+        'bill_id': f'BILL-202601-{number:04d}',
+        'bill_date': '06 Jan 2026',
+        'due_date': '05 Feb 2026',
+        'vendor_name': 'Test Vendor Pvt Ltd',
+        'vendor_address': '456 Vendor Lane, Delhi, DL 110001',
+        'vendor_tax_id': 'GSTIN987654321',
+        'currency': 'INR',
+        'line_items': items,
+        'subtotal': subtotal,
+        'tax_type': 'IGST',
+        'tax_rate': 0.18,
+        'tax_amount': subtotal * 0.18,
+        'total_amount': total,
+        'tds_applicable': True,
+        'tds_section': '194C',
+        'tds_amount': tds,
+        'net_payable': total - tds,
+        'notes': 'Payment due within 30 days'
+    }
+
+
+def sample_statement_data(transactions: int = 50, number: int = 1) -> Dict:
+    """Template data for a bank statement with alternating receipts and payments"""
+    opening = 1_000_000.00 + number
+    balance = opening
+    rows = []
+    for i in range(transactions):
+        debit, credit = (0.0, 25000.00) if i % 2 else (12500.00, 0.0)
+        balance += credit - debit
+        rows.append({
+            'date': f'2026-01-{1 + i % 28:02d}',
+            'description': f'NEFT-{number:04d}{i:06d} Payment reference',
+            'debit': debit,
+            'credit': credit,
+            'balance': balance
+        })
+    return {
+        'bank_name': 'HDFC Bank',
+        'account_name': 'Acme Technologies Private Limited',
+        'account_number': 'XXXX XXXX 5678',
+        'ifsc_code': 'HDFC0001234',
+        'start_date': '01 Jan 2026',
+        'end_date': '28 Jan 2026',
+        'transactions': rows,
+        'opening_balance': opening,
+        'closing_balance': balance
+    }
+
+
+SAMPLE_DATA = {
+    'invoice': sample_invoice_data,
+    'bill': sample_bill_data,
+    'statement': sample_statement_data
+}
+
+
+def synthetic_documents(kind: str, size: int, count: int) -> List[Dict]:
+    """count distinct documents of a kind (distinct, so nothing is served from the cache by accident)"""
+    return [SAMPLE_DATA[kind](size, number=i + 1) for i in range(count)]
+
+
+def _inline_styles(generator: PDFGenerator, kind: str, html_content: str) -> str:
+    """HTML with the kind's stylesheet pasted back in as a <style> block (the old templates)"""
+    with open(generator.templates.stylesheet_path(kind), 'r') as f:
+        css = f.read()
+    return html_content.replace('</head>', f'<style>\n{css}</style>\n</head>', 1)
+
+
+def time_renders(render: Callable[[], object], repeat: int) -> List[float]:
+    """Wall-clock seconds for each of `repeat` calls (after one warm-up call)"""
+    render()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def compare_styles(generator: PDFGenerator, kind: str, data: Dict, repeat: int = 20) -> Dict[str, float]:
+    """
+    Median per-document render time, before and after shared styles
+
+    before: inline <style> block parsed per document, new font configuration per document
+    after:  stylesheet parsed once, one FontConfiguration reused
+    """
+    html_content = generator.templates.render(kind, data)
+    inline_html = _inline_styles(generator, kind, html_content)
+
+    before = time_renders(lambda: HTML(string=inline_html).write_pdf(), repeat)
+    after = time_renders(lambda: generator._write_pdf(kind, html_content), repeat)
+
+    return {
+        'before_ms': statistics.median(before) * 1000,
+        'after_ms': statistics.median(after) * 1000
+    }
+
+
+def _render(generator: PDFGenerator, kind: str, data: Dict, return_bytes: bool = False) -> Dict:
+    """Render one document the way the pipeline does (statements are paginated)"""
+    if kind == 'statement':
+        return generator.statements.render(data, return_bytes=return_bytes)
+    return generator.render_document(kind, data, return_bytes=return_bytes)
+
+
+def _timed_render(args) -> Dict:
+    """Pool task: render with the worker's generator, timed inside the worker"""
+    kind, data = args
+    start = time.perf_counter()
+    _render(pdf_generator._WORKER_GENERATOR, kind, data)
+    return {'seconds': time.perf_counter() - start, 'max_rss_mb': _max_rss_mb()}
+
+
+def _max_rss_mb() -> Optional[float]:
+    """High-water resident memory of this process (None where unsupported)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _summary(latencies: List[float], wall: float) -> Dict:
+    """docs/sec over the whole batch and per-document latency percentiles"""
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        'docs_per_sec': round(len(latencies) / wall, 2) if wall else None,
+        'p50_ms': round(float(np.percentile(latencies_ms, 50)), 2),
+        'p95_ms': round(float(np.percentile(latencies_ms, 95)), 2)
+    }
+
+
+def run_scenario(generator: PDFGenerator, mode: str, kind: str, size: int, docs: int,
+                 workers: int) -> Dict:
+    """
+    Render docs synthetic documents of one kind and size in one mode
+
+    serial: one after another in this process, no cache
+    pool:   across the generator's worker processes (latency timed in the worker)
+    cached: a second pass over documents already in the PDF cache
+            (statements longer than one page batch are never cached, so
+            check cache_hit_rate before reading the row as cache hits)
+
+    Returns:
+        Dict with docs/sec, p50/p95 latency (ms), peak memory (MB), PDF size
+        (KB) and cache_hit_rate (share of timed renders served from the
+        cache; None outside cached mode)
+    """
+    documents = synthetic_documents(kind, size, docs)
+
+    peak_python_mb = None
+    hits = None
+    if mode == 'pool':
+        pool = generator._get_pool(workers)
+        # Workers build their generator and warm up on first use
+        list(pool.map(_timed_render, [(kind, documents[0])] * workers))
+        start = time.perf_counter()
+        timings = list(pool.map(_timed_render, [(kind, data) for data in documents]))
+        wall = time.perf_counter() - start
+        latencies = [timing['seconds'] for timing in timings]
+        rss = [timing['max_rss_mb'] for timing in timings if timing['max_rss_mb'] is not None]
+        peak_rss_mb = max(rss) if rss else None
+    else:
+        if mode == 'cached':
+            for data in documents:
+                _render(generator, kind, data)
+        else:
+            _render(generator, kind, documents[0])  # Warm-up (fonts, compiled templates)
+
+        latencies = []
+        cached = []
+        start = time.perf_counter()
+        for data in documents:
+            doc_start = time.perf_counter()
+            cached.append(_render(generator, kind, data)['cached'])
+            latencies.append(time.perf_counter() - doc_start)
+        wall = time.perf_counter() - start
+        if mode == 'cached':
+            hits = sum(cached) / len(cached)
+
+        # Memory is measured on a separate render: tracemalloc would slow the timed ones
+        tracemalloc.start()
+        _render(generator, kind, documents[-1])
+        peak_python_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+        peak_rss_mb = _max_rss_mb()
+
+    sample = _render(generator, kind, documents[0], return_bytes=True)
+    result = {
+        'engine': generator.engine,
+        'mode': mode,
+        'kind': kind,
+        'size': size,
+        'docs': docs,
+        'workers': workers if mode == 'pool' else 1
+    }
+    result.update(_summary(latencies, wall))
+    result.update({
+        'peak_python_mb': round(peak_python_mb, 2) if peak_python_mb is not None else None,
+        'peak_rss_mb': round(peak_rss_mb, 1) if peak_rss_mb is not None else None,
+        'pdf_kb': round(len(sample['pdf_bytes']) / 1024, 1),
+        'cache_hit_rate': round(hits, 2) if hits is not None else None
+    })
+    return result
+
+
+def available_engines() -> List[str]:
+    """Engines that can run here"""
+    return ['weasyprint', 'native'] if WEASYPRINT_AVAILABLE else ['native']
+
+
+def run_suite(engines: List[str] = None, modes: List[str] = MODES, kinds: List[str] = None,
+              workers: int = None, scale: float = 1.0) -> Dict:
+    """
+    Run every scenario for each engine and mode
+
+    Args:
+        engines: Engines to benchmark (default: all available)
+        modes: Any of 'serial', 'pool', 'cached'
+        kinds: Document kinds (default: invoice, bill, statement)
+        workers: Pool size (default: CPU count)
+        scale: Multiplier on each scenario's document count
+
+    Returns:
+        Dict with 'meta' (environment, template/layout versions) and 'results'
+        (one entry per engine, mode, kind and size)
+    """
+    engines = engines or available_engines()
+    kinds = kinds or list(SCENARIOS)
+    workers = workers or os.cpu_count() or 1
+
+    results = []
+    versions = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for engine in engines:
+            plain = PDFGenerator(output_dir=os.path.join(work_dir, 'pdfs'), engine=engine)
+            cached = PDFGenerator(output_dir=os.path.join(work_dir, 'pdfs'), engine=engine,
+                                  cache_dir=os.path.join(work_dir, f'cache-{engine}'))
+            versions[engine] = {kind: plain._layout_version(kind) for kind in kinds}
+            try:
+                for mode in modes:
+                    generator = cached if mode == 'cached' else plain
+                    for kind in kinds:
+                        for size, docs in SCENARIOS[kind]:
+                            result = run_scenario(generator, mode, kind, size, max(2, int(docs * scale)), workers)
+                            results.append(result)
+                            print(f"  {engine:10s} {mode:6s} {kind:9s} size {size:>5}: "
+                                  f"{result['docs_per_sec']:>8} docs/s  p50 {result['p50_ms']:>8} ms  "
+                                  f"p95 {result['p95_ms']:>8} ms"
+                                  + (f"  hits {result['cache_hit_rate']:.0%}" if mode == 'cached' else ''),
+                                  file=sys.stderr)
+            finally:
+                plain.close()
+                cached.close()
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'workers': workers,
+            'weasyprint_available': WEASYPRINT_AVAILABLE,
+            'layout_versions': versions
+        },
+        'results': results
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark PDF rendering and report JSON")
+    parser.add_argument('--engines', help="Comma-separated engines (default: all available)")
+    parser.add_argument('--modes', default=','.join(MODES), help="Comma-separated modes")
+    parser.add_argument('--kinds', default=','.join(SCENARIOS), help="Comma-separated document kinds")
+    parser.add_argument('--workers', type=int, help="Pool processes (default: CPU count)")
+    parser.add_argument('--scale', type=float, default=1.0, help="Multiplier on documents per scenario")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="JSON report path ('-' for stdout)")
+    parser.add_argument('--compare-styles', type=int, metavar='REPEAT',
+                        help="Only compare inline vs shared stylesheets (WeasyPrint)")
+    args = parser.parse_args()
+
+    if args.compare_styles:
+        if not WEASYPRINT_AVAILABLE:
+            print("✗ WeasyPrint is not available; install GTK/Pango to compare stylesheets")
+            sys.exit(1)
+        generator = PDFGenerator(output_dir='./output/benchmark', engine='weasyprint')
+        result = compare_styles(generator, 'invoice', sample_invoice_data(), args.compare_styles)
+        saved = result['before_ms'] - result['after_ms']
+        print(f"  Inline styles:    {result['before_ms']:8.1f} ms")
+        print(f"  Shared CSS/fonts: {result['after_ms']:8.1f} ms")
+        print(f"  Saved:            {saved:8.1f} ms ({saved / result['before_ms']:.0%})")
+        sys.exit(0)
+
+    print("PDF RENDER BENCHMARK", file=sys.stderr)
+    report = run_suite(
+        engines=args.engines.split(',') if args.engines else None,
+        modes=args.modes.split(','),
+        kinds=args.kinds.split(','),
+        workers=args.workers,
+        scale=args.scale
+    )
+
+    payload = json.dumps(report, indent=2)
+    if args.output == '-':
+        print(payload)
+    else:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            f.write(payload)
+        print(f"✓ Wrote {len(report['results'])} results to {args.output}", file=sys.stderr)
@@ -0,0 +1,162 @@
+"""
+Komplai Demo Pipeline - PDF Cache
+Content-addressed store of rendered PDFs with size-bounded LRU eviction
+"""
+
+import hashlib
+import json
+import math
+import os
+import tempfile
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# After eviction the cache is trimmed to this fraction of max_bytes, so a
+# full cache does not rescan the directory on every insert
+EVICT_TO_FRACTION = 0.9
+
+
+def normalize_context(value):
+    """
+    Template data as plain JSON-able values with a stable form
+
+    Dates become ISO strings, numpy scalars become Python numbers, NaN
+    becomes None and tuples become lists, so the same document always hashes
+    the same whatever types the generators happened to produce.
+    """
+    if isinstance(value, dict):
+        return {str(key): normalize_context(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize_context(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, Decimal):
+        return str(value)
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+class PDFCache:
+    """
+    Rendered PDFs keyed by a hash of their inputs
+
+    The key covers the document kind, the template version and the
+    normalized template data, so any change to the data or the templates
+    yields a new entry and stale PDFs are never served. Files live under
+    cache_dir/<first two hex chars>/<key>.pdf; each hit refreshes the
+    file's mtime, and once the cache outgrows max_bytes the least recently
+    used files are deleted. Several processes may share one directory.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_bytes)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.total_bytes = sum(size for _, size, _ in self._scan())
+
+    @staticmethod
+    def key(kind: str, data: Dict, template_version: str = '') -> str:
+        """Content hash for a document"""
+        payload = json.dumps(
+            {'kind': kind, 'template': template_version, 'data': normalize_context(data)},
+            sort_keys=True, separators=(',', ':'), ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def path_for(self, key: str) -> str:
+        """File path of a cache entry (whether or not it exists)"""
+        return os.path.join(self.cache_dir, key[:2], f"{key}.pdf")
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a rendered PDF
+
+        Returns:
+            Path of the cached file, or None on a miss
+        """
+        path = self.path_for(key)
+        try:
+            os.utime(path)  # Mark as recently used
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, pdf_bytes: bytes) -> str:
+        """
+        Store a rendered PDF (atomically, so readers never see a partial file)
+
+        Returns:
+            Path of the cached file
+        """
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        handle, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(handle, 'wb') as f:
+            f.write(pdf_bytes)
+
+        # Re-putting a key replaces its file; only the difference is new
+        try:
+            self.total_bytes -= os.stat(path).st_size
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, path)
+
+        self.total_bytes += len(pdf_bytes)
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+        return path
+
+    def evict(self) -> int:
+        """
+        Delete least recently used entries until under the size limit
+
+        Rescans the directory first, since other processes may have added
+        or removed entries.
+
+        Returns:
+            Number of files deleted
+        """
+        entries = sorted(self._scan(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * EVICT_TO_FRACTION
+
+        deleted = 0
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            deleted += 1
+
+        self.total_bytes = total
+        return deleted
+
+    def _scan(self) -> List[Tuple[str, int, float]]:
+        """(path, size, mtime) of every cached PDF"""
+        entries = []
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith('.pdf'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
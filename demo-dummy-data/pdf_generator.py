@@ -1,51 +1,200 @@
 """
 Komplai Demo Pipeline - PDF Generator
-Converts HTML templates to PDFs using WeasyPrint
+Converts HTML templates to PDFs using WeasyPrint, or draws them with the native renderer
 """
 
-from jinja2 import Environment, FileSystemLoader, Template
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 import os
-from typing import Dict
+import shutil
+from typing import Dict, List, Optional, Tuple, Union
+
+from template_store import get_template_store
+from pdf_cache import PDFCache, DEFAULT_MAX_BYTES
+from native_pdf import NativePDFRenderer
+from statement_renderer import StatementRenderer, PAGES_PER_BATCH, paginate_statement, page_count
 
 # Import WeasyPrint only when needed (may fail on Mac without GTK)
 try:
     from weasyprint import HTML, CSS
+    from weasyprint.text.fonts import FontConfiguration
     WEASYPRINT_AVAILABLE = True
-except Exception as e:
+except Exception:
     WEASYPRINT_AVAILABLE = False
     HTML = None
     CSS = None
+    FontConfiguration = None
+
+
+DOCUMENT_KINDS = ('invoice', 'bill', 'statement', 'statement_pages', 'pack')
+
+# 'weasyprint' lays out the HTML templates; 'native' draws fixed layouts
+# directly (pure Python, no GTK); 'auto' uses WeasyPrint when it is installed
+ENGINES = ('auto', 'weasyprint', 'native')
+
+# Below this many jobs a default-sized batch renders in-process: starting
+# workers and warming up WeasyPrint in each costs more than it saves
+POOL_MIN_JOBS = 16
+
+# Generator owned by each pool worker (built once by _init_worker)
+_WORKER_GENERATOR = None
+
+
+def _init_worker(settings: Dict):
+    """Pool initializer: build the worker's generator and warm up WeasyPrint"""
+    global _WORKER_GENERATOR
+    _WORKER_GENERATOR = PDFGenerator(**settings)
+    if _WORKER_GENERATOR.engine == 'weasyprint':
+        for kind in DOCUMENT_KINDS:
+            _WORKER_GENERATOR.templates.get(kind)
+        # The first layout loads fonts and default styles; pay for it once per worker
+        _WORKER_GENERATOR._write_pdf('invoice', '<p></p>')
+
+
+def _render_in_worker(args) -> Dict:
+    """Pool task: render one job with the worker's generator"""
+    job, return_bytes = args
+    return _WORKER_GENERATOR.render_job(job, return_bytes)
+
+
+def _write_file(path: str, pdf_bytes: Union[bytes, memoryview]):
+    """Write a PDF, replacing rather than overwriting (the old file may be a link into the cache)"""
+    if os.path.lexists(path):
+        os.remove(path)
+    with open(path, 'wb') as f:
+        f.write(pdf_bytes)
+
+
+def _link_or_copy(source: str, destination: str):
+    """Hard-link a cached PDF into place (copy across filesystems)"""
+    if os.path.lexists(destination):
+        os.remove(destination)
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+class PDFDiskSink:
+    """
+    Write rendered PDFs to disk on a background thread
+
+    The pipeline renders to bytes and emails them directly; persisting a
+    copy under output_dir is optional and happens off the main thread.
+    Call flush() before relying on the files.
+    """
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pdf-sink')
+        self._pending: List[Tuple[str, Future]] = []
+
+    def write(self, filename: str, pdf_bytes: Union[bytes, memoryview]) -> str:
+        """
+        Queue a PDF for writing
+
+        Returns:
+            Path the file will be written to
+        """
+        path = os.path.join(self.output_dir, filename)
+        self._pending.append((path, self._executor.submit(_write_file, path, pdf_bytes)))
+        return path
+
+    def flush(self) -> List[str]:
+        """
+        Wait for queued writes
+
+        Returns:
+            Error message per failed write (empty if all succeeded)
+        """
+        errors = []
+        for path, future in self._pending:
+            try:
+                future.result()
+            except Exception as e:
+                errors.append(f"{path}: {e}")
+        self._pending = []
+        return errors
 
 
 class PDFGenerator:
     """Generate PDFs from HTML templates"""
 
-    def __init__(self, template_dir: str = None, output_dir: str = None):
+    def __init__(self, template_dir: str = None, output_dir: str = None,
+                 bytecode_cache_dir: str = None, template_names: Dict[str, str] = None,
+                 cache_dir: str = None, cache_max_bytes: int = DEFAULT_MAX_BYTES,
+                 statement_pages_per_batch: int = PAGES_PER_BATCH, engine: str = 'auto'):
         """
         Initialize PDF Generator
 
         Args:
-            template_dir: Directory containing HTML templates (optional)
+            template_dir: Directory containing HTML templates (optional, defaults to ./templates)
             output_dir: Directory for PDF output (optional, defaults to ./output/pdfs)
+            bytecode_cache_dir: Directory for compiled template bytecode (optional)
+            template_names: Template file per document kind, e.g. {'invoice': 'invoice_template.html'}
+            cache_dir: Directory for the rendered-PDF cache (optional, no cache if None)
+            cache_max_bytes: Size limit of the PDF cache before LRU eviction
+            statement_pages_per_batch: Statement pages laid out per render call
+            engine: 'weasyprint', 'native' or 'auto' (WeasyPrint if available, else native)
 
         Raises:
-            ImportError: If WeasyPrint is not available
+            ImportError: If the weasyprint engine is requested but WeasyPrint is not available
+            ValueError: If the engine is unknown
         """
-        if not WEASYPRINT_AVAILABLE:
-            raise ImportError("WeasyPrint is not available. Install GTK libraries or skip PDF generation.")
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown PDF engine '{engine}' (expected one of {', '.join(ENGINES)})")
+        if engine == 'auto':
+            engine = 'weasyprint' if WEASYPRINT_AVAILABLE else 'native'
+        if engine == 'weasyprint' and not WEASYPRINT_AVAILABLE:
+            raise ImportError("WeasyPrint is not available. Install GTK libraries or use the native PDF engine.")
+        self.engine = engine
 
-        self.template_dir = template_dir or "."
         self.output_dir = output_dir or "./output/pdfs"
 
         # Create output directory if it doesn't exist
         os.makedirs(self.output_dir, exist_ok=True)
 
-        # Initialize Jinja2 environment if template_dir exists
-        if os.path.exists(self.template_dir):
-            self.env = Environment(loader=FileSystemLoader(self.template_dir))
+        # Templates are compiled once per process and shared between generators
+        self.templates = get_template_store(template_dir, bytecode_cache_dir, template_names)
+        self.template_dir = self.templates.template_dir
+        self.env = self.templates.env
+
+        # Stylesheets are parsed once against one font configuration and
+        # passed to every render, instead of each document re-parsing an
+        # inline <style> block and discovering fonts again
+        self.font_config = None
+        self.stylesheets = {}
+        self.native = None
+        if self.engine == 'weasyprint':
+            self.font_config = FontConfiguration()
+            parsed = {}
+            for kind in DOCUMENT_KINDS:
+                path = self.templates.stylesheet_path(kind)
+                if path not in parsed:
+                    parsed[path] = CSS(filename=path, font_config=self.font_config)
+                self.stylesheets[kind] = parsed[path]
         else:
-            self.env = None
+            self.native = NativePDFRenderer()
+
+        # Pool workers rebuild an identical generator from these settings
+        self.settings = {
+            'template_dir': template_dir,
+            'output_dir': self.output_dir,
+            'bytecode_cache_dir': bytecode_cache_dir,
+            'template_names': template_names,
+            'cache_dir': cache_dir,
+            'cache_max_bytes': cache_max_bytes,
+            'statement_pages_per_batch': statement_pages_per_batch,
+            'engine': self.engine
+        }
+        self.cache = PDFCache(cache_dir, cache_max_bytes) if cache_dir else None
+        self.sink = PDFDiskSink(self.output_dir)
+        self._pool = None
+        self._pool_workers = 0
+
+        # Statements are paginated and laid out a batch of pages at a time
+        self.statements = StatementRenderer(self, pages_per_batch=statement_pages_per_batch)
 
     def generate_invoice_pdf(self, invoice_data: Dict, output_filename: str = None) -> str:
         """
@@ -61,13 +210,8 @@ class PDFGenerator:
         if output_filename is None:
             output_filename = f"{invoice_data.get('Invoice_ID', 'invoice')}.pdf"
 
-        output_path = os.path.join(self.output_dir, output_filename)
-
-        # Generate HTML from template
-        html_content = self._render_invoice_template(invoice_data)
-
-        # Convert to PDF
-        HTML(string=html_content).write_pdf(output_path)
+        # Render (or reuse an identical cached PDF) and write to output_dir
+        output_path = self.render_document('invoice', invoice_data, output_filename)['path']
 
         print(f"✓ Generated invoice PDF: {output_path}")
         return output_path
@@ -86,13 +230,8 @@ class PDFGenerator:
         if output_filename is None:
             output_filename = f"{bill_data.get('Bill_ID', 'bill')}.pdf"
 
-        output_path = os.path.join(self.output_dir, output_filename)
-
-        # Generate HTML from template
-        html_content = self._render_bill_template(bill_data)
-
-        # Convert to PDF
-        HTML(string=html_content).write_pdf(output_path)
+        # Render (or reuse an identical cached PDF) and write to output_dir
+        output_path = self.render_document('bill', bill_data, output_filename)['path']
 
         print(f"✓ Generated bill PDF: {output_path}")
         return output_path
@@ -112,275 +251,258 @@ class PDFGenerator:
             date_str = datetime.now().strftime("%Y%m%d")
             output_filename = f"statement_{date_str}.pdf"
 
-        output_path = os.path.join(self.output_dir, output_filename)
-
-        # Generate HTML from template
-        html_content = self._render_statement_template(statement_data)
-
-        # Convert to PDF
-        HTML(string=html_content).write_pdf(output_path)
+        # Paginated, rendered in page batches and written to output_dir
+        output_path = self.statements.render(statement_data, output_filename)['path']
 
         print(f"✓ Generated statement PDF: {output_path}")
         return output_path
 
+    def render_document(self, kind: str, data: Dict, output_filename: str = None,
+                        return_bytes: bool = False) -> Dict:
+        """
+        Render one document to PDF
+
+        Args:
+            kind: 'invoice', 'bill' or 'statement'
+            data: Template data
+            output_filename: File to write in output_dir (None = bytes only)
+            return_bytes: Include the PDF bytes in the result
+
+        Returns:
+            Dict with kind, filename, path (None if not written),
+            pdf_bytes (None unless requested), cached (True if served from
+            the PDF cache) and error (None)
+        """
+        output_path = os.path.join(self.output_dir, output_filename) if output_filename else None
+
+        # Identical data and templates give an identical PDF: reuse it
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key(kind, data, self._layout_version(kind))
+            cached_path = self.cache.get(cache_key)
+            if cached_path:
+                try:
+                    if output_path:
+                        _link_or_copy(cached_path, output_path)
+                    pdf_bytes = None
+                    if return_bytes:
+                        with open(cached_path, 'rb') as f:
+                            pdf_bytes = f.read()
+                    return {
+                        'kind': kind,
+                        'filename': output_filename,
+                        'path': output_path,
+                        'pdf_bytes': pdf_bytes,
+                        'cached': True,
+                        'error': None
+                    }
+                except FileNotFoundError:
+                    pass  # Evicted by another process since get(): render it again
+
+        pdf_bytes = self._render_pdf(kind, data)
+
+        if cache_key:
+            self.cache.put(cache_key, pdf_bytes)
+        if output_path:
+            _write_file(output_path, pdf_bytes)
+
+        return {
+            'kind': kind,
+            'filename': output_filename,
+            'path': output_path,
+            'pdf_bytes': pdf_bytes if return_bytes else None,
+            'cached': False,
+            'error': None
+        }
+
+    def render_to_file(self, kind: str, data: Dict, path: str):
+        """
+        Lay out one document straight to a file (no PDF cache, any directory)
+
+        Args:
+            kind: Template kind, e.g. 'statement_pages'
+            data: Template data
+            path: File to write
+        """
+        self._render_pdf(kind, data, path)
+
+    def render_job(self, job: Dict, return_bytes: bool = False) -> Dict:
+        """Render a render_many job, reporting failure in the result instead of raising"""
+        try:
+            return self.render_document(job['kind'], job['data'], job.get('filename'), return_bytes)
+        except Exception as e:
+            return {
+                'kind': job.get('kind'),
+                'filename': job.get('filename'),
+                'path': None,
+                'pdf_bytes': None,
+                'cached': False,
+                'error': f"{type(e).__name__}: {e}"
+            }
+
+    def render_many(self, jobs: List[Dict], workers: Optional[int] = None,
+                    return_bytes: bool = False) -> List[Dict]:
+        """
+        Render a batch of documents across a pool of worker processes
+
+        WeasyPrint layout is CPU-bound, so documents are spread over
+        processes; each worker builds its generator and warms up WeasyPrint
+        once and the pool is kept for later batches (until close()). A
+        failing document is reported in its result and does not stop the
+        rest of the batch.
+
+        By default small batches (under POOL_MIN_JOBS) and the native engine,
+        which renders in about a millisecond per document, stay in this process.
+
+        Args:
+            jobs: Dicts with 'kind', 'data' and optional 'filename'
+            workers: Worker processes (default: CPU count, or in-process as
+                above; 1 = render in this process)
+            return_bytes: Include each PDF's bytes in its result
+
+        Returns:
+            One result per job, in submission order (see render_document;
+            'error' holds the message for failed documents)
+        """
+        if not jobs:
+            return []
+
+        if workers is None:
+            in_process = self.engine == 'native' or len(jobs) < POOL_MIN_JOBS
+            workers = 1 if in_process else os.cpu_count() or 1
+        workers = min(workers, len(jobs))
+        if workers <= 1:
+            return [self.render_job(job, return_bytes) for job in jobs]
+
+        pool = self._get_pool(workers)
+        chunksize = max(1, len(jobs) // (workers * 4))
+        results = []
+        try:
+            for result in pool.map(_render_in_worker, [(job, return_bytes) for job in jobs], chunksize=chunksize):
+                results.append(result)
+        except BrokenProcessPool as e:
+            # A worker died (e.g. killed for memory); finish the batch here
+            print(f"  ⚠ PDF worker pool failed ({e}); rendering remaining {len(jobs) - len(results)} serially")
+            self.close()
+            results.extend(self.render_job(job, return_bytes) for job in jobs[len(results):])
+
+        return results
+
+    def render_pack(self, invoices: List[Dict], bills: List[Dict], statement: Optional[Dict] = None,
+                    title: str = 'Weekly Document Pack', period: str = '',
+                    output_filename: str = None, return_bytes: bool = False) -> Dict:
+        """
+        Render a week's documents as one PDF: an index page, then each invoice,
+        bill and the statement as a bookmarked section
+
+        Everything is laid out in a single pass, so the index can carry each
+        document's page number and link to it. Identical packs are served from
+        the PDF cache like any other document.
+
+        Args:
+            invoices: Invoice template data (as for generate_invoice_pdf)
+            bills: Bill template data (as for generate_bill_pdf)
+            statement: Bank statement data with 'transactions' (optional)
+            title: Title on the index page
+            period: Period shown under the title
+            output_filename: File to write in output_dir (None = bytes only)
+            return_bytes: Include the PDF bytes in the result
+
+        Returns:
+            Dict as from render_document, plus 'documents' (number of sections)
+        """
+        groups = [
+            {'title': 'Invoices', 'sections': [{
+                'kind': 'invoice',
+                'anchor': f"invoice-{i}",
+                'label': f"Invoice {invoice['invoice_id']} - {invoice['customer_name']}",
+                'amount': f"{invoice['currency']} {invoice['total_amount']:,.2f}",
+                'data': invoice
+            } for i, invoice in enumerate(invoices)]},
+            {'title': 'Bills', 'sections': [{
+                'kind': 'bill',
+                'anchor': f"bill-{i}",
+                'label': f"Bill {bill['bill_id']} - {bill['vendor_name']}",
+                'amount': f"{bill['currency']} {bill['total_amount']:,.2f}",
+                'data': bill
+            } for i, bill in enumerate(bills)]}
+        ]
+        if statement:
+            transactions = statement.get('transactions', [])
+            pages = list(paginate_statement(transactions, statement.get('opening_balance') or 0.0))
+            statement_data = {key: value for key, value in statement.items() if key != 'transactions'}
+            statement_data.update(pages=pages, total_pages=page_count(len(transactions)))
+            groups.append({'title': 'Bank Statement', 'sections': [{
+                'kind': 'statement_pages',
+                'anchor': 'statement-0',
+                'label': f"Bank Statement {statement.get('start_date')} to {statement.get('end_date')}",
+                'amount': f"₹ {statement.get('closing_balance') or 0.0:,.2f}",
+                'data': statement_data
+            }]})
+        groups = [group for group in groups if group['sections']]
+
+        result = self.render_document('pack', {'title': title, 'period': period, 'groups': groups},
+                                      output_filename, return_bytes)
+        result['documents'] = sum(len(group['sections']) for group in groups)
+        return result
+
+    def close(self):
+        """Shut down the worker pool (a later render_many starts a new one)"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+            self._pool_workers = 0
+
+    def _get_pool(self, workers: int) -> ProcessPoolExecutor:
+        """Worker pool with at least this many processes (reused across batches)"""
+        if self._pool is None or self._pool_workers < workers:
+            self.close()
+            self._pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                             initargs=(self.settings,))
+            self._pool_workers = workers
+        return self._pool
+
+    def _render_pdf(self, kind: str, data: Dict, target: str = None) -> Optional[bytes]:
+        """
+        Render template data to PDF with the configured engine
+
+        Returns:
+            PDF bytes if target is None, otherwise None (written to target)
+        """
+        if self.engine == 'native':
+            return self.native.render(kind, data, target)
+        return self._write_pdf(kind, self.templates.render(kind, data), target)
+
+    def _layout_version(self, kind: str) -> str:
+        """Version of whatever lays out a document kind (part of the PDF cache key)"""
+        if self.engine == 'native':
+            return self.native.version
+        return self.templates.version(kind)
+
+    def _write_pdf(self, kind: str, html_content: str, target: str = None) -> Optional[bytes]:
+        """
+        Lay out HTML with the kind's shared stylesheet and font configuration
+
+        Returns:
+            PDF bytes if target is None, otherwise None (written to target)
+        """
+        return HTML(string=html_content).write_pdf(
+            target,
+            stylesheets=[self.stylesheets[kind]],
+            font_config=self.font_config
+        )
+
     def _render_invoice_template(self, data: Dict) -> str:
         """Render invoice HTML template"""
-        template_str = """
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <style>
-        body { font-family: Arial, sans-serif; font-size: 12px; margin: 20px; }
-        .header { text-align: center; margin-bottom: 30px; }
-        .header h1 { margin: 0; font-size: 24px; }
-        .info-section { margin: 20px 0; }
-        .info-section h3 { margin: 5px 0; }
-        table { width: 100%; border-collapse: collapse; margin: 20px 0; }
-        th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
-        th { background-color: #f2f2f2; }
-        .totals { text-align: right; }
-        .notes { margin-top: 30px; font-size: 10px; color: #666; }
-    </style>
-</head>
-<body>
-    <div class="header">
-        <h1>INVOICE</h1>
-        <p><strong>Invoice #{{ invoice_id }}</strong></p>
-        <p>Date: {{ invoice_date }}</p>
-    </div>
-
-    <div class="info-section">
-        <h3>From:</h3>
-        <p><strong>Acme Technologies Private Limited</strong></p>
-        <p>123 Tech Park, Whitefield, Bangalore, KA 560066</p>
-        <p>GSTIN: 29AABCA1234F1ZV</p>
-    </div>
-
-    <div class="info-section">
-        <h3>Bill To:</h3>
-        <p><strong>{{ customer_name }}</strong></p>
-        <p>{{ customer_address }}</p>
-        <p>Tax ID: {{ customer_tax_id }}</p>
-    </div>
-
-    <table>
-        <thead>
-            <tr>
-                <th>Description</th>
-                <th style="width: 10%;">Quantity</th>
-                <th style="width: 15%;">Rate</th>
-                <th style="width: 15%;">Amount</th>
-            </tr>
-        </thead>
-        <tbody>
-            {% for item in line_items %}
-            <tr>
-                <td>{{ item.description }}</td>
-                <td>{{ item.quantity }}</td>
-                <td>{{ currency }} {{ "%0.2f"|format(item.rate) }}</td>
-                <td>{{ currency }} {{ "%0.2f"|format(item.amount) }}</td>
-            </tr>
-            {% endfor %}
-        </tbody>
-    </table>
-
-    <table class="totals">
-        <tr>
-            <td colspan="3"><strong>Subtotal:</strong></td>
-            <td>{{ currency }} {{ "%0.2f"|format(subtotal) }}</td>
-        </tr>
-        <tr>
-            <td colspan="3"><strong>{{ tax_type }} ({{ "%0.0f"|format(tax_rate * 100) }}%):</strong></td>
-            <td>{{ currency }} {{ "%0.2f"|format(tax_amount) }}</td>
-        </tr>
-        <tr style="background-color: #f2f2f2;">
-            <td colspan="3"><strong>TOTAL:</strong></td>
-            <td><strong>{{ currency }} {{ "%0.2f"|format(total_amount) }}</strong></td>
-        </tr>
-    </table>
-
-    <div class="notes">
-        <p><strong>Due Date:</strong> {{ due_date }}</p>
-        {% if notes %}
-        <p><strong>Notes:</strong> {{ notes }}</p>
-        {% endif %}
-    </div>
-</body>
-</html>
-"""
-        template = Template(template_str)
-        return template.render(**data)
+        return self.templates.render('invoice', data)
 
     def _render_bill_template(self, data: Dict) -> str:
         """Render bill HTML template"""
-        template_str = """
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <style>
-        body { font-family: Arial, sans-serif; font-size: 12px; margin: 20px; }
-        .header { text-align: center; margin-bottom: 30px; }
-        .header h1 { margin: 0; font-size: 24px; }
-        .info-section { margin: 20px 0; }
-        .info-section h3 { margin: 5px 0; }
-        table { width: 100%; border-collapse: collapse; margin: 20px 0; }
-        th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
-        th { background-color: #f2f2f2; }
-        .totals { text-align: right; }
-        .notes { margin-top: 30px; font-size: 10px; color: #666; }
-    </style>
-</head>
-<body>
-    <div class="header">
-        <h1>BILL</h1>
-        <p><strong>Bill #{{ bill_id }}</strong></p>
-        <p>Date: {{ bill_date }}</p>
-    </div>
-
-    <div class="info-section">
-        <h3>From:</h3>
-        <p><strong>{{ vendor_name }}</strong></p>
-        <p>{{ vendor_address }}</p>
-        <p>Tax ID: {{ vendor_tax_id }}</p>
-    </div>
-
-    <div class="info-section">
-        <h3>Bill To:</h3>
-        <p><strong>Acme Technologies Private Limited</strong></p>
-        <p>123 Tech Park, Whitefield, Bangalore, KA 560066</p>
-        <p>GSTIN: 29AABCA1234F1ZV</p>
-    </div>
-
-    <table>
-        <thead>
-            <tr>
-                <th>Description</th>
-                <th style="width: 10%;">Quantity</th>
-                <th style="width: 15%;">Rate</th>
-                <th style="width: 15%;">Amount</th>
-            </tr>
-        </thead>
-        <tbody>
-            {% for item in line_items %}
-            <tr>
-                <td>{{ item.description }}</td>
-                <td>{{ item.quantity }}</td>
-                <td>{{ currency }} {{ "%0.2f"|format(item.rate) }}</td>
-                <td>{{ currency }} {{ "%0.2f"|format(item.amount) }}</td>
-            </tr>
-            {% endfor %}
-        </tbody>
-    </table>
-
-    <table class="totals">
-        <tr>
-            <td colspan="3"><strong>Subtotal:</strong></td>
-            <td>{{ currency }} {{ "%0.2f"|format(subtotal) }}</td>
-        </tr>
-        <tr>
-            <td colspan="3"><strong>{{ tax_type }} ({{ "%0.0f"|format(tax_rate * 100) }}%):</strong></td>
-            <td>{{ currency }} {{ "%0.2f"|format(tax_amount) }}</td>
-        </tr>
-        <tr>
-            <td colspan="3"><strong>Total:</strong></td>
-            <td>{{ currency }} {{ "%0.2f"|format(total_amount) }}</td>
-        </tr>
-        {% if tds_applicable %}
-        <tr>
-            <td colspan="3"><strong>TDS Deduction ({{ tds_section }}):</strong></td>
-            <td>- {{ currency }} {{ "%0.2f"|format(tds_amount) }}</td>
-        </tr>
-        <tr style="background-color: #f2f2f2;">
-            <td colspan="3"><strong>NET PAYABLE:</strong></td>
-            <td><strong>{{ currency }} {{ "%0.2f"|format(net_payable) }}</strong></td>
-        </tr>
-        {% else %}
-        <tr style="background-color: #f2f2f2;">
-            <td colspan="3"><strong>TOTAL PAYABLE:</strong></td>
-            <td><strong>{{ currency }} {{ "%0.2f"|format(total_amount) }}</strong></td>
-        </tr>
-        {% endif %}
-    </table>
-
-    <div class="notes">
-        <p><strong>Due Date:</strong> {{ due_date }}</p>
-        {% if notes %}
-        <p><strong>Notes:</strong> {{ notes }}</p>
-        {% endif %}
-    </div>
-</body>
-</html>
-"""
-        template = Template(template_str)
-        return template.render(**data)
+        return self.templates.render('bill', data)
 
     def _render_statement_template(self, data: Dict) -> str:
         """Render bank statement HTML template"""
-        template_str = """
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <style>
-        body { font-family: Arial, sans-serif; font-size: 11px; margin: 20px; }
-        .header { text-align: center; margin-bottom: 30px; }
-        .header h1 { margin: 0; font-size: 24px; }
-        .account-info { margin: 20px 0; }
-        table { width: 100%; border-collapse: collapse; margin: 20px 0; font-size: 10px; }
-        th, td { border: 1px solid #ddd; padding: 6px; text-align: left; }
-        th { background-color: #f2f2f2; }
-        .amount-debit { color: #d9534f; }
-        .amount-credit { color: #5cb85c; }
-        .summary { margin-top: 30px; }
-    </style>
-</head>
-<body>
-    <div class="header">
-        <h1>BANK STATEMENT</h1>
-        <p>{{ bank_name }}</p>
-        <p>Statement Period: {{ start_date }} to {{ end_date }}</p>
-    </div>
-
-    <div class="account-info">
-        <p><strong>Account Holder:</strong> {{ account_name }}</p>
-        <p><strong>Account Number:</strong> {{ account_number }}</p>
-        <p><strong>IFSC Code:</strong> {{ ifsc_code }}</p>
-    </div>
-
-    <table>
-        <thead>
-            <tr>
-                <th style="width: 12%;">Date</th>
-                <th>Description</th>
-                <th style="width: 15%;">Debit</th>
-                <th style="width: 15%;">Credit</th>
-                <th style="width: 15%;">Balance</th>
-            </tr>
-        </thead>
-        <tbody>
-            {% for txn in transactions %}
-            <tr>
-                <td>{{ txn.date }}</td>
-                <td>{{ txn.description }}</td>
-                <td class="amount-debit">{% if txn.debit > 0 %}₹ {{ "%0.2f"|format(txn.debit) }}{% endif %}</td>
-                <td class="amount-credit">{% if txn.credit > 0 %}₹ {{ "%0.2f"|format(txn.credit) }}{% endif %}</td>
-                <td>₹ {{ "%0.2f"|format(txn.balance) }}</td>
-            </tr>
-            {% endfor %}
-        </tbody>
-    </table>
-
-    <div class="summary">
-        <p><strong>Opening Balance:</strong> ₹ {{ "%0.2f"|format(opening_balance) }}</p>
-        <p><strong>Closing Balance:</strong> ₹ {{ "%0.2f"|format(closing_balance) }}</p>
-    </div>
-</body>
-</html>
-"""
-        template = Template(template_str)
-        return template.render(**data)
+        return self.templates.render('statement', data)
 
 
 if __name__ == "__main__":
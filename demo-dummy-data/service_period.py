@@ -0,0 +1,85 @@
+"""
+Komplai Demo Pipeline - Service Period Parser
+Compiled, memoized parsing of service periods from line item descriptions
+"""
+
+import re
+import pandas as pd
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional, Tuple
+
+
+# Generators write "Service Period: 01 Nov 2025 – 30 Nov 2025"; older sheets use "Term: ..."
+SERVICE_PERIOD_PATTERN = re.compile(
+    r'(?:Service Period|Term):\s*(\d{1,2}\s+[A-Za-z]+\s+\d{4})\s*[–—-]\s*(\d{1,2}\s+[A-Za-z]+\s+\d{4})'
+)
+
+DATE_FORMATS = ('%d %b %Y', '%d %B %Y')
+
+
+@lru_cache(maxsize=4096)
+def parse_period_date(text: str) -> Optional[datetime]:
+    """
+    Parse a service period date such as "01 Nov 2025" (or "01 November 2025")
+
+    Cached because the same handful of period boundaries repeat across every
+    recurring document.
+    """
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def parse_service_period(description: str) -> Optional[Tuple[datetime, datetime]]:
+    """
+    Extract the service period from a line item description
+
+    Returns:
+        (start_date, end_date), or None if there is no parseable period
+    """
+    if not isinstance(description, str):
+        return None
+
+    match = SERVICE_PERIOD_PATTERN.search(description)
+    if not match:
+        return None
+
+    start_date = parse_period_date(' '.join(match.group(1).split()))
+    end_date = parse_period_date(' '.join(match.group(2).split()))
+    if start_date is None or end_date is None:
+        return None
+
+    return (start_date, end_date)
+
+
+def parse_service_periods(descriptions: pd.Series) -> pd.DataFrame:
+    """
+    Extract service periods from a whole column of descriptions at once
+
+    Args:
+        descriptions: Line item descriptions (non-strings are treated as empty)
+
+    Returns:
+        DataFrame aligned to descriptions with Service_Start and Service_End
+        columns (NaT where there is no parseable period)
+    """
+    text = descriptions.where(descriptions.map(lambda value: isinstance(value, str)), '')
+    parts = text.str.extract(SERVICE_PERIOD_PATTERN)
+
+    periods = pd.DataFrame(index=descriptions.index)
+    for column, part in (('Service_Start', parts[0]), ('Service_End', parts[1])):
+        normalized = part.str.split().str.join(' ')
+        parsed = pd.to_datetime(normalized, format=DATE_FORMATS[0], errors='coerce')
+        fallback = parsed.isna() & normalized.notna()
+        if fallback.any():
+            parsed[fallback] = pd.to_datetime(normalized[fallback], format=DATE_FORMATS[1], errors='coerce')
+        periods[column] = parsed
+
+    # A period is only usable when both ends parsed
+    incomplete = periods['Service_Start'].isna() | periods['Service_End'].isna()
+    periods.loc[incomplete, ['Service_Start', 'Service_End']] = pd.NaT
+    return periods
@@ -0,0 +1,202 @@
+"""
+Komplai Demo Pipeline - Statement Renderer
+Paginated bank statements rendered in page batches and merged into one PDF
+"""
+
+import io
+import itertools
+import os
+import tempfile
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# pypdf merges the batch PDFs; without it a statement is laid out in one pass
+try:
+    from pypdf import PdfWriter
+    PYPDF_AVAILABLE = True
+except ImportError:
+    PYPDF_AVAILABLE = False
+    PdfWriter = None
+
+
+ROWS_PER_PAGE = 28
+
+# The first page also carries the bank and account details
+FIRST_PAGE_ROWS = 20
+
+# Pages laid out per WeasyPrint call; bounds layout memory whatever the period length
+PAGES_PER_BATCH = 20
+
+# Statement fields copied onto every batch (everything except the transactions)
+HEADER_FIELDS = ('bank_name', 'account_name', 'account_number', 'ifsc_code',
+                 'start_date', 'end_date', 'opening_balance', 'closing_balance')
+
+
+def page_count(transaction_count: int, rows_per_page: int = ROWS_PER_PAGE,
+               first_page_rows: int = FIRST_PAGE_ROWS) -> int:
+    """Number of pages paginate_statement yields for this many transactions"""
+    if transaction_count <= first_page_rows:
+        return 1
+    remaining = transaction_count - first_page_rows
+    return 1 + -(-remaining // rows_per_page)
+
+
+def paginate_statement(transactions: Iterable[Dict], opening_balance: float,
+                       rows_per_page: int = ROWS_PER_PAGE,
+                       first_page_rows: int = FIRST_PAGE_ROWS) -> Iterator[Dict]:
+    """
+    Split statement rows into pages with brought/carried-forward balances
+
+    Transactions are consumed lazily (one page ahead, to know which page is
+    last), so a generator of rows is never materialized.
+
+    Args:
+        transactions: Statement rows (date, description, debit, credit, balance)
+        opening_balance: Balance before the first row
+        rows_per_page: Rows on each page after the first
+        first_page_rows: Rows on the first page
+
+    Yields:
+        Dicts with number (1-based), transactions, brought_forward,
+        carried_forward, is_first and is_last
+    """
+    rows = iter(transactions)
+    page = list(itertools.islice(rows, first_page_rows))
+    number = 1
+    brought_forward = opening_balance
+
+    while True:
+        following = list(itertools.islice(rows, rows_per_page))
+        carried_forward = page[-1]['balance'] if page else brought_forward
+        yield {
+            'number': number,
+            'transactions': page,
+            'brought_forward': brought_forward,
+            'carried_forward': carried_forward,
+            'is_first': number == 1,
+            'is_last': not following
+        }
+        if not following:
+            return
+        page = following
+        number += 1
+        brought_forward = carried_forward
+
+
+class StatementRenderer:
+    """
+    Render bank statements page batch by page batch
+
+    Rows are split into fixed-size pages, each opening with the balance
+    brought forward and closing with the balance carried forward. Every
+    batch of pages is laid out by its own render call and spooled to a
+    temporary file, so layout memory depends on the batch size rather than
+    the statement length. The batch files are then merged into one PDF; the
+    merge holds every page object, which is far smaller than the layout but
+    still grows with the statement. A statement that fits in one batch goes
+    through the PDF cache like any other document.
+    """
+
+    def __init__(self, pdf_generator, rows_per_page: int = ROWS_PER_PAGE,
+                 first_page_rows: int = FIRST_PAGE_ROWS, pages_per_batch: int = PAGES_PER_BATCH):
+        """
+        Args:
+            pdf_generator: PDFGenerator providing templates, stylesheets and output
+            rows_per_page: Transactions per page after the first
+            first_page_rows: Transactions on the first page
+            pages_per_batch: Pages laid out per render call
+        """
+        self.pdf_gen = pdf_generator
+        self.rows_per_page = rows_per_page
+        self.first_page_rows = first_page_rows
+        self.pages_per_batch = pages_per_batch
+
+        if not PYPDF_AVAILABLE:
+            print("⚠ pypdf not installed; statements are laid out in a single pass")
+
+    def render(self, statement_data: Dict, output_filename: str = None,
+               return_bytes: bool = False) -> Dict:
+        """
+        Render a statement to PDF
+
+        Args:
+            statement_data: Statement header fields plus 'transactions'
+                (a list or any iterable of rows)
+            output_filename: File to write in the generator's output_dir (None = bytes only)
+            return_bytes: Include the PDF bytes in the result
+
+        Returns:
+            Dict as from PDFGenerator.render_document, plus 'pages'
+        """
+        transactions = statement_data.get('transactions', [])
+        header = {field: statement_data.get(field) for field in HEADER_FIELDS}
+        header['total_pages'] = (page_count(len(transactions), self.rows_per_page, self.first_page_rows)
+                                 if hasattr(transactions, '__len__') else None)
+
+        pages = paginate_statement(transactions, statement_data.get('opening_balance') or 0.0,
+                                   self.rows_per_page, self.first_page_rows)
+        batch_size = self.pages_per_batch if PYPDF_AVAILABLE else None
+        first_batch = list(itertools.islice(pages, batch_size))
+
+        # Short statements: one render, served from the PDF cache when unchanged
+        if first_batch[-1]['is_last']:
+            result = self.pdf_gen.render_document('statement_pages', dict(header, pages=first_batch),
+                                                  output_filename, return_bytes)
+            result['kind'] = 'statement'
+            result['pages'] = first_batch[-1]['number']
+            return result
+
+        with tempfile.TemporaryDirectory(prefix='statement_') as spool_dir:
+            batch_paths = []
+            batch = first_batch
+            while batch:
+                path = os.path.join(spool_dir, f"batch_{len(batch_paths):05d}.pdf")
+                self.pdf_gen.render_to_file('statement_pages', dict(header, pages=batch), path)
+                batch_paths.append(path)
+                total_pages = batch[-1]['number']
+                batch = list(itertools.islice(pages, batch_size))
+
+            pdf_bytes = self._merge(batch_paths, output_filename, return_bytes)
+
+        return {
+            'kind': 'statement',
+            'filename': output_filename,
+            'path': os.path.join(self.pdf_gen.output_dir, output_filename) if output_filename else None,
+            'pdf_bytes': pdf_bytes,
+            'cached': False,
+            'error': None,
+            'pages': total_pages
+        }
+
+    def _merge(self, batch_paths: List[str], output_filename: Optional[str],
+               return_bytes: bool) -> Optional[bytes]:
+        """
+        Concatenate batch PDFs into the output file and/or bytes
+
+        Returns:
+            Merged PDF bytes if return_bytes, otherwise None
+        """
+        writer = PdfWriter()
+        for path in batch_paths:
+            writer.append(path)
+
+        output_path = os.path.join(self.pdf_gen.output_dir, output_filename) if output_filename else None
+        if output_path and os.path.lexists(output_path):
+            # Replace rather than overwrite (the old file may be a link into the PDF cache)
+            os.remove(output_path)
+
+        try:
+            if not return_bytes:
+                # Straight to disk, without a second in-memory copy as bytes
+                if output_path:
+                    with open(output_path, 'wb') as f:
+                        writer.write(f)
+                return None
+
+            buffer = io.BytesIO()
+            writer.write(buffer)
+            if output_path:
+                with open(output_path, 'wb') as f:
+                    f.write(buffer.getbuffer())
+            return buffer.getvalue()
+        finally:
+            writer.close()
@@ -0,0 +1,147 @@
+"""
+Komplai Demo Pipeline - Open Items Subledger
+Tracks outstanding invoices (AR) and bills (AP) so each document is settled once
+"""
+
+import pandas as pd
+from typing import Dict, Iterable, List, Optional
+
+
+def _last_id(df: pd.DataFrame, row_count: int, id_column: str) -> Optional[str]:
+    """ID of row row_count - 1 in df (None if there is no such row or column)"""
+    if row_count == 0 or len(df) < row_count or id_column not in df.columns:
+        return None
+    return str(df[id_column].iat[row_count - 1])
+
+
+class OpenItemsLedger:
+    """
+    Outstanding amount per document, keyed by document ID
+
+    Documents enter the ledger when they are appended to their master and
+    leave it once a bank transaction referencing them is applied, so the
+    working set is only the open items rather than the full history. Both
+    masters and Bank_Transactions are append-only, so each sync only reads
+    the rows added since the previous one; sync from the sheets as saved
+    (the ID of the last row read is checked, and a replaced master or
+    history is read again from the start).
+    """
+
+    def __init__(self, id_column: str, amount_column: str):
+        """
+        Args:
+            id_column: Document ID column in the master (e.g. 'Invoice_ID')
+            amount_column: Amount that is outstanding until settled (e.g. 'Total_Amount')
+        """
+        self.id_column = id_column
+        self.amount_column = amount_column
+        self._open: Dict[str, float] = {}
+        self._document_count = 0
+        self._bank_row_count = 0
+        self._last_document_id: Optional[str] = None
+        self._last_bank_id: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._open)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._open
+
+    def sync_documents(self, documents_df: pd.DataFrame):
+        """
+        Open any documents appended to the master since the last sync
+
+        Args:
+            documents_df: Full invoices or bills master
+        """
+        if _last_id(documents_df, self._document_count, self.id_column) != self._last_document_id:
+            # Master was replaced rather than appended to - start over
+            self._open = {}
+            self._document_count = 0
+            self._bank_row_count = 0
+            self._last_bank_id = None
+
+        self._last_document_id = _last_id(documents_df, len(documents_df), self.id_column)
+        if len(documents_df) == self._document_count or self.id_column not in documents_df.columns:
+            self._document_count = len(documents_df)
+            return
+
+        new_docs = documents_df.iloc[self._document_count:]
+        ids = new_docs[self.id_column]
+        amounts = pd.to_numeric(new_docs[self.amount_column], errors='coerce').fillna(0.0)
+
+        valid = ids.notna() & (ids.astype(str).str.strip() != '')
+        self._open.update(zip(ids[valid].astype(str), amounts[valid].astype(float)))
+        self._document_count = len(documents_df)
+
+    def sync_settlements(self, bank_df: pd.DataFrame):
+        """
+        Settle documents referenced by Bank_Transactions rows added since the last sync
+
+        Args:
+            bank_df: Full Bank_Transactions history
+        """
+        if _last_id(bank_df, self._bank_row_count, 'Transaction_ID') != self._last_bank_id:
+            self._bank_row_count = 0
+        self._last_bank_id = _last_id(bank_df, len(bank_df), 'Transaction_ID')
+
+        if len(bank_df) > self._bank_row_count and 'Reference_Number' in bank_df.columns:
+            references = bank_df['Reference_Number'].iloc[self._bank_row_count:]
+            self.settle_many(references.dropna().astype(str))
+
+        self._bank_row_count = len(bank_df)
+
+    def apply_bank_transactions(self, transactions: List[Dict]):
+        """
+        Settle documents referenced by newly saved bank transactions
+
+        Call only once the transactions are saved, so an unsaved transaction
+        never closes its document. The generator always receives or pays a
+        document in full, so a matching Reference_Number closes the item.
+        Settling a closed item is a no-op, so the same rows being synced again
+        from Bank_Transactions later is safe.
+        """
+        self.settle_many(
+            str(txn['Reference_Number']) for txn in transactions
+            if txn.get('Reference_Number') is not None
+        )
+
+    def settle(self, doc_id: str, amount: Optional[float] = None) -> float:
+        """
+        Reduce a document's outstanding amount, closing it when fully settled
+
+        Args:
+            doc_id: Document ID
+            amount: Amount settled in document currency (None = settle in full)
+
+        Returns:
+            Remaining outstanding amount (0.0 if closed or not open)
+        """
+        outstanding = self._open.get(doc_id)
+        if outstanding is None:
+            return 0.0
+
+        remaining = 0.0 if amount is None else round(outstanding - amount, 2)
+        if remaining <= 0:
+            del self._open[doc_id]
+            return 0.0
+
+        self._open[doc_id] = remaining
+        return remaining
+
+    def settle_many(self, doc_ids: Iterable[str]):
+        """Settle several documents in full"""
+        for doc_id in doc_ids:
+            self._open.pop(doc_id, None)
+
+    def outstanding(self, doc_id: str) -> float:
+        """Get the outstanding amount for a document (0.0 if settled or unknown)"""
+        return self._open.get(doc_id, 0.0)
+
+    def open_items(self) -> Dict[str, float]:
+        """Get a copy of all open document IDs and their outstanding amounts"""
+        return dict(self._open)
+
+    def filter_open(self, documents: List[Dict]) -> List[Dict]:
+        """Keep only the documents that are still open"""
+        return [doc for doc in documents if doc.get(self.id_column) in self._open]
@@ -0,0 +1,202 @@
+"""
+Komplai Demo Pipeline - Tax Rules
+TDS and GST/sales tax rules compiled once from config.yaml into lookup tables
+"""
+
+import json
+import os
+import numpy as np
+import pandas as pd
+import yaml
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from money import to_minor_array, from_minor_array, apply_rate_array
+
+
+# Read when no config is passed in, so there is one copy of the rates
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.yaml')
+
+DEFAULT_PAYEE_TYPE = 'corporate'
+
+# Used when config.yaml has no tax.indirect section
+DEFAULT_INDIRECT = {
+    'INR': {'tax_type': 'IGST', 'rates': [0.18]},
+    'USD': {'tax_type': 'Sales Tax', 'rates': [0.04, 0.06, 0.08]}
+}
+
+
+def _section_rates(section: Dict, payee_type: str) -> Dict[str, float]:
+    """
+    Rate per account list of one TDS section
+
+    `applies_to` uses `rate`, else `rate_<default_rate>` when the section
+    names its default payee type, else `rate_<payee_type>`; `<kind>_applies_to`
+    lists use `rate_<kind>`.
+
+    Raises:
+        ValueError: If `applies_to` has no rate to use
+    """
+    default_key = f"rate_{section.get('default_rate', payee_type)}"
+    default = section.get('rate', section.get(default_key))
+    if default is None and section.get('applies_to'):
+        rate_keys = sorted(key for key in section if key.startswith('rate_'))
+        raise ValueError(f"TDS section has no 'rate' or '{default_key}' for applies_to "
+                         f"(set default_rate to one of {', '.join(rate_keys) or 'rate_*'})")
+
+    rates = {}
+    for key, accounts in section.items():
+        if key == 'applies_to':
+            rate = default
+        elif key.endswith('_applies_to'):
+            rate = section[f"rate_{key[:-len('_applies_to')]}"]
+        else:
+            continue
+        for account in accounts or []:
+            rates[account] = float(rate)
+    return rates
+
+
+class TaxRuleEngine:
+    """
+    Lookup tables for withholding (TDS) and indirect tax
+
+    The TDS table is an expense-account index with section, rate and
+    threshold arrays alongside, so a whole column of accounts resolves with
+    one get_indexer call. Indirect tax is keyed by document currency.
+    """
+
+    def __init__(self, tds_sections: Dict, indirect: Dict = None, payee_type: str = DEFAULT_PAYEE_TYPE):
+        table = {}
+        for section, rule in (tds_sections or {}).items():
+            threshold = float(rule.get('threshold', 0.0))
+            for account, rate in _section_rates(rule, payee_type).items():
+                table[account] = (str(section), rate, threshold)
+
+        self.accounts = pd.Index(list(table), dtype=object)
+        sections, rates, thresholds = zip(*table.values()) if table else ((), (), ())
+        self.sections = np.array(sections, dtype=object)
+        self.rates = np.array(rates, dtype=np.float64)
+        self.thresholds = np.array(thresholds, dtype=np.float64)
+
+        self.indirect = {
+            currency: {'tax_type': rule['tax_type'], 'rates': [float(rate) for rate in rule['rates']]}
+            for currency, rule in (indirect or DEFAULT_INDIRECT).items()
+        }
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'TaxRuleEngine':
+        """Compile the config's tax section"""
+        tax = config.get('tax') or {}
+        return cls(tds_sections=tax.get('tds_sections') or {},
+                   indirect=tax.get('indirect'),
+                   payee_type=tax.get('tds_payee_type', DEFAULT_PAYEE_TYPE))
+
+    # ------------------------------------------------------------------------
+    # Single lookups
+    # ------------------------------------------------------------------------
+
+    def tds_section(self, expense_account: str) -> Tuple[Optional[str], float]:
+        """
+        TDS section and rate for an expense account
+
+        Returns:
+            (section, rate), or (None, 0.0) if no section applies
+        """
+        position = self.accounts.get_indexer([expense_account])[0]
+        if position < 0:
+            return (None, 0.0)
+        return (self.sections[position], float(self.rates[position]))
+
+    def tds_threshold(self, expense_account: str) -> float:
+        """Annual threshold of the account's TDS section (0.0 if none applies)"""
+        position = self.accounts.get_indexer([expense_account])[0]
+        return float(self.thresholds[position]) if position >= 0 else 0.0
+
+    def indirect_tax(self, currency: str) -> Tuple[str, List[float]]:
+        """
+        Indirect tax for a document currency
+
+        Returns:
+            (tax_type, candidate rates); INR documents have the single GST rate,
+            USD documents pick one of the state sales tax rates
+        """
+        rule = self.indirect.get(currency, self.indirect['INR'])
+        return (rule['tax_type'], rule['rates'])
+
+    # ------------------------------------------------------------------------
+    # Column evaluation
+    # ------------------------------------------------------------------------
+
+    def evaluate_tds(self, expense_accounts: pd.Series, subtotals: pd.Series,
+                     currencies: pd.Series) -> pd.DataFrame:
+        """
+        Apply TDS to whole columns of bills
+
+        TDS is only deducted from INR vendors.
+
+        Returns:
+            DataFrame aligned to the inputs with TDS_Applicable, TDS_Section,
+            TDS_Rate and TDS_Amount (rounded to the rupee)
+        """
+        positions = self.accounts.get_indexer(pd.Index(expense_accounts))
+        applicable = (positions >= 0) & (np.asarray(currencies) == 'INR')
+
+        # Unknown accounts (position -1) land on the trailing no-TDS entry
+        sections = np.where(applicable, np.append(self.sections, None)[positions], None)
+        rates = np.where(applicable, np.append(self.rates, 0.0)[positions], 0.0)
+        amounts = apply_rate_array(to_minor_array(subtotals), rates, 'TDS')
+
+        return pd.DataFrame({
+            'TDS_Applicable': applicable,
+            'TDS_Section': sections,
+            'TDS_Rate': rates,
+            'TDS_Amount': from_minor_array(amounts)
+        }, index=subtotals.index)
+
+    def evaluate_indirect(self, currencies: pd.Series, subtotals: pd.Series,
+                          rates: pd.Series) -> pd.DataFrame:
+        """
+        Apply GST/sales tax to whole columns of documents
+
+        Args:
+            rates: Rate chosen for each document (from indirect_tax candidates)
+
+        Returns:
+            DataFrame aligned to the inputs with Tax_Type and Tax_Amount
+        """
+        default = self.indirect['INR']['tax_type']
+        tax_types = [self.indirect.get(currency, {}).get('tax_type', default) for currency in currencies]
+        amounts = apply_rate_array(to_minor_array(subtotals), np.asarray(rates, dtype=np.float64), tax_types)
+        return pd.DataFrame({
+            'Tax_Type': tax_types,
+            'Tax_Amount': from_minor_array(amounts)
+        }, index=subtotals.index)
+
+
+_ENGINE_CACHE: Dict[str, TaxRuleEngine] = {}
+
+
+@lru_cache(maxsize=1)
+def _default_config() -> Dict:
+    """config.yaml beside this module, read once"""
+    with open(DEFAULT_CONFIG_PATH, 'r') as f:
+        return yaml.safe_load(f)
+
+
+def load_tax_rules(config: Dict = None) -> TaxRuleEngine:
+    """
+    Get the rule engine for config's tax section (compiled once per process)
+
+    Args:
+        config: Pipeline config; the config.yaml next to this module is used
+            when None or when it has no tax section
+    """
+    if config is None or not config.get('tax'):
+        # A config without a tax section gets the shipped rates, not empty tables
+        config = _default_config()
+
+    key = json.dumps(config.get('tax') or {}, sort_keys=True, default=str)
+    if key not in _ENGINE_CACHE:
+        _ENGINE_CACHE[key] = TaxRuleEngine.from_config(config)
+    return _ENGINE_CACHE[key]
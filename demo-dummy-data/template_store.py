@@ -0,0 +1,135 @@
+"""
+Komplai Demo Pipeline - Template Store
+Document templates loaded from disk, compiled once per process and bytecode-cached
+"""
+
+import hashlib
+import os
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache, Template
+from typing import Dict, Optional, Tuple
+
+
+MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_TEMPLATE_DIR = os.path.join(MODULE_DIR, 'templates')
+
+DEFAULT_TEMPLATES = {
+    'invoice': 'invoice_template.html',
+    'bill': 'bill_template.html',
+    'statement': 'statement_template.html',
+    'statement_pages': 'statement_pages_template.html',
+    'pack': 'pack_template.html'
+}
+
+# Stylesheet per document kind, relative to the template directory
+DEFAULT_STYLESHEETS = {
+    'invoice': 'styles/document.css',
+    'bill': 'styles/document.css',
+    'statement': 'styles/statement.css',
+    'statement_pages': 'styles/statement.css',
+    'pack': 'styles/pack.css'
+}
+
+# Document bodies shared by the standalone templates and the pack template,
+# relative to the template directory
+PARTIALS_DIR = 'partials'
+
+
+def resolve_template_dir(template_dir: Optional[str]) -> str:
+    """Template directory as an absolute path (relative paths are relative to this module)"""
+    if not template_dir:
+        return DEFAULT_TEMPLATE_DIR
+    if os.path.isabs(template_dir):
+        return template_dir
+    return os.path.normpath(os.path.join(MODULE_DIR, template_dir))
+
+
+class TemplateStore:
+    """
+    Invoice, bill and statement templates from a template directory
+
+    The Jinja environment keeps compiled templates in memory, so each
+    template is parsed once per process; with auto_reload it re-checks the
+    file's mtime on lookup and recompiles only after an edit. Compiled
+    bytecode is also written to cache_dir, so a fresh process (e.g. each
+    scheduled container run) loads templates without re-parsing them.
+    """
+
+    def __init__(self, template_dir: str = None, cache_dir: str = None,
+                 templates: Dict[str, str] = None):
+        """
+        Args:
+            template_dir: Directory with the HTML templates (default: ./templates)
+            cache_dir: Directory for Jinja bytecode (no disk cache if None)
+            templates: Template file name per document kind
+        """
+        self.template_dir = resolve_template_dir(template_dir)
+        self.templates = dict(DEFAULT_TEMPLATES, **(templates or {}))
+
+        bytecode_cache = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(cache_dir)
+
+        self.env = Environment(
+            loader=FileSystemLoader(self.template_dir),
+            bytecode_cache=bytecode_cache,
+            auto_reload=True
+        )
+        self.env.globals['render_partial'] = self.render_partial
+        self._versions: Dict[str, Tuple] = {}
+
+    def get(self, kind: str) -> Template:
+        """Compiled template for a document kind ('invoice', 'bill', 'statement', ...)"""
+        return self.env.get_template(self.templates[kind])
+
+    def render(self, kind: str, data: Dict) -> str:
+        """Render a document kind with data"""
+        return self.get(kind).render(**data)
+
+    def render_partial(self, name: str, data: Dict) -> str:
+        """Render a document body from partials/ with its own data (lets the pack embed documents)"""
+        return self.env.get_template(f"{PARTIALS_DIR}/{name}.html").render(**data)
+
+    def stylesheet_path(self, kind: str) -> str:
+        """Path of the stylesheet for a document kind"""
+        return os.path.join(self.template_dir, DEFAULT_STYLESHEETS[kind])
+
+    def version(self, kind: str) -> str:
+        """
+        Content hash of a document kind's template, stylesheet and the partials
+
+        Re-hashed only when a file's mtime or size changes.
+        """
+        paths = (os.path.join(self.template_dir, self.templates[kind]), self.stylesheet_path(kind)) + \
+            self._partial_paths()
+        stamp = tuple((stat.st_mtime_ns, stat.st_size) for stat in map(os.stat, paths))
+
+        cached = self._versions.get(kind)
+        if cached is None or cached[0] != stamp:
+            digest = hashlib.sha256()
+            for path in paths:
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+            cached = (stamp, digest.hexdigest())
+            self._versions[kind] = cached
+        return cached[1]
+
+    def _partial_paths(self) -> Tuple[str, ...]:
+        """Paths of the shared partial templates"""
+        partials_dir = os.path.join(self.template_dir, PARTIALS_DIR)
+        if not os.path.isdir(partials_dir):
+            return ()
+        return tuple(os.path.join(partials_dir, name) for name in sorted(os.listdir(partials_dir)))
+
+
+_STORE_CACHE: Dict[Tuple, TemplateStore] = {}
+
+
+def get_template_store(template_dir: str = None, cache_dir: str = None,
+                       templates: Dict[str, str] = None) -> TemplateStore:
+    """Get the store for a template directory (one per process, shared by all generators)"""
+    key = (resolve_template_dir(template_dir), cache_dir, tuple(sorted((templates or {}).items())))
+    if key not in _STORE_CACHE:
+        _STORE_CACHE[key] = TemplateStore(template_dir, cache_dir, templates)
+    return _STORE_CACHE[key]
@@ -14,6 +14,24 @@ import utils
 from invoice_generator import InvoiceGenerator
 from bill_generator import BillGenerator
 from bank_generator import BankTransactionGenerator
+from document_index import InvoiceDueDateIndex, BillMonthIndex, BankStatementIndex
+from ledger import TransactionLedger
+from bank_state import BankTailState
+from subledger import OpenItemsLedger
+from reconciliation import BankReconciler
+from fx_rates import FXRateSeries
+from service_period import parse_service_periods
+from business_calendar import BusinessCalendar
+from rng import RNGFactory
+from validation_engine import ValidationEngine
+import money
+from tax_rules import TaxRuleEngine, load_tax_rules
+from template_store import TemplateStore
+from pdf_cache import PDFCache
+from statement_renderer import paginate_statement, page_count
+from native_pdf import NativePDFRenderer, text_width, fit_text
+import pdf_benchmark
+from excel_manager import ExcelManager
 
 def create_mock_entities():
     """Create mock entities data for testing"""
@@ -111,6 +129,21 @@ def test_utils():
     biz_day = utils.add_business_days(test_date, 5)
     print(f"✓ add_business_days: {test_date.date()} + 5 business days = {biz_day.date()}")
 
+    calendar = BusinessCalendar(holidays=['2026-01-26'])
+    shifted = calendar.add_business_days(pd.Series([datetime(2026, 1, 23), datetime(2026, 1, 24)]), 1)
+    assert [d.date() for d in shifted] == [datetime(2026, 1, 27).date()] * 2
+    assert utils.week_contains_date(datetime(2026, 1, 19), datetime(2026, 1, 25), 25)
+    runs = calendar.payment_runs_between(datetime(2026, 1, 19), datetime(2026, 1, 25))
+    assert runs == [(datetime(2026, 1, 23), 2026, 1)], runs  # 25th is a Sunday
+    print(f"✓ BusinessCalendar: Fri 23 Jan + 1 = {shifted[0].date()}, January run on {runs[0][0].date()}")
+
+    factory = RNGFactory(tenant='acme', root_seed=7)
+    week_draws = factory.stream(test_date, 'bank').random(3).tolist()
+    assert factory.stream(test_date + timedelta(days=2), 'bank').random(3).tolist() == week_draws  # same ISO week
+    assert factory.stream(test_date, 'invoices').random(3).tolist() != week_draws
+    assert RNGFactory(tenant='other', root_seed=7).stream(test_date, 'bank').random(3).tolist() != week_draws
+    print(f"✓ RNGFactory: reproducible per (tenant, week, generator), independent across keys")
+
     indian_date = utils.format_indian_date(test_date)
     print(f"✓ format_indian_date: {indian_date}")
 
@@ -152,6 +185,46 @@ def test_utils():
     tds_info = utils.get_tds_section_for_expense('Rent Expense')
     print(f"✓ get_tds_section_for_expense('Rent Expense'): {tds_info}")
 
+    # Fixed-point money: exact paise, per-tax rounding
+    assert money.to_minor(2.675) == 268
+    assert utils.calculate_igst(12345.67) == 2222.22
+    assert utils.calculate_tds(12345.67, 0.10) == 1235.0  # nearest rupee
+    amounts = money.to_minor_array([0.1] * 10)
+    assert amounts.sum() == 100 and money.from_minor(amounts.sum()) == 1.0
+    taxes = money.apply_rate_array(money.to_minor_array([12345.67, 12345.67]), [0.18, 0.10], ['IGST', 'TDS'])
+    assert taxes.tolist() == [222222, 123500]
+    print("✓ money: paise arithmetic and per-tax rounding")
+
+    # Tax rules compiled from config: one table, whole columns at once
+    rules = TaxRuleEngine({
+        '194J': {'default_rate': 'professional', 'rate_professional': 0.10, 'rate_technical': 0.02, 'threshold': 50000,
+                 'applies_to': ['Consultant Expense'], 'technical_applies_to': ['Technical Services']},
+        '194H': {'rate': 0.05, 'threshold': 15000, 'applies_to': ['Commission Expense']}
+    })
+    assert rules.tds_section('Technical Services') == ('194J', 0.02)
+    assert rules.tds_section('Cloud Hosting') == (None, 0.0)
+    assert rules.tds_threshold('Commission Expense') == 15000
+    tds = rules.evaluate_tds(pd.Series(['Consultant Expense', 'Commission Expense', 'Cloud Hosting', 'Consultant Expense']),
+                             pd.Series([12345.67, 20000.0, 5000.0, 8000.0]),
+                             pd.Series(['INR', 'INR', 'INR', 'USD']))
+    assert tds['TDS_Section'].tolist() == ['194J', '194H', None, None]
+    assert tds['TDS_Amount'].tolist() == [1235.0, 1000.0, 0.0, 0.0]
+    assert utils.get_tds_section_for_expense('Commission Expense') == ('194H', 0.05)
+    try:
+        TaxRuleEngine({'194J': {'rate_professional': 0.10, 'rate_technical': 0.02, 'applies_to': ['Consultant Expense']}})
+        assert False, "ambiguous default rate accepted"
+    except ValueError:
+        pass
+    print("✓ TaxRuleEngine: sections, rates and column evaluation")
+
+    # A config without a tax section gets the shipped rates
+    no_tax = load_tax_rules({'pipeline': {}})
+    assert no_tax.tds_section('Rent Expense') == ('194I', 0.10)
+    assert no_tax.tds_section('Repairs and Maintenance') == ('194C', 0.02)
+    assert no_tax.tds_section('Consultant Expense') == ('194J', 0.10)
+    assert utils.get_tds_section_for_expense('Repairs and Maintenance', {'pipeline': {}}) == ('194C', 0.02)
+    print("✓ load_tax_rules falls back to config.yaml when the tax section is missing")
+
     # Validation functions
     print("\n[Validation Functions]")
     try:
@@ -188,6 +261,12 @@ def test_utils():
     else:
         print("✗ extract_service_period: Failed to extract")
 
+    assert utils.extract_service_period("License (Term: 01 Nov 2025 - 30 Nov 2025)") == (datetime(2025, 11, 1), datetime(2025, 11, 30))
+    periods = parse_service_periods(pd.Series([desc, "Repair Services - January 2026", None]))
+    assert periods['Service_Start'].tolist()[0] == pd.Timestamp(2026, 1, 1)
+    assert periods['Service_End'].isna().tolist() == [False, True, True]
+    print(f"✓ parse_service_periods: {int(periods['Service_Start'].notna().sum())} of {len(periods)} descriptions")
+
     if period:
         is_deferred = utils.is_deferred_revenue(period, datetime(2026, 1, 1))
         print(f"✓ is_deferred_revenue: {is_deferred}")
@@ -292,6 +371,25 @@ def test_bank_generator(invoices_df, bills_df, config):
     matched = sum(1 for t in transactions if t['Reconciliation_Status'] == 'Matched')
     unmatched = sum(1 for t in transactions if t['Reconciliation_Status'] == 'Unmatched')
 
+    # This week's unsaved invoices are received but never enter the master index
+    unsaved = dict(invoices_df.iloc[0], Invoice_ID='INV-UNSAVED', Currency='INR', Due_Date=datetime(2026, 1, 2))
+    unsaved_gen = BankTransactionGenerator(config)
+    due = unsaved_gen._get_invoices_due_in_week(invoices_df.iloc[:0], datetime(2025, 12, 30),
+                                                datetime(2026, 1, 5), [unsaved])
+    assert [inv['Invoice_ID'] for inv in due] == ['INV-UNSAVED']
+    assert len(unsaved_gen.invoice_index) == 0
+    print("✓ Unsaved invoices considered without being indexed")
+
+    # Documents settle only once the pipeline confirms the transactions were saved
+    due_df = invoices_df.head(10).assign(Currency='INR', Due_Date=datetime(2026, 1, 8))
+    settle_gen = BankTransactionGenerator(config)
+    received, _ = settle_gen.generate_weekly_bank_statement(test_date, due_df, bills_df.iloc[:0], empty_bank)
+    received = [t['Reference_Number'] for t in received if t['Transaction_Type'] == 'Receipt']
+    assert received and all(ref in settle_gen.receivables for ref in received)
+    settle_gen.settle_documents([{'Reference_Number': ref} for ref in received])
+    assert not any(ref in settle_gen.receivables for ref in received)
+    print(f"✓ {len(received)} invoices stay open until their receipts are saved")
+
     print(f"\n[Transaction Breakdown]")
     print(f"  Receipts: {receipts}")
     print(f"  Payments: {payments}")
@@ -312,6 +410,714 @@ def test_bank_generator(invoices_df, bills_df, config):
 
     return pd.DataFrame(transactions)
 
+def test_bank_state(bank_df):
+    """Test the bank tail state round-trips and notices a changed Bank_Transactions sheet"""
+    print("\n" + "="*60)
+    print("TESTING BANK_STATE.PY")
+    print("="*60)
+
+    import os
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as state_dir:
+        path = os.path.join(state_dir, 'bank_tail_state.json')
+        state = BankTailState.from_transactions(path, bank_df)
+        state.save()
+        loaded = BankTailState.load(path)
+        assert loaded.matches(bank_df) and loaded.last_sequence == state.last_sequence
+        print(f"✓ Saved and reloaded: last TXN{loaded.last_sequence:08d}")
+
+    # Last row restored or edited behind the state's back
+    edited = bank_df.copy()
+    edited.loc[edited.index[-1], 'Running_Balance'] = edited['Running_Balance'].iloc[-1] + 100
+    assert not state.matches(edited) and not state.matches(bank_df.iloc[:-1])
+    assert BankTailState.from_transactions(path, edited).matches(edited)
+    print("✓ Mismatch detected after the sheet changed, rebuilt state matches")
+
+    # A row without a balance keeps the account's previous balance
+    account = bank_df['Bank_Account'].iloc[-1]
+    before = state.balance(account, 0.0)
+    state.record([{'Transaction_ID': 'TXN99999999', 'Bank_Account': account, 'Running_Balance': None}])
+    assert state.balance(account, 0.0) == before and state.last_sequence == 99999999
+    print(f"✓ Missing Running_Balance keeps {before:,.2f}")
+
+def test_document_index():
+    """Test sorted document indexes used by the bank generator"""
+    print("\n" + "="*60)
+    print("TESTING DOCUMENT_INDEX.PY")
+    print("="*60)
+
+    invoices = pd.DataFrame([
+        {'Invoice_ID': 'INV-1', 'Due_Date': datetime(2026, 1, 22)},
+        {'Invoice_ID': 'INV-2', 'Due_Date': '2026-01-09 00:00:00'},
+        {'Invoice_ID': 'INV-3', 'Due_Date': datetime(2026, 2, 15)},
+        {'Invoice_ID': None, 'Due_Date': ''},
+    ])
+
+    index = InvoiceDueDateIndex(payment_variance_days=3)
+    index.sync(invoices.iloc[:2])
+    index.sync(invoices)
+    index.append([{'Invoice_ID': 'INV-4', 'Due_Date': datetime(2026, 1, 14)}])
+
+    # Week of 12-18 Jan: INV-2 (9th + 3 days) and INV-4 overlap, INV-1 does not
+    due = index.due_in_window(datetime(2026, 1, 12), datetime(2026, 1, 18))
+    due_ids = [inv['Invoice_ID'] for inv in due]
+    assert due_ids == ['INV-2', 'INV-4'], due_ids
+    print(f"✓ InvoiceDueDateIndex.due_in_window: {due_ids}")
+
+    # Rows seen last time were replaced (an unsaved tail): rebuilt, not trusted by position
+    unsaved = InvoiceDueDateIndex(payment_variance_days=0)
+    saved = [{'Invoice_ID': invoice_id, 'Due_Date': datetime(2026, 1, day)} for invoice_id, day in (('A', 5), ('B', 6), ('C', 7))]
+    unsaved.sync(pd.DataFrame(saved + [{'Invoice_ID': 'D', 'Due_Date': datetime(2026, 3, 1)},
+                                       {'Invoice_ID': 'E', 'Due_Date': datetime(2026, 3, 2)}]))
+    unsaved.sync(pd.DataFrame(saved + [{'Invoice_ID': invoice_id, 'Due_Date': datetime(2026, 6, day)}
+                                       for invoice_id, day in (('X', 1), ('Y', 2), ('Z', 3))]))
+    assert unsaved.due_in_window(datetime(2026, 3, 1), datetime(2026, 3, 2)) == []
+    june = [inv['Invoice_ID'] for inv in unsaved.due_in_window(datetime(2026, 6, 1), datetime(2026, 6, 3))]
+    assert june == ['X', 'Y', 'Z'], june
+    print("✓ InvoiceDueDateIndex rebuilds when previously indexed rows change")
+
+    bills = pd.DataFrame([
+        {'Bill_ID': 'BILL-1', 'Bill_Date': datetime(2025, 12, 30)},
+        {'Bill_ID': 'BILL-2', 'Bill_Date': '2026-01-03 00:00:00'},
+        {'Bill_ID': 'BILL-3', 'Bill_Date': datetime(2026, 1, 28)},
+    ])
+
+    bill_index = BillMonthIndex()
+    bill_index.sync(bills)
+    bill_index.append([{'Bill_ID': 'BILL-4', 'Bill_Date': datetime(2026, 2, 2)}])
+
+    january_ids = [bill['Bill_ID'] for bill in bill_index.bills_for_month(2026, 1)]
+    assert january_ids == ['BILL-2', 'BILL-3'], january_ids
+    assert bill_index.bills_for_month(2026, 3) == []
+    replaced = pd.concat([bills, pd.DataFrame([{'Bill_ID': 'BILL-9', 'Bill_Date': datetime(2026, 3, 2)}])],
+                         ignore_index=True)
+    bill_index.sync(replaced)
+    assert [bill['Bill_ID'] for bill in bill_index.bills_for_month(2026, 3)] == ['BILL-9']
+    assert bill_index.bills_for_month(2026, 2) == []
+    print(f"✓ BillMonthIndex.bills_for_month(2026, 1): {january_ids}")
+
+    bank = pd.DataFrame([
+        {'Transaction_ID': 'TXN00000001', 'Transaction_Date': '2025-12-20 00:00:00', 'Description': 'Old',
+         'Debit': 0.0, 'Credit': 100.0, 'Running_Balance': 1100.0, 'Bank_Account': None},
+        {'Transaction_ID': 'TXN00000002', 'Transaction_Date': datetime(2026, 1, 5), 'Description': 'Rent',
+         'Debit': 300.0, 'Credit': 0.0, 'Running_Balance': 800.0, 'Bank_Account': None},
+    ])
+    statement_index = BankStatementIndex()
+    statement_index.sync(bank)
+    statement_index.append([
+        {'Transaction_ID': 'TXN00000003', 'Transaction_Date': datetime(2026, 1, 9), 'Description': 'Receipt',
+         'Debit': 0.0, 'Credit': 500.0, 'Running_Balance': 1300.0, 'Bank_Account': 'HDFC Bank Current Account'},
+        {'Transaction_ID': 'TXN00000004', 'Transaction_Date': datetime(2026, 1, 9), 'Description': 'USD receipt',
+         'Debit': 0.0, 'Credit': 70.0, 'Running_Balance': 70.0, 'Bank_Account': 'HDFC Bank EEFC Account'},
+    ])
+    period = statement_index.statement(datetime(2026, 1, 1), datetime(2026, 1, 15), account='HDFC Bank Current Account')
+    assert [t['description'] for t in period['transactions']] == ['Rent', 'Receipt']
+    assert (period['opening_balance'], period['closing_balance']) == (1100.0, 1300.0)
+    assert isinstance(bank['Transaction_Date'].iloc[0], str)  # caller's frame untouched
+    print(f"✓ BankStatementIndex.statement: {len(period['transactions'])} rows, "
+          f"{period['opening_balance']} -> {period['closing_balance']}")
+
+def test_ledger():
+    """Test columnar transaction ledger"""
+    print("\n" + "="*60)
+    print("TESTING LEDGER.PY")
+    print("="*60)
+
+    ledger = TransactionLedger()
+    ledger.extend([
+        {'Transaction_ID': 'TXN00000002', 'Transaction_Date': datetime(2026, 1, 8), 'Debit': 500.0, 'Credit': 0.0},
+        {'Transaction_ID': 'TXN00000001', 'Transaction_Date': datetime(2026, 1, 8), 'Debit': 0.0, 'Credit': 2000.0},
+        {'Transaction_ID': 'TXN00000003', 'Transaction_Date': pd.Timestamp('2026-01-06'), 'Debit': 250.25, 'Credit': 0.0},
+    ])
+    transactions, closing = ledger.build(10000.0)
+
+    order = [t['Transaction_ID'] for t in transactions]
+    balances = [t['Running_Balance'] for t in transactions]
+    assert order == ['TXN00000003', 'TXN00000001', 'TXN00000002'], order
+    assert balances == [9749.75, 11749.75, 11249.75], balances
+    assert closing == 11249.75
+    print(f"✓ TransactionLedger.build: {order} -> {balances}")
+
+    accounts = TransactionLedger()
+    accounts.extend([
+        {'Transaction_ID': 'TXN00000001', 'Transaction_Date': datetime(2026, 1, 6), 'Debit': 0.0, 'Credit': 700.0, 'Bank_Account': 'EEFC'},
+        {'Transaction_ID': 'TXN00000002', 'Transaction_Date': datetime(2026, 1, 7), 'Debit': 100.0, 'Credit': 0.0, 'Bank_Account': 'Current'},
+    ])
+    transactions, closing = accounts.build({'Current': 1000.0, 'EEFC': 50.0})
+    assert [t['Running_Balance'] for t in transactions] == [750.0, 900.0]
+    assert closing == {'Current': 900.0, 'EEFC': 750.0}, closing
+    print(f"✓ TransactionLedger.build per account: {closing}")
+
+    series = FXRateSeries('2026-01-01', [84.0, 84.5, 85.0])
+    assert series.rate_on(datetime(2026, 1, 2)) == 84.5
+    assert series.rate_on(datetime(2027, 1, 1)) == 85.0
+    assert list(series.rates_on(['2025-12-01', '2026-01-03'])) == [84.0, 85.0]
+    print(f"✓ FXRateSeries: {len(series)} days, {series.rate_on(datetime(2026, 1, 2))} on 2026-01-02")
+
+    receivables = OpenItemsLedger('Invoice_ID', 'Total_Amount')
+    receivables.sync_documents(pd.DataFrame([
+        {'Invoice_ID': 'INV-1', 'Total_Amount': 1000.0},
+        {'Invoice_ID': 'INV-2', 'Total_Amount': 2500.0},
+    ]))
+    receivables.sync_settlements(pd.DataFrame([{'Reference_Number': 'INV-1'}, {'Reference_Number': None}]))
+    receivables.apply_bank_transactions([{'Reference_Number': 'INV-1'}])
+    assert receivables.open_items() == {'INV-2': 2500.0}
+    assert receivables.settle('INV-2', 1000.0) == 1500.0
+    print(f"✓ OpenItemsLedger: open items {receivables.open_items()}")
+
+    # Same row count, different last row: the master was replaced, so re-read it
+    receivables.sync_documents(pd.DataFrame([
+        {'Invoice_ID': 'INV-1', 'Total_Amount': 1000.0},
+        {'Invoice_ID': 'INV-3', 'Total_Amount': 400.0},
+    ]))
+    assert receivables.open_items() == {'INV-1': 1000.0, 'INV-3': 400.0}
+    print(f"✓ OpenItemsLedger rebuilt after master replaced: {receivables.open_items()}")
+
+def test_reconciliation(entities_df, recurring_df, config):
+    """Test bank reconciliation matcher against the generator's labels"""
+    print("\n" + "="*60)
+    print("TESTING RECONCILIATION.PY")
+    print("="*60)
+
+    import contextlib
+    import io
+    from reconciliation import benchmark
+
+    # Twelve weeks of generator output, each week built on the history so far
+    inv_gen = InvoiceGenerator(entities_df, config)
+    bill_gen = BillGenerator(entities_df, recurring_df, config)
+    bank_gen = BankTransactionGenerator(config)
+    invoices, bills, transactions = [], [], []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for week in range(12):
+            run_date = datetime(2026, 1, 5) + timedelta(weeks=week)
+            invoices += inv_gen.generate_weekly_invoices(run_date, pd.DataFrame(invoices), count=5)
+            bills += bill_gen.generate_weekly_bills(run_date, pd.DataFrame(bills), count=4)
+            new_transactions, _ = bank_gen.generate_weekly_bank_statement(
+                run_date, pd.DataFrame(invoices), pd.DataFrame(bills), pd.DataFrame(transactions))
+            transactions += new_transactions
+    invoices_df, bills_df, bank_df = pd.DataFrame(invoices), pd.DataFrame(bills), pd.DataFrame(transactions)
+
+    reconciler = BankReconciler(config)
+    results = reconciler.reconcile(bank_df, invoices_df, bills_df)
+    report = reconciler.match_report(results, bank_df)
+
+    labelled = (bank_df['Reconciliation_Status'] == 'Matched').mean()
+    assert report['transactions'] == len(bank_df) and len(bank_df) > 30
+    assert abs(report['match_rate'] - labelled) < 0.05
+    assert report['label_agreement'] >= 0.95
+    print(f"\n✓ Reconciled {report['transactions']} transactions over 12 weeks")
+    print(f"  Match rate: {report['match_rate']:.1%} (labelled {labelled:.1%})")
+    print(f"  Label agreement: {report['label_agreement']:.1%}")
+
+    # Synthetic set: 95% settle a document, a fifth of those without a reference
+    report = benchmark(2000, config)
+    assert report['match_rate'] >= 0.94 and report['by_method'].get('amount_date', 0) > 0
+    assert report['label_agreement'] >= 0.99 and report['precision'] >= 0.99
+    print(f"✓ Benchmark (2,000 txns): match rate {report['match_rate']:.1%}, "
+          f"agreement {report['label_agreement']:.1%}")
+
+def test_validation_engine(entities_df, invoices_df, bills_df, bank_df, config):
+    """Test batch validation against generated data and a corrupted copy"""
+    print("\n" + "="*60)
+    print("TESTING VALIDATION_ENGINE.PY")
+    print("="*60)
+
+    engine = ValidationEngine(config, entities_df)
+    for report in (engine.validate_invoices(invoices_df), engine.validate_bills(bills_df),
+                   engine.validate_bank_transactions(bank_df)):
+        assert report.is_valid, report.errors
+        print(f"✓ {report}")
+
+    broken = invoices_df.copy()
+    broken.loc[0, 'Tax_Amount'] = broken.loc[0, 'Tax_Amount'] * 2
+    broken.loc[1, 'Customer_ID'] = 'CUST-MISSING'
+    report = engine.validate_invoices(broken, existing_ids=[broken.loc[1, 'Invoice_ID']])
+    assert list(report.failed_rows()) == [0, 1], report.errors
+    assert set(report.summary()) == {'tax_calculation', 'total_amount', 'entity_exists', 'id_new'}
+    print(f"✓ Corrupted batch: {report}")
+
+    kept = engine.apply('Invoices_Master', broken.to_dict('records'))
+    assert len(kept) == len(broken) - 2
+    print(f"✓ skip_on_error keeps {len(kept)} of {len(broken)} invoices")
+
+def test_template_store():
+    """Test templates load from disk, compile once and reload after an edit"""
+    print("\n" + "="*60)
+    print("TESTING TEMPLATE_STORE.PY")
+    print("="*60)
+
+    import os
+    import tempfile
+
+    store = TemplateStore()
+    html = store.render('invoice', {'invoice_id': 'INV-TEST-0001', 'line_items': [], 'currency': 'INR',
+                                    'subtotal': 0.0, 'tax_rate': 0.18, 'tax_amount': 0.0, 'total_amount': 0.0})
+    assert 'INV-TEST-0001' in html
+    assert store.get('invoice') is store.get('invoice')
+    assert '<style>' not in html and os.path.exists(store.stylesheet_path('invoice'))
+    print("✓ Bundled invoice template compiled once and rendered")
+
+    with tempfile.TemporaryDirectory() as template_dir:
+        path = os.path.join(template_dir, 'invoice_template.html')
+        with open(path, 'w') as f:
+            f.write('v1 {{ invoice_id }}')
+        store = TemplateStore(template_dir, cache_dir=os.path.join(template_dir, 'cache'))
+        assert store.render('invoice', {'invoice_id': 'X'}) == 'v1 X'
+
+        with open(path, 'w') as f:
+            f.write('v2 {{ invoice_id }}')
+        os.utime(path, (os.path.getmtime(path) + 5,) * 2)
+        assert store.render('invoice', {'invoice_id': 'X'}) == 'v2 X'
+        assert os.listdir(os.path.join(template_dir, 'cache'))
+    print("✓ Edited template reloaded; bytecode written to cache_dir")
+
+def test_pdf_cache():
+    """Test content-addressed keys, hits and LRU eviction"""
+    print("\n" + "="*60)
+    print("TESTING PDF_CACHE.PY")
+    print("="*60)
+
+    import os
+    import tempfile
+    import time
+
+    import numpy as np
+
+    data = {'invoice_id': 'INV-1', 'total_amount': 1180.0, 'invoice_date': datetime(2026, 1, 6)}
+    same = {'invoice_date': pd.Timestamp('2026-01-06'), 'total_amount': np.float64(1180.0), 'invoice_id': 'INV-1'}
+    key = PDFCache.key('invoice', data, 'v1')
+    assert key == PDFCache.key('invoice', same, 'v1')
+    assert key != PDFCache.key('invoice', data, 'v2')
+    assert key != PDFCache.key('bill', data, 'v1')
+    print("✓ Keys stable across types/order, change with template version")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = PDFCache(cache_dir, max_bytes=2500)
+        assert cache.get(key) is None
+        path = cache.put(key, b'%PDF' + b'x' * 996)
+        assert cache.get(key) == path
+
+        keys = [PDFCache.key('invoice', {'n': i}) for i in range(3)]
+        for i, other in enumerate(keys):
+            cache.put(other, b'%PDF' + b'y' * 996)
+            os.utime(cache.path_for(other), (time.time() - 100 + i,) * 2)
+        # Over 2500 bytes: the oldest entries go first, the recently used one stays
+        assert cache.get(key) == path
+        assert cache.get(keys[0]) is None
+        assert cache.total_bytes <= 2500
+
+        before = cache.total_bytes
+        cache.put(key, b'%PDF' + b'z' * 496)
+        assert cache.total_bytes == before - 500 and cache.get(key) == path
+    print("✓ Hit returns the stored file; LRU eviction keeps the cache under its limit")
+
+    from pdf_generator import PDFGenerator
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        generator = PDFGenerator(output_dir=work_dir, engine='native', cache_dir=os.path.join(work_dir, 'cache'))
+        invoice = {'invoice_id': 'INV-1', 'customer_name': 'Customer', 'currency': 'INR', 'line_items': [],
+                   'subtotal': 0.0, 'tax_amount': 0.0, 'total_amount': 0.0}
+        generator.render_document('invoice', invoice)
+        evicted = generator.cache.get(generator.cache.key('invoice', invoice, generator._layout_version('invoice')))
+
+        # Another process evicts the entry between get() and reading the file
+        original_get = generator.cache.get
+        def get_then_evict(cache_key):
+            path = original_get(cache_key)
+            if path:
+                os.remove(path)
+            return path
+        generator.cache.get = get_then_evict
+        result = generator.render_document('invoice', invoice, 'INV-1.pdf', return_bytes=True)
+        assert not result['cached'] and result['pdf_bytes'].startswith(b'%PDF')
+        assert os.path.exists(evicted) and os.path.exists(os.path.join(work_dir, 'INV-1.pdf'))
+    print("✓ An entry evicted between lookup and read is treated as a miss")
+
+def test_statement_pagination():
+    """Test statement pages, carried-forward balances and the paginated template"""
+    print("\n" + "="*60)
+    print("TESTING STATEMENT_RENDERER.PY")
+    print("="*60)
+
+    def rows(count):
+        for i in range(count):
+            yield {'date': '2026-01-06', 'description': f'TXN{i}', 'debit': 0.0,
+                   'credit': 10.0, 'balance': 1000.0 + 10.0 * (i + 1)}
+
+    pages = list(paginate_statement(rows(100), 1000.0, rows_per_page=28, first_page_rows=20))
+    assert len(pages) == page_count(100, 28, 20) == 4
+    assert [len(page['transactions']) for page in pages] == [20, 28, 28, 24]
+    assert pages[0]['is_first'] and pages[-1]['is_last'] and not pages[1]['is_last']
+    assert pages[0]['brought_forward'] == 1000.0
+    for previous, page in zip(pages, pages[1:]):
+        assert page['brought_forward'] == previous['carried_forward'] == previous['transactions'][-1]['balance']
+    assert pages[-1]['carried_forward'] == 2000.0
+    print(f"✓ 100 rows -> {len(pages)} pages, balances carried forward page to page")
+
+    empty = list(paginate_statement([], 500.0))
+    assert len(empty) == 1 and empty[0]['carried_forward'] == 500.0 and page_count(0) == 1
+    print("✓ Empty statement is one page at the opening balance")
+
+    html = TemplateStore().render('statement_pages', {
+        'bank_name': 'HDFC Bank', 'start_date': '01 Jan 2026', 'end_date': '14 Jan 2026',
+        'opening_balance': 1000.0, 'closing_balance': 2000.0, 'total_pages': len(pages), 'pages': pages
+    })
+    assert html.count('class="statement-page"') == 4
+    assert html.count('Balance brought forward') == 3 and html.count('Balance carried forward') == 3
+    assert 'Page 4 of 4' in html and 'TXN99' in html
+    print("✓ Paginated template renders one section per page")
+
+def test_native_pdf():
+    """Test the native renderer draws well-formed invoice, bill and statement PDFs"""
+    print("\n" + "="*60)
+    print("TESTING NATIVE_PDF.PY")
+    print("="*60)
+
+    assert text_width('0000', 10) == 4 * 5.56
+    assert text_width('Total', 10, bold=True) > text_width('Total', 10)
+    clipped = fit_text('A very long line item description ' * 5, 100, 10)
+    assert clipped.endswith('...') and text_width(clipped, 10) <= 100
+    print("✓ Core font metrics and truncation")
+
+    renderer = NativePDFRenderer()
+    invoice = {
+        'invoice_id': 'INV-202601-0001', 'invoice_date': '06 Jan 2026', 'due_date': '05 Feb 2026',
+        'customer_name': 'Test Customer (India) Ltd', 'customer_address': 'Mumbai', 'customer_tax_id': 'GSTIN1',
+        'currency': 'INR', 'subtotal': 100000.0, 'tax_type': 'IGST', 'tax_rate': 0.18,
+        'tax_amount': 18000.0, 'total_amount': 118000.0, 'notes': '',
+        'line_items': [{'description': 'Services', 'quantity': 1, 'rate': 100000.0, 'amount': 100000.0}]
+    }
+    pdf = renderer.render('invoice', invoice)
+    assert pdf.startswith(b'%PDF-') and pdf.rstrip().endswith(b'%%EOF')
+    assert b'/Count 1' in pdf and pdf == renderer.render('invoice', invoice)
+    long_invoice = dict(invoice, line_items=invoice['line_items'] * 60)
+    assert b'/Count 3' in renderer.render('invoice', long_invoice)
+    print("✓ Invoice is a deterministic PDF; long line item tables flow onto new pages")
+
+    bill = dict(invoice, bill_id='BILL-1', bill_date='06 Jan 2026', vendor_name='Vendor',
+                vendor_address='Delhi', vendor_tax_id='GSTIN2', tds_applicable=True,
+                tds_section='194J', tds_amount=10000.0, net_payable=108000.0)
+    assert b'/Count 1' in renderer.render('bill', bill)
+
+    transactions = [{'date': '2026-01-06', 'description': f'TXN{i}', 'debit': 0.0, 'credit': 10.0,
+                     'balance': 10.0 * (i + 1)} for i in range(100)]
+    statement = {'bank_name': 'HDFC Bank', 'opening_balance': 0.0, 'closing_balance': 1000.0,
+                 'transactions': transactions}
+    assert f"/Count {page_count(100)}".encode() in renderer.render('statement', statement)
+    print("✓ Bill and paginated statement rendered")
+
+    import os
+    import tempfile
+    from pypdf import PdfReader
+    from pdf_generator import PDFGenerator
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        generator = PDFGenerator(output_dir=output_dir, engine='native', statement_pages_per_batch=1)
+        on_disk = generator.statements.render(statement, 'statement.pdf')
+        assert on_disk['pdf_bytes'] is None and on_disk['pages'] == page_count(100)
+        with open(os.path.join(output_dir, 'statement.pdf'), 'rb') as f:
+            assert len(PdfReader(f).pages) == page_count(100)
+        in_memory = generator.statements.render(statement, 'statement.pdf', return_bytes=True)
+        with open(os.path.join(output_dir, 'statement.pdf'), 'rb') as f:
+            assert f.read() == in_memory['pdf_bytes']
+    print("✓ Statement batches merged straight to disk, or to bytes on request")
+
+def test_pdf_generator():
+    """Test PDF generator: weekly pack, shared stylesheets, disk sink and batch rendering"""
+    print("\n" + "="*60)
+    print("TESTING PDF_GENERATOR.PY")
+    print("="*60)
+
+    test_document_pack()
+    test_shared_stylesheets()
+    test_disk_sink()
+    test_render_many()
+
+def test_document_pack():
+    """Test the weekly pack: index, one section per document, bookmarks"""
+    import tempfile
+    from pdf_generator import PDFGenerator
+
+    invoice = {
+        'invoice_id': 'INV-1', 'invoice_date': '06 Jan 2026', 'due_date': '05 Feb 2026',
+        'customer_name': 'Customer', 'customer_address': 'Mumbai', 'customer_tax_id': 'GSTIN1',
+        'currency': 'INR', 'subtotal': 100.0, 'tax_type': 'IGST', 'tax_rate': 0.18,
+        'tax_amount': 18.0, 'total_amount': 118.0, 'notes': '',
+        'line_items': [{'description': 'Services', 'quantity': 1, 'rate': 100.0, 'amount': 100.0}]
+    }
+    bill = dict(invoice, bill_id='BILL-1', bill_date='06 Jan 2026', vendor_name='Vendor',
+                vendor_address='Delhi', vendor_tax_id='GSTIN2', tds_applicable=False,
+                tds_section=None, tds_amount=0.0, net_payable=118.0)
+    statement = {'bank_name': 'HDFC Bank', 'start_date': '01 Jan 2026', 'end_date': '14 Jan 2026',
+                 'opening_balance': 0.0, 'closing_balance': 500.0,
+                 'transactions': [{'date': '2026-01-06', 'description': f'TXN{i}', 'debit': 0.0,
+                                   'credit': 10.0, 'balance': 10.0 * (i + 1)} for i in range(50)]}
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        generator = PDFGenerator(output_dir=output_dir, engine='native')
+        pack = generator.render_pack([invoice, dict(invoice, invoice_id='INV-2')], [bill], statement,
+                                     period='Week of 12 Jan 2026', return_bytes=True)
+        pdf = pack['pdf_bytes']
+        assert pack['documents'] == 4 and pack['error'] is None
+        # Index + 2 invoices + 1 bill + 3 statement pages
+        assert b'/Count 7' in pdf and b'/Outlines' in pdf and b'/Subtype /Link' in pdf
+        assert b'(Invoice INV-2 - Customer)' in pdf and b'(Bank Statement)' in pdf
+    print("✓ Pack has an index, every document and bookmarks per group and document")
+
+    html = TemplateStore().render('pack', {'title': 'Weekly Document Pack', 'period': 'Week of 12 Jan 2026', 'groups': [
+        {'title': 'Invoices', 'sections': [{'kind': 'invoice', 'anchor': 'invoice-0', 'label': 'Invoice INV-1',
+                                            'amount': 'INR 118.00', 'data': invoice}]}
+    ]})
+    assert html.count('class="pack-section') == 1 and 'href="#invoice-0"' in html and 'Invoice #INV-1' in html
+    print("✓ Pack template embeds documents in one HTML document")
+
+def test_shared_stylesheets():
+    """Test WeasyPrint stylesheets and fonts are set up once per generator and reused"""
+    import tempfile
+    from unittest import mock
+    import pdf_generator
+
+    with tempfile.TemporaryDirectory() as output_dir, \
+            mock.patch.object(pdf_generator, 'WEASYPRINT_AVAILABLE', True), \
+            mock.patch.object(pdf_generator, 'FontConfiguration') as font_configuration, \
+            mock.patch.object(pdf_generator, 'CSS') as css, \
+            mock.patch.object(pdf_generator, 'HTML') as html:
+        html.return_value.write_pdf.return_value = b'%PDF-1.7'
+        css.side_effect = lambda filename, font_config: mock.Mock(filename=filename)
+
+        generator = pdf_generator.PDFGenerator(output_dir=output_dir, engine='weasyprint')
+        stylesheet_paths = {generator.templates.stylesheet_path(kind) for kind in pdf_generator.DOCUMENT_KINDS}
+        assert font_configuration.call_count == 1
+        assert css.call_count == len(stylesheet_paths)
+        assert all(call.kwargs['font_config'] is generator.font_config for call in css.call_args_list)
+
+        for n in range(3):
+            generator.render_document('invoice', pdf_benchmark.sample_invoice_data(number=n + 1))
+            generator.render_document('bill', pdf_benchmark.sample_bill_data(number=n + 1))
+        assert css.call_count == len(stylesheet_paths) and font_configuration.call_count == 1
+
+        writes = html.return_value.write_pdf.call_args_list
+        assert len(writes) == 6
+        for kind, call in zip(['invoice', 'bill'] * 3, writes):
+            assert call.kwargs['stylesheets'] == [generator.stylesheets[kind]]
+            assert call.kwargs['font_config'] is generator.font_config
+        assert generator.stylesheets['invoice'].filename == generator.templates.stylesheet_path('invoice')
+
+        other = pdf_generator.PDFGenerator(output_dir=output_dir, engine='weasyprint')
+        assert font_configuration.call_count == 2 and css.call_count == 2 * len(stylesheet_paths)
+        assert other.stylesheets['invoice'] is not generator.stylesheets['invoice']
+    print(f"✓ {len(stylesheet_paths)} stylesheets parsed once per generator and passed to every render")
+
+def test_email_sender():
+    """Test PDF bytes reach the email attachment without a file on disk"""
+    print("\n" + "="*60)
+    print("TESTING EMAIL_SENDER.PY")
+    print("="*60)
+
+    import os
+    from unittest import mock
+    from email_sender import GmailEmailSender
+
+    pdf_bytes = b'%PDF-1.7 test document %%EOF'
+    with mock.patch.dict(os.environ, {'SMTP_EMAIL': 'sender@example.com', 'SMTP_PASSWORD': 'secret'}), \
+            mock.patch('email_sender.smtplib.SMTP') as smtp:
+        sender = GmailEmailSender()
+        assert sender._send_email_with_attachment('to@example.com', 'Invoice', 'text', '<p>html</p>',
+                                                  attachment_bytes=memoryview(pdf_bytes),
+                                                  attachment_filename='INV-1.pdf')
+        server = smtp.return_value.__enter__.return_value
+        server.login.assert_called_once_with('sender@example.com', 'secret')
+        message = server.send_message.call_args[0][0]
+    attachments = [part for part in message.walk() if part.get_filename()]
+    assert len(attachments) == 1 and attachments[0].get_filename() == 'INV-1.pdf'
+    assert attachments[0].get_content_type() == 'application/pdf'
+    assert attachments[0].get_payload(decode=True) == pdf_bytes
+    print("✓ PDF bytes attached to the email without touching disk")
+
+def test_disk_sink():
+    """Test the background disk sink writes queued PDFs and reports failed writes"""
+    import os
+    import tempfile
+    from pdf_generator import PDFDiskSink
+
+    pdf_bytes = b'%PDF-1.7 test document %%EOF'
+    with tempfile.TemporaryDirectory() as output_dir:
+        sink = PDFDiskSink(output_dir)
+        paths = [sink.write(f"DOC-{n}.pdf", pdf_bytes + bytes([n])) for n in range(5)]
+        bad_path = sink.write(os.path.join('missing', 'DOC-X.pdf'), pdf_bytes)
+        errors = sink.flush()
+        for n, path in enumerate(paths):
+            with open(path, 'rb') as f:
+                assert f.read() == pdf_bytes + bytes([n])
+        assert len(errors) == 1 and errors[0].startswith(bad_path)
+        assert sink.flush() == []
+    print("✓ Disk sink writes every queued file and reports failed writes")
+
+def test_render_many():
+    """Test batch rendering keeps order, isolates failures and survives a broken pool"""
+    import tempfile
+    from concurrent.futures.process import BrokenProcessPool
+    from pdf_generator import PDFGenerator
+
+    def stand_in(kind, data, output_filename=None, return_bytes=False):
+        if data['n'] == 3:
+            raise ValueError('bad document')
+        return {'kind': kind, 'filename': output_filename, 'path': None, 'cached': False, 'error': None,
+                'pdf_bytes': f"PDF {data['n']}".encode()}
+
+    jobs = [{'kind': 'invoice', 'data': {'n': n}, 'filename': f"{n}.pdf"} for n in range(6)]
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        generator = PDFGenerator(output_dir=output_dir, engine='native')
+        generator.render_document = stand_in
+
+        results = generator.render_many(jobs, return_bytes=True)
+        assert generator._pool is None  # Native engine: no worker processes by default
+        assert [result['filename'] for result in results] == [job['filename'] for job in jobs]
+        assert results[3]['error'] == 'ValueError: bad document' and results[3]['pdf_bytes'] is None
+        assert results[5]['pdf_bytes'] == b'PDF 5'
+        print("✓ In-process batch keeps order; one failing job does not sink the rest")
+
+        class BrokenPool:
+            """Stand-in pool whose worker dies after two documents"""
+            shut_down = False
+
+            def map(self, fn, items, chunksize=1):
+                for item in list(items)[:2]:
+                    yield generator.render_job(*item)
+                raise BrokenProcessPool('worker killed')
+
+            def shutdown(self):
+                BrokenPool.shut_down = True
+
+        generator._pool, generator._pool_workers = BrokenPool(), 4
+        results = generator.render_many(jobs, workers=4, return_bytes=True)
+        assert [result['filename'] for result in results] == [job['filename'] for job in jobs]
+        assert [result['pdf_bytes'] for result in results if not result['error']] == [
+            f"PDF {n}".encode() for n in (0, 1, 2, 4, 5)]
+        assert BrokenPool.shut_down and generator._pool is None
+        print("✓ Broken pool: remaining documents rendered serially, in order")
+
+        # Real worker processes (each builds its own native generator)
+        generator = PDFGenerator(output_dir=output_dir, engine='native')
+        try:
+            real_jobs = [{'kind': 'invoice', 'data': {'invoice_id': f"INV-{n}", 'line_items': []},
+                          'filename': f"INV-{n}.pdf"} for n in range(4)]
+            real_jobs.insert(2, {'kind': 'receipt', 'data': {}, 'filename': 'receipt.pdf'})
+            results = generator.render_many(real_jobs, workers=2)
+            assert [result['filename'] for result in results] == [job['filename'] for job in real_jobs]
+            assert results[2]['error'] and all(result['error'] is None for i, result in enumerate(results) if i != 2)
+        finally:
+            generator.close()
+        assert generator._pool is None
+        print("✓ Worker pool returns results in submission order with per-job errors")
+
+def test_pdf_benchmark():
+    """Test benchmark scenarios report throughput and latency as JSON-ready values"""
+    print("\n" + "="*60)
+    print("TESTING PDF_BENCHMARK.PY")
+    print("="*60)
+
+    import json
+    import os
+    import tempfile
+    from pdf_generator import PDFGenerator
+
+    statement = pdf_benchmark.sample_statement_data(60)
+    assert len(statement['transactions']) == 60
+    assert statement['closing_balance'] == statement['transactions'][-1]['balance']
+    docs = pdf_benchmark.synthetic_documents('invoice', 2, 3)
+    assert len({doc['invoice_id'] for doc in docs}) == 3
+    print("✓ Synthetic documents are distinct and internally consistent")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        generator = PDFGenerator(output_dir=work_dir, engine='native', cache_dir=os.path.join(work_dir, 'cache'))
+        results = [pdf_benchmark.run_scenario(generator, mode, 'statement', 30, 3, 1)
+                   for mode in ('serial', 'cached')]
+        # Two one-page batches: merged statements bypass the cache
+        generator.statements.pages_per_batch = 1
+        batched = pdf_benchmark.run_scenario(generator, 'cached', 'statement', 30, 3, 1)
+        generator.close()
+    for result in results:
+        assert result['docs'] == 3 and result['docs_per_sec'] > 0
+        assert 0 < result['p50_ms'] <= result['p95_ms'] and result['pdf_kb'] > 0
+    assert results[0]['cache_hit_rate'] is None and results[1]['cache_hit_rate'] == 1.0
+    assert batched['cache_hit_rate'] == 0.0
+    json.dumps(results)
+    print(f"✓ Serial {results[0]['p50_ms']} ms vs cached {results[1]['p50_ms']} ms p50")
+    print(f"✓ Cache hit rate reported: {results[1]['cache_hit_rate']:.0%} single batch, "
+          f"{batched['cache_hit_rate']:.0%} multi-batch")
+
+def test_excel_manager():
+    """Test sheets are parsed once and cached until the workbook changes"""
+    print("\n" + "="*60)
+    print("TESTING EXCEL_MANAGER.PY")
+    print("="*60)
+
+    import os
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, 'master.xlsx')
+        with pd.ExcelWriter(path) as writer:
+            create_mock_entities().to_excel(writer, sheet_name='Entities', index=False)
+            create_mock_recurring_schedule().to_excel(writer, sheet_name='Recurring_Schedule', index=False)
+
+        manager = ExcelManager(path)
+        sheets = manager.load_sheets(['Entities', 'Recurring_Schedule'])
+        assert len(sheets['Entities']) == 4 and sheets['Entities']['ZIP'].iloc[0] == '94105'
+        assert manager.read_sheet('Entities') is sheets['Entities']
+        assert manager.get_last_row('Recurring_Schedule')['Vendor_ID'] == 'V001'
+        print("✓ Sheets parsed in one pass; later reads come from the cache")
+
+        manager.append_to_sheet('Recurring_Schedule', [{'Vendor_ID': 'V002', 'Expense_Account': 'Repairs',
+                                                         'Amount': 25000, 'Day_of_Month': 10}])
+        assert manager.read_sheet('Entities') is not sheets['Entities']
+        assert manager.get_last_row('Recurring_Schedule')['Vendor_ID'] == 'V002'
+        print("✓ Writing the workbook invalidates the cache")
+
+        staging = ExcelManager(path, compact_rows=3)
+        staging.load_sheets(['Entities', 'Recurring_Schedule'])
+        row = {'Vendor_ID': 'V003', 'Expense_Account': 'Rent', 'Amount': 90000, 'Day_of_Month': 1}
+        assert staging.append_rows({'Recurring_Schedule': [row, dict(row, Vendor_ID='V004')], 'Entities': []})
+        assert os.path.exists(staging.pending_path)
+        assert len(pd.read_excel(path, sheet_name='Recurring_Schedule')) == 2
+        assert list(staging.read_sheet('Recurring_Schedule')['Vendor_ID']) == ['V001', 'V002', 'V003', 'V004']
+        print("✓ Appends are staged in the pending workbook and included in reads")
+
+        assert staging.append_to_sheet('Recurring_Schedule', [dict(row, Vendor_ID='V005')])
+        assert not os.path.exists(staging.pending_path)
+        assert list(pd.read_excel(path, sheet_name='Recurring_Schedule')['Vendor_ID']) == [
+            'V001', 'V002', 'V003', 'V004', 'V005']
+        assert not staging.append_to_sheet('Missing_Sheet', [row])
+        print("✓ Pending rows are folded into the master past the threshold")
+
+        # A failed fold leaves the rows staged once, and the append still succeeds
+        from unittest import mock
+        with mock.patch.object(staging, '_write_master', side_effect=OSError('disk full')):
+            assert staging.append_rows({'Recurring_Schedule': [dict(row, Vendor_ID=f'V1{n}') for n in range(3)]})
+        assert os.path.exists(staging.pending_path)
+        assert list(staging.read_sheet('Recurring_Schedule')['Vendor_ID'])[-4:] == ['V005', 'V10', 'V11', 'V12']
+        assert staging.compact() == 3 and not os.path.exists(staging.pending_path)
+        print("✓ Staged rows survive a failed compaction without being written twice")
+
+        # Direct mode: all sheets in one load/save, fields matched to the header row
+        assert manager.append_rows({
+            'Recurring_Schedule': [{'Day_of_Month': 15, 'Amount': 1000, 'Vendor_ID': 'V006',
+                                    'Expense_Account': 'Software', 'Notes': 'new column'}],
+            'Entities': [{'Entity_ID': 'C003', 'Entity_Type': 'Customer', 'Legal_Name': 'New Co',
+                          'Created': pd.Timestamp('2026-01-06'), 'Average_Transaction_Value': float('nan')}]
+        })
+        recurring = manager.read_sheet('Recurring_Schedule')
+        last = recurring.iloc[-1]
+        assert last['Vendor_ID'] == 'V006' and last['Day_of_Month'] == 15 and last['Notes'] == 'new column'
+        entities = manager.read_sheet('Entities')
+        assert entities.iloc[-1]['Created'] == pd.Timestamp('2026-01-06')
+        assert pd.isna(entities.iloc[-1]['Average_Transaction_Value'])
+        print("✓ Batched write aligns fields to the header row")
+
 def main():
     """Run all tests"""
     print("\n" + "="*60)
@@ -333,9 +1139,22 @@ def main():
     # Run tests
     try:
         test_utils()
+        test_document_index()
+        test_ledger()
         invoices_df = test_invoice_generator(entities_df, config)
         bills_df = test_bill_generator(entities_df, recurring_df, config)
         bank_df = test_bank_generator(invoices_df, bills_df, config)
+        test_bank_state(bank_df)
+        test_reconciliation(entities_df, recurring_df, config)
+        test_validation_engine(entities_df, invoices_df, bills_df, bank_df, config)
+        test_template_store()
+        test_pdf_cache()
+        test_statement_pagination()
+        test_native_pdf()
+        test_pdf_generator()
+        test_email_sender()
+        test_pdf_benchmark()
+        test_excel_manager()
 
         print("\n" + "="*60)
         print("ALL TESTS COMPLETED SUCCESSFULLY!")
@@ -4,12 +4,16 @@ Core utilities for date handling, ID generation, tax calculations, and validatio
 """
 
 import pandas as pd
-import math
 import random
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 import hashlib
 
+from service_period import parse_service_period
+from business_calendar import WEEKEND_CALENDAR
+from money import to_minor, from_minor, round_money, apply_rate
+from tax_rules import load_tax_rules
+
 # ============================================================================
 # DATE UTILITIES
 # ============================================================================
@@ -40,12 +44,9 @@ def get_mondays_in_range(start_date: datetime, end_date: datetime) -> List[datet
 
 def add_business_days(start_date: datetime, days: int) -> datetime:
     """Add business days to a date (excluding weekends)"""
-    current = start_date
-    while days > 0:
-        current += timedelta(days=1)
-        if current.weekday() < 5:  # Monday = 0, Friday = 4
-            days -= 1
-    return current
+    if days <= 0:
+        return start_date
+    return WEEKEND_CALENDAR.add_business_days(start_date, days)[0].to_pydatetime()
 
 
 def get_25th_of_month(reference_date: datetime) -> datetime:
@@ -55,10 +56,7 @@ def get_25th_of_month(reference_date: datetime) -> datetime:
 
 def week_contains_date(week_start: datetime, week_end: datetime, day: int) -> bool:
     """Check if a specific day of month falls within a week range"""
-    for single_date in pd.date_range(start=week_start, end=week_end, freq='D'):
-        if single_date.day == day:
-            return True
-    return False
+    return bool(WEEKEND_CALENDAR.week_contains_day(week_start, week_end, day)[0])
 
 
 def format_indian_date(date: datetime) -> str:
@@ -101,12 +99,12 @@ def generate_run_id(timestamp: datetime) -> str:
 
 def usd_to_inr(amount: float, exchange_rate: float = 85.0) -> float:
     """Convert USD to INR"""
-    return round(amount * exchange_rate, 2)
+    return round_money(amount * exchange_rate)
 
 
 def inr_to_usd(amount: float, exchange_rate: float = 85.0) -> float:
     """Convert INR to USD"""
-    return round(amount / exchange_rate, 2)
+    return round_money(amount / exchange_rate)
 
 
 def format_indian_currency(amount: float) -> str:
@@ -124,62 +122,35 @@ def format_usd_currency(amount: float) -> str:
 # ============================================================================
 
 def calculate_igst(subtotal: float, rate: float = 0.18) -> float:
-    """Calculate IGST (Integrated GST)"""
-    return round(subtotal * rate, 2)
+    """Calculate IGST (Integrated GST), exact to the paisa"""
+    return from_minor(apply_rate(to_minor(subtotal), rate, 'IGST'))
 
 
 def calculate_sales_tax(subtotal: float, rate: float) -> float:
-    """Calculate US sales tax"""
-    return round(subtotal * rate, 2)
+    """Calculate US sales tax, exact to the cent"""
+    return from_minor(apply_rate(to_minor(subtotal), rate, 'Sales Tax'))
 
 
 def calculate_tds(subtotal: float, tds_rate: float) -> float:
     """
     Calculate TDS amount
-    CRITICAL: TDS_Amount = Subtotal × TDS_Rate
+    CRITICAL: TDS_Amount = Subtotal × TDS_Rate, rounded to the nearest rupee
     """
-    return round(subtotal * tds_rate, 2)
+    return from_minor(apply_rate(to_minor(subtotal), tds_rate, 'TDS'))
 
 
 def calculate_withholding_tax(amount: float, rate: float = 0.30) -> float:
-    """Calculate US withholding tax for foreign payments"""
-    return round(amount * rate, 2)
+    """Calculate US withholding tax for foreign payments, exact to the cent"""
+    return from_minor(apply_rate(to_minor(amount), rate, 'Withholding'))
 
 
-def get_tds_section_for_expense(expense_account: str) -> Optional[Tuple[str, float]]:
+def get_tds_section_for_expense(expense_account: str, config: Dict = None) -> Tuple[Optional[str], float]:
     """
     Determine TDS section and rate based on expense account category
-    Returns: (section, rate) or None
+    Rates come from tax.tds_sections in config (config.yaml if not given)
+    Returns: (section, rate), or (None, 0.0) if no TDS applies
     """
-    tds_mapping = {
-        # 194I - Rent (10%)
-        "Rent Expense": ("194I", 0.10),
-        "Office Rent": ("194I", 0.10),
-        "Equipment Rent": ("194I", 0.10),
-        
-        # 194C - Contractor/Advertising (2% for corporate)
-        "Repairs and Maintenance": ("194C", 0.02),
-        "Advertising And Marketing": ("194C", 0.02),
-        "Contractor Expense": ("194C", 0.02),
-        "Janitorial Expense": ("194C", 0.02),
-        
-        # 194J - Professional Services (10%)
-        "Consultant Expense": ("194J", 0.10),
-        "Professional Services": ("194J", 0.10),
-        "Technical Services": ("194J", 0.10),
-        "Accounting Services": ("194J", 0.10),
-        "Legal Services": ("194J", 0.10),
-        
-        # No TDS applicable
-        "Software Subscriptions": (None, 0.0),
-        "Cloud Hosting": (None, 0.0),
-        "Telephone Expense": (None, 0.0),
-        "IT and Internet Expenses": (None, 0.0),
-        "Travel Expense": (None, 0.0),
-        "Meals and Entertainment": (None, 0.0),
-    }
-    
-    return tds_mapping.get(expense_account, (None, 0.0))
+    return load_tax_rules(config).tds_section(expense_account)
 
 
 # ============================================================================
@@ -187,7 +158,10 @@ def get_tds_section_for_expense(expense_account: str) -> Optional[Tuple[str, flo
 # ============================================================================
 
 def set_seed(date: datetime):
-    """Set random seed based on date for deterministic randomness"""
+    """
+    Set random seed based on date for deterministic randomness
+    (process-global; the generators use rng.RNGFactory streams instead)
+    """
     # Include year, week number, and day for more variation between runs
     year, week, day = date.isocalendar()
     seed_value = year * 10000 + week * 100 + day
@@ -230,9 +204,9 @@ def validate_amount_positive(amount: float, field_name: str) -> bool:
 
 
 def validate_line_items_sum(line_items: List[Dict], subtotal: float) -> bool:
-    """Validate line items sum to subtotal"""
-    calculated_sum = sum([item['amount'] for item in line_items])
-    if not math.isclose(calculated_sum, subtotal, rel_tol=0.01):
+    """Validate line items sum to subtotal (exact to the paisa)"""
+    calculated_sum = from_minor(sum(to_minor(item['amount']) for item in line_items))
+    if to_minor(calculated_sum) != to_minor(subtotal):
         raise ValidationError(
             f"Line items sum ({calculated_sum}) does not match subtotal ({subtotal})"
         )
@@ -240,9 +214,9 @@ def validate_line_items_sum(line_items: List[Dict], subtotal: float) -> bool:
 
 
 def validate_tax_calculation(subtotal: float, tax_rate: float, tax_amount: float) -> bool:
-    """Validate tax calculation is correct"""
-    expected_tax = subtotal * tax_rate
-    if not math.isclose(expected_tax, tax_amount, rel_tol=0.01):
+    """Validate tax calculation is correct (to the paisa)"""
+    expected_tax = from_minor(apply_rate(to_minor(subtotal), tax_rate))
+    if to_minor(expected_tax) != to_minor(tax_amount):
         raise ValidationError(
             f"Tax calculation error: Expected {expected_tax}, got {tax_amount}"
         )
@@ -252,10 +226,10 @@ def validate_tax_calculation(subtotal: float, tax_rate: float, tax_amount: float
 def validate_tds_calculation(subtotal: float, tds_rate: float, tds_amount: float) -> bool:
     """
     CRITICAL: Validate TDS calculation
-    TDS_Amount = Subtotal × TDS_Rate
+    TDS_Amount = Subtotal × TDS_Rate, rounded to the nearest rupee
     """
-    expected_tds = subtotal * tds_rate
-    if not math.isclose(expected_tds, tds_amount, rel_tol=0.01):
+    expected_tds = from_minor(apply_rate(to_minor(subtotal), tds_rate, 'TDS'))
+    if to_minor(expected_tds) != to_minor(tds_amount):
         raise ValidationError(
             f"TDS calculation error: Expected {expected_tds}, got {tds_amount}"
         )
@@ -264,9 +238,9 @@ def validate_tds_calculation(subtotal: float, tds_rate: float, tds_amount: float
 
 def validate_total_amount(subtotal: float, tax_amount: float, 
                          tds_amount: float, total_amount: float) -> bool:
-    """Validate total amount calculation"""
-    expected_total = subtotal + tax_amount - tds_amount
-    if not math.isclose(expected_total, total_amount, rel_tol=0.01):
+    """Validate total amount calculation (exact to the paisa)"""
+    expected_total = from_minor(to_minor(subtotal) + to_minor(tax_amount) - to_minor(tds_amount))
+    if to_minor(expected_total) != to_minor(total_amount):
         raise ValidationError(
             f"Total calculation error: Expected {expected_total}, got {total_amount}"
         )
@@ -305,24 +279,9 @@ def validate_balance_non_negative(balance: float) -> bool:
 def extract_service_period(description: str) -> Optional[Tuple[datetime, datetime]]:
     """
     Extract service period from line item description
-    Format: "Term: 01 Nov 2025 – 30 Nov 2025"
+    Format: "Service Period: 01 Nov 2025 – 30 Nov 2025" (or "Term: ...")
     """
-    import re
-    
-    # Pattern to match date range
-    pattern = r'Term:\s*(\d{2}\s+\w+\s+\d{4})\s*[–-]\s*(\d{2}\s+\w+\s+\d{4})'
-    match = re.search(pattern, description)
-    
-    if match:
-        start_str = match.group(1)
-        end_str = match.group(2)
-        
-        start_date = datetime.strptime(start_str, "%d %b %Y")
-        end_date = datetime.strptime(end_str, "%d %b %Y")
-        
-        return (start_date, end_date)
-    
-    return None
+    return parse_service_period(description)
 
 
 def is_prepaid_expense(service_period: Optional[Tuple[datetime, datetime]], 
@@ -359,7 +318,7 @@ def calculate_monthly_amount(total_amount: float,
     start_date, end_date = service_period
     months = (end_date.year - start_date.year) * 12 + (end_date.month - start_date.month) + 1
     
-    return round(total_amount / months, 2)
+    return round_money(total_amount / months)
 
 
 # ============================================================================
@@ -371,17 +330,22 @@ def generate_hsn_sac_code() -> str:
     return str(random.randint(998000, 999999))
 
 
-def generate_payment_reference() -> str:
-    """Generate payment reference for bank transactions"""
-    letters = ''.join(random.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ', k=3))
-    numbers = ''.join(random.choices('0123456789', k=5))
+def generate_payment_reference(rng=None) -> str:
+    """Generate payment reference for bank transactions (from rng if given)"""
+    if rng is not None:
+        letters = ''.join(rng.choice(list('ABCDEFGHIJKLMNOPQRSTUVWXYZ'), size=3).tolist())
+        numbers = ''.join(rng.choice(list('0123456789'), size=5).tolist())
+    else:
+        letters = ''.join(random.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ', k=3))
+        numbers = ''.join(random.choices('0123456789', k=5))
     return f"NEFT/{letters}/{numbers}"
 
 
-def apply_variance(base_value: float, variance_percent: float = 0.05) -> float:
-    """Apply random variance to a value"""
-    variance = base_value * variance_percent * (random.random() * 2 - 1)  # -5% to +5%
-    return round(base_value + variance, 2)
+def apply_variance(base_value: float, variance_percent: float = 0.05, rng=None) -> float:
+    """Apply random variance to a value (from rng if given)"""
+    draw = rng.random() if rng is not None else random.random()
+    variance = base_value * variance_percent * (draw * 2 - 1)  # -5% to +5%
+    return round_money(base_value + variance)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,301 @@
+"""
+Komplai Demo Pipeline - Validation Engine
+Vectorized batch validation of Invoices, Bills and Bank_Transactions frames
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional
+
+from utils import ValidationError
+from money import to_minor_array, apply_rate_array
+from tax_rules import load_tax_rules
+
+
+VALID_CURRENCIES = ('USD', 'INR')
+
+# Amounts are compared in paise; one paisa of slack covers rows written by
+# older float code that rounded each figure separately
+MINOR_TOLERANCE = 1
+
+REPORT_COLUMNS = ['Sheet', 'Row', 'Document_ID', 'Rule', 'Message']
+
+ID_COLUMNS = {
+    'Invoices_Master': 'Invoice_ID',
+    'Bills_Master': 'Bill_ID',
+    'Bank_Transactions': 'Transaction_ID'
+}
+
+
+def _numeric(df: pd.DataFrame, column: str) -> pd.Series:
+    """Column as float (missing column or blanks become NaN)"""
+    if column not in df.columns:
+        return pd.Series(np.nan, index=df.index)
+    return pd.to_numeric(df[column], errors='coerce')
+
+
+def _minor(df: pd.DataFrame, column: str) -> pd.Series:
+    """Column as int64 paise (missing column or blanks become 0)"""
+    return pd.Series(to_minor_array(_numeric(df, column)), index=df.index)
+
+
+def _matches(actual: pd.Series, expected: pd.Series) -> pd.Series:
+    """Paise columns equal to within MINOR_TOLERANCE"""
+    return (actual - expected).abs() <= MINOR_TOLERANCE
+
+
+class ValidationReport:
+    """Per-row validation errors for one sheet"""
+
+    def __init__(self, sheet: str, row_count: int, errors: pd.DataFrame):
+        self.sheet = sheet
+        self.row_count = row_count
+        self.errors = errors
+
+    def __len__(self) -> int:
+        return len(self.errors)
+
+    @property
+    def is_valid(self) -> bool:
+        return len(self.errors) == 0
+
+    def failed_rows(self) -> np.ndarray:
+        """Row positions with at least one error"""
+        return np.unique(self.errors['Row'].to_numpy(dtype=np.int64))
+
+    def valid_mask(self) -> np.ndarray:
+        """Boolean per row: True where the row passed every rule"""
+        mask = np.ones(self.row_count, dtype=bool)
+        mask[self.failed_rows()] = False
+        return mask
+
+    def summary(self) -> Dict[str, int]:
+        """Error count per rule"""
+        return self.errors['Rule'].value_counts().to_dict()
+
+    def __str__(self) -> str:
+        if self.is_valid:
+            return f"{self.sheet}: {self.row_count} rows valid"
+        rules = ', '.join(f"{rule} ({count})" for rule, count in self.summary().items())
+        return f"{self.sheet}: {len(self.failed_rows())} of {self.row_count} rows failed - {rules}"
+
+
+class ValidationEngine:
+    """
+    Check whole frames at once and report every failing row
+
+    Each rule is a boolean expression over columns, so a batch costs a few
+    array operations regardless of size; membership checks (entities, IDs
+    already in the master) are hash lookups via Series.isin. Behaviour on
+    failure follows pipeline.validation in config.yaml:
+
+    - strict_mode false: report only, keep every row
+    - strict_mode with skip_on_error: drop failing rows, keep the rest
+    - strict_mode without skip_on_error: raise ValidationError
+    """
+
+    def __init__(self, config: Dict, entities_df: Optional[pd.DataFrame] = None):
+        validation = config.get('pipeline', {}).get('validation', {})
+        self.strict_mode = validation.get('strict_mode', True)
+        self.skip_on_error = validation.get('skip_on_error', True)
+        self.log_errors = validation.get('log_errors', True)
+        self.tax_rules = load_tax_rules(config)
+
+        self.entity_ids = None
+        if entities_df is not None and 'Entity_ID' in entities_df.columns:
+            self.entity_ids = pd.Index(entities_df['Entity_ID'].dropna().astype(str).unique())
+
+    # ------------------------------------------------------------------------
+    # Sheet validators
+    # ------------------------------------------------------------------------
+
+    def validate_invoices(self, df: pd.DataFrame, existing_ids: Iterable[str] = None) -> ValidationReport:
+        """Validate invoice rows (IDs, customer, currency, line items, tax, total)"""
+        checks = self._document_checks(df, 'Invoice_ID', 'Customer_ID', existing_ids)
+
+        line_items = sum(_minor(df, f'Line_Item_{i}_Amount') for i in range(1, 4))
+        subtotal = _minor(df, 'Subtotal')
+        tax = _minor(df, 'Tax_Amount')
+        checks['line_items_sum'] = (
+            _matches(line_items, subtotal),
+            'Line items do not sum to Subtotal'
+        )
+        checks['total_amount'] = (
+            _matches(_minor(df, 'Total_Amount'), subtotal + tax),
+            'Total_Amount is not Subtotal + Tax_Amount'
+        )
+        return self._report('Invoices_Master', df, checks)
+
+    def validate_bills(self, df: pd.DataFrame, existing_ids: Iterable[str] = None) -> ValidationReport:
+        """Validate bill rows (as invoices, plus TDS and Net_Payable)"""
+        checks = self._document_checks(df, 'Bill_ID', 'Vendor_ID', existing_ids)
+
+        line_items = sum(_minor(df, f'Line_Item_{i}_Amount') for i in range(1, 3))
+        subtotal = _minor(df, 'Subtotal')
+        total = _minor(df, 'Total_Amount')
+        tds = _minor(df, 'TDS_Amount')
+        if 'TDS_Applicable' in df.columns:
+            tds_applicable = df['TDS_Applicable'].fillna(False).astype(bool)
+        else:
+            tds_applicable = pd.Series(True, index=df.index)
+
+        checks['line_items_sum'] = (
+            _matches(line_items, subtotal),
+            'Line items do not sum to Subtotal'
+        )
+        checks['total_amount'] = (
+            _matches(total, subtotal + _minor(df, 'Tax_Amount')),
+            'Total_Amount is not Subtotal + Tax_Amount'
+        )
+        checks['tds_not_applicable'] = (
+            tds_applicable | (tds == 0),
+            'TDS_Amount set on a bill without TDS'
+        )
+        checks['net_payable'] = (
+            _matches(_minor(df, 'Net_Payable'), total - tds),
+            'Net_Payable is not Total_Amount - TDS_Amount'
+        )
+        checks['tds_non_negative'] = (tds >= 0, 'TDS_Amount is negative')
+        if 'Line_Item_1_Account' in df.columns:
+            expected_tds = self.tax_rules.evaluate_tds(df['Line_Item_1_Account'], _numeric(df, 'Subtotal'),
+                                                       df.get('Currency', pd.Series(None, index=df.index)))
+            checks['tds_calculation'] = (
+                _matches(tds, _minor(expected_tds, 'TDS_Amount')),
+                'TDS_Amount does not match the TDS rules for the expense account'
+            )
+        return self._report('Bills_Master', df, checks)
+
+    def validate_bank_transactions(self, df: pd.DataFrame, existing_ids: Iterable[str] = None,
+                                   opening_balances: Dict[str, float] = None) -> ValidationReport:
+        """
+        Validate bank rows (IDs, one-sided amounts, currency, balance continuity)
+
+        Args:
+            opening_balances: Balance per Bank_Account before the first row, so
+                              the first row of each account can be checked too
+        """
+        checks = {}
+        ids = df['Transaction_ID'] if 'Transaction_ID' in df.columns else pd.Series(None, index=df.index)
+        checks['id_present'] = (ids.notna() & (ids.astype(str).str.strip() != ''), 'Transaction_ID missing')
+        checks['id_unique'] = (~ids.duplicated(keep='first') | ids.isna(), 'Duplicate Transaction_ID in batch')
+        if existing_ids is not None:
+            checks['id_new'] = (~ids.astype(str).isin(pd.Index(existing_ids)), 'Transaction_ID already in sheet')
+
+        debit = _numeric(df, 'Debit').fillna(0.0)
+        credit = _numeric(df, 'Credit').fillna(0.0)
+        checks['amounts_non_negative'] = ((debit >= 0) & (credit >= 0), 'Debit/Credit is negative')
+        checks['one_sided'] = ((debit > 0) ^ (credit > 0), 'Exactly one of Debit/Credit must be set')
+        checks['currency'] = (df.get('Currency', pd.Series(None, index=df.index)).isin(VALID_CURRENCIES),
+                              'Currency must be USD or INR')
+
+        # Each row's balance is the previous balance of the same account plus credit minus debit
+        balance = _minor(df, 'Running_Balance')
+        accounts = df['Bank_Account'].fillna('') if 'Bank_Account' in df.columns else pd.Series('', index=df.index)
+        previous = balance.groupby(accounts.to_numpy()).shift(1)
+        if opening_balances:
+            opening = accounts.map(opening_balances)
+            opening_minor = pd.Series(to_minor_array(opening), index=df.index).where(opening.notna())
+            previous = previous.where(previous.notna(), opening_minor)
+        expected = previous + _minor(df, 'Credit') - _minor(df, 'Debit')
+        checks['running_balance'] = (
+            previous.isna() | _matches(balance, expected),
+            'Running_Balance does not follow from the previous balance'
+        )
+        return self._report('Bank_Transactions', df, checks)
+
+    # ------------------------------------------------------------------------
+    # Policy
+    # ------------------------------------------------------------------------
+
+    def apply(self, sheet: str, records: List[Dict], **kwargs) -> List[Dict]:
+        """
+        Validate a batch of new rows and apply the configured policy
+
+        Bank_Transactions rows carry running balances, so dropping one would
+        break every balance after it; in strict mode a failing bank batch is
+        always rejected with ValidationError.
+
+        Returns:
+            Rows to keep (all of them unless strict_mode drops failures)
+        """
+        if not records:
+            return records
+
+        validators = {
+            'Invoices_Master': self.validate_invoices,
+            'Bills_Master': self.validate_bills,
+            'Bank_Transactions': self.validate_bank_transactions
+        }
+        report = validators[sheet](pd.DataFrame(records), **kwargs)
+        if report.is_valid:
+            return records
+
+        if self.log_errors:
+            print(f"  ⚠ Validation: {report}")
+            for error in report.errors.head(10).itertuples(index=False):
+                print(f"    - {error.Document_ID}: {error.Message}")
+
+        if not self.strict_mode:
+            return records
+        if not self.skip_on_error or sheet == 'Bank_Transactions':
+            raise ValidationError(str(report))
+
+        keep = report.valid_mask()
+        return [record for record, ok in zip(records, keep) if ok]
+
+    # ------------------------------------------------------------------------
+    # Shared checks
+    # ------------------------------------------------------------------------
+
+    def _document_checks(self, df: pd.DataFrame, id_column: str, entity_column: str,
+                         existing_ids: Optional[Iterable[str]]) -> Dict:
+        """Checks common to invoices and bills"""
+        checks = {}
+        ids = df[id_column] if id_column in df.columns else pd.Series(None, index=df.index)
+        checks['id_present'] = (ids.notna() & (ids.astype(str).str.strip() != ''), f'{id_column} missing')
+        checks['id_unique'] = (~ids.duplicated(keep='first') | ids.isna(), f'Duplicate {id_column} in batch')
+        if existing_ids is not None:
+            checks['id_new'] = (~ids.astype(str).isin(pd.Index(existing_ids)), f'{id_column} already in master')
+
+        if self.entity_ids is not None:
+            entities = df[entity_column].astype(str) if entity_column in df.columns else pd.Series('', index=df.index)
+            checks['entity_exists'] = (entities.isin(self.entity_ids), f'{entity_column} not in Entities')
+
+        checks['currency'] = (df.get('Currency', pd.Series(None, index=df.index)).isin(VALID_CURRENCIES),
+                              'Currency must be USD or INR')
+
+        amounts = pd.concat([_numeric(df, col) for col in ('Subtotal', 'Tax_Amount', 'Total_Amount')], axis=1)
+        checks['amounts_non_negative'] = ((amounts >= 0).all(axis=1), 'Subtotal/Tax/Total missing or negative')
+
+        tax_types = df['Tax_Type'].tolist() if 'Tax_Type' in df.columns else None
+        expected_tax = apply_rate_array(_minor(df, 'Subtotal').to_numpy(),
+                                        _numeric(df, 'Tax_Rate').fillna(0.0).to_numpy(), tax_types)
+        checks['tax_calculation'] = (
+            _matches(_minor(df, 'Tax_Amount'), pd.Series(expected_tax, index=df.index)),
+            'Tax_Amount is not Subtotal x Tax_Rate'
+        )
+        return checks
+
+    def _report(self, sheet: str, df: pd.DataFrame, checks: Dict) -> ValidationReport:
+        """Collect failing (row, rule) pairs into a report"""
+        id_column = ID_COLUMNS[sheet]
+        ids = df[id_column].to_numpy(dtype=object) if id_column in df.columns else np.full(len(df), None)
+
+        frames = []
+        for rule, (passed, message) in checks.items():
+            failed = np.flatnonzero(~passed.fillna(False).to_numpy(dtype=bool))
+            if len(failed) == 0:
+                continue
+            frames.append(pd.DataFrame({
+                'Sheet': sheet,
+                'Row': failed,
+                'Document_ID': ids[failed],
+                'Rule': rule,
+                'Message': message
+            }))
+
+        if frames:
+            errors = pd.concat(frames, ignore_index=True).sort_values(['Row', 'Rule'], kind='stable', ignore_index=True)
+        else:
+            errors = pd.DataFrame(columns=REPORT_COLUMNS)
+        return ValidationReport(sheet, len(df), errors)